@@ -0,0 +1,51 @@
+import importlib
+import threading
+ 
+# The document libraries take most of the startup time, so they are imported the
+# first time a file of their format is searched, highlighted or shown, or by warm_up
+# once the window is up. Kept free of PyQt imports like search_engine.
+ 
+# Imported by warm_up, most used first
+BACKEND_MODULES = [
+    'fitz',
+    'reportlab.platypus',
+    'reportlab.lib.styles',
+    'reportlab.lib.pagesizes',
+    'docx',
+    'python_calamine',
+    'pptx',
+    'extract_msg',
+]
+ 
+ 
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access."""
+ 
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+ 
+    def __getattr__(self, attr):
+        # Only called for attributes the proxy does not have itself
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        return getattr(self.module, attr)
+ 
+ 
+fitz = LazyModule('fitz')
+ 
+ 
+def import_backends():
+    for name in BACKEND_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            # Reported by the search or highlight that needs it
+            pass
+ 
+ 
+def warm_up():
+    # Imports every backend on a daemon thread, so the first search does not wait for them
+    thread = threading.Thread(target=import_backends, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import random
+import shutil
+import zipfile
+import argparse
+from xml.sax.saxutils import escape
+ 
+# Reproducible synthetic corpus for the search benchmarks. The same arguments and
+# seed always produce the same text, so runs on different machines or commits compare.
+#
+#   python benchmarks/corpus.py /tmp/corpus --files 20 --pages 1 10 100 --density 0.001
+#
+# Each format gets --files files whose sizes cycle through --pages (pages, slides,
+# paragraph groups or blocks of rows). Keywords replace random words with the
+# probability --density. A manifest.json records the arguments and the files.
+#
+# Outlook .msg files cannot be written without a compound file writer, so MSG
+# fixtures are copies of --msg-template when one is given, and skipped otherwise.
+ 
+FORMATS = ['pdf', 'docx', 'pptx', 'xlsx', 'txt', 'msg']
+ 
+DEFAULT_KEYWORDS = ['invoice', 'contract', 'payment due']
+ 
+# Filler vocabulary, long enough that keywords are rare unless inserted
+VOCABULARY = (
+    'the of and to in is that for it as was with be by on not he this are or his from at which but have an they you '
+    'were her she there been one all we their has would when if so what more some them into time only could new '
+    'about other two then first any like now my such make over our even most me state after also made many did '
+    'must before back see through way where get much go well your know should down work year because come people '
+    'just say each those take day good how long little use three under never same last another while us off might '
+    'great old both world here thing between life being own around place again high without small every found still '
+    'report account balance quarter revenue customer supplier shipment order record section table figure summary'
+).split()
+ 
+# Words per line, lines per page and rows per xlsx block
+WORDS_PER_LINE = 12
+ROWS_PER_BLOCK = 100
+COLUMNS = 6
+ 
+ 
+class TextSource:
+    """Seeded word stream with keywords mixed in at a given density."""
+ 
+    def __init__(self, seed, keywords, density):
+        self.random = random.Random(seed)
+        self.keywords = keywords
+        self.density = density
+ 
+    def word(self):
+        if self.keywords and self.random.random() < self.density:
+            return self.random.choice(self.keywords)
+        return self.random.choice(VOCABULARY)
+ 
+    def line(self, words=WORDS_PER_LINE):
+        return ' '.join(self.word() for _ in range(words))
+ 
+    def lines(self, count, words=WORDS_PER_LINE):
+        return [self.line(words) for _ in range(count)]
+ 
+ 
+def write_pdf(path, text, pages, lines_per_page):
+    import fitz
+ 
+    document = fitz.open()
+    for _ in range(pages):
+        page = document.new_page()
+        y = 50
+        for line in text.lines(lines_per_page):
+            page.insert_text((40, y), line, fontsize=9)
+            y += 12
+    document.save(path)
+    document.close()
+ 
+ 
+def write_docx(path, text, pages, lines_per_page):
+    from docx import Document
+ 
+    document = Document()
+    for _ in range(pages):
+        for line in text.lines(lines_per_page // 4 or 1, WORDS_PER_LINE * 4):
+            document.add_paragraph(line)
+    document.save(path)
+ 
+ 
+def write_pptx(path, text, pages, lines_per_page):
+    from pptx import Presentation
+    from pptx.util import Inches
+ 
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # Blank
+    for _ in range(pages):
+        slide = presentation.slides.add_slide(layout)
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(6))
+        box.text_frame.text = '\n'.join(text.lines(min(lines_per_page, 20)))
+    presentation.save(path)
+ 
+ 
+def write_xlsx(path, text, pages, lines_per_page):
+    # Minimal SpreadsheetML with inline strings, so no spreadsheet writer is needed
+    rows = []
+    for row in range(1, pages * ROWS_PER_BLOCK + 1):
+        cells = ''.join(
+            f'<c r="{chr(65 + col)}{row}" t="inlineStr"><is><t>{escape(text.line(3))}</t></is></c>'
+            for col in range(COLUMNS)
+        )
+        rows.append(f'<row r="{row}">{cells}</row>')
+ 
+    sheet = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<sheetData>{"".join(rows)}</sheetData></worksheet>'
+    )
+    parts = {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/worksheets/sheet1.xml': sheet,
+    }
+ 
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts.items():
+            # Fixed timestamps, so the same seed gives the same bytes
+            archive.writestr(zipfile.ZipInfo(name, (1980, 1, 1, 0, 0, 0)), content, zipfile.ZIP_DEFLATED)
+ 
+ 
+def write_txt(path, text, pages, lines_per_page):
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(pages):
+            f.write('\n'.join(text.lines(lines_per_page)) + '\n')
+ 
+ 
+WRITERS = {
+    'pdf': write_pdf,
+    'docx': write_docx,
+    'pptx': write_pptx,
+    'xlsx': write_xlsx,
+    'txt': write_txt,
+}
+ 
+ 
+def generate_corpus(out_dir, formats=FORMATS, files=10, pages=(1, 10), lines_per_page=50,
+                    density=0.001, keywords=DEFAULT_KEYWORDS, seed=0, msg_template=None):
+    # Writes the corpus and returns its manifest
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        'formats': list(formats),
+        'files': files,
+        'pages': list(pages),
+        'lines_per_page': lines_per_page,
+        'density': density,
+        'keywords': list(keywords),
+        'seed': seed,
+        'skipped': [],
+        'entries': [],
+    }
+ 
+    for fmt in formats:
+        if fmt == 'msg' and not msg_template:
+            manifest['skipped'].append(fmt)
+            continue
+ 
+        fmt_dir = os.path.join(out_dir, fmt)
+        os.makedirs(fmt_dir, exist_ok=True)
+ 
+        for i in range(files):
+            file_pages = pages[i % len(pages)]
+            path = os.path.join(fmt_dir, f'{fmt}_{i:04d}_{file_pages}p.{fmt}')
+ 
+            if fmt == 'msg':
+                shutil.copyfile(msg_template, path)
+            else:
+                # One stream per file, so adding files or formats does not change the others
+                text = TextSource(f'{seed}:{fmt}:{i}', keywords, density)
+                WRITERS[fmt](path, text, file_pages, lines_per_page)
+ 
+            manifest['entries'].append({
+                'format': fmt,
+                'path': os.path.relpath(path, out_dir),
+                'pages': file_pages,
+                'bytes': os.path.getsize(path),
+            })
+ 
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+ 
+    return manifest
+ 
+ 
+def add_corpus_arguments(parser):
+    parser.add_argument('--formats', nargs='+', default=FORMATS, choices=FORMATS, help='formats to generate')
+    parser.add_argument('--files', type=int, default=10, help='files per format')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10],
+                        help='file sizes in pages (slides, paragraph groups, blocks of 100 rows); files cycle through them')
+    parser.add_argument('--lines-per-page', type=int, default=50, help='text lines per page')
+    parser.add_argument('--density', type=float, default=0.001, help='probability that a word is a keyword')
+    parser.add_argument('--keywords', default=','.join(DEFAULT_KEYWORDS), help='comma separated keywords to insert')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--msg-template', default=None, help='real .msg file copied as the MSG fixtures')
+ 
+ 
+def corpus_kwargs(args):
+    return {
+        'formats': args.formats,
+        'files': args.files,
+        'pages': args.pages,
+        'lines_per_page': args.lines_per_page,
+        'density': args.density,
+        'keywords': [k.strip() for k in args.keywords.split(',') if k.strip()],
+        'seed': args.seed,
+        'msg_template': args.msg_template,
+    }
+ 
+ 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a reproducible benchmark corpus.')
+    parser.add_argument('out_dir', help='folder to write the corpus to')
+    add_corpus_arguments(parser)
+    args = parser.parse_args(argv)
+ 
+    manifest = generate_corpus(args.out_dir, **corpus_kwargs(args))
+    total_bytes = sum(entry['bytes'] for entry in manifest['entries'])
+    print(f"{len(manifest['entries'])} files, {total_bytes / 1e6:.1f} MB written to {args.out_dir}"
+          + (f" (skipped: {', '.join(manifest['skipped'])})" if manifest['skipped'] else ''))
+    return 0
+ 
+ 
+if __name__ == '__main__':
+    sys.exit(main())
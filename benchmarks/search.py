@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+ 
+from corpus import FORMATS, generate_corpus, add_corpus_arguments, corpus_kwargs
+ 
+# End-to-end search benchmark over a generated corpus (see corpus.py). Every format
+# and phase runs in a fresh interpreter, so peak RSS belongs to that run alone:
+#
+#   search         SearchThread.search_within_file with an empty text cache
+#   search_cached  the same after one unmeasured pass has filled the cache
+#   highlight      the HighlightThread method the window runs for the format
+#
+#   python benchmarks/search.py /tmp/bench --generate --files 20 --pages 1 10 100
+#   python benchmarks/search.py /tmp/bench --output before.json
+#
+# Results are written as JSON so runs can be compared over time.
+ 
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ 
+PHASES = ['search', 'search_cached', 'highlight']
+ 
+HIGHLIGHTERS = {
+    'pdf': 'find_keywords_in_pdf',
+    'docx': 'highlight_keywords_in_docx',
+    'pptx': 'highlight_keywords_in_pptx',
+    'xlsx': 'highlight_keywords_in_xlsx',
+    'msg': 'highlight_keywords_in_msg',
+    'txt': 'highlight_keywords_in_txt',
+}
+ 
+# Runs in the child interpreter with SPEC defined; prints one JSON line
+PROBE = r'''
+import os, sys, json, time, shutil, tempfile
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+ 
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+ 
+import main
+import search_engine
+from text_cache import TextCache
+import backends
+backends.import_backends()  # Import time is measured by startup.py, not here
+ 
+# A private cache, so earlier runs and the user's cache do not skew the timings
+cache_dir = tempfile.mkdtemp(prefix='sks-bench-')
+search_engine.text_cache = TextCache(cache_dir)
+ 
+keywords, regex, phase = SPEC['keywords'], SPEC['regex'], SPEC['phase']
+search_thread = main.SearchThread(SPEC['corpus'], keywords, regex, ['.' + SPEC['format']], workers=1)
+baseline_rss = peak_rss_mb()
+ 
+def run_file(path):
+    if phase == 'highlight':
+        thread = main.HighlightThread(path, keywords, regex, os.path.splitext(path)[1], search_thread.query)
+        result = getattr(thread, SPEC['highlighter'])(path, keywords)
+        if SPEC['highlighter'] == 'highlight_keywords_in_txt':
+            # Returned open for the viewer; closed so the maps do not pile up over the run
+            result[0].close()
+        return True
+    return search_thread.search_within_file(path)
+ 
+if phase == 'search_cached':
+    for path in SPEC['paths']:
+        search_thread.search_within_file(path)
+ 
+latencies, matched, errors = [], 0, 0
+start = time.perf_counter()
+for path in SPEC['paths']:
+    file_start = time.perf_counter()
+    try:
+        result = run_file(path)
+    except Exception:
+        result = None
+    latencies.append(time.perf_counter() - file_start)
+    if result:
+        matched += 1
+    elif result is None:
+        errors += 1
+elapsed = time.perf_counter() - start
+shutil.rmtree(cache_dir, ignore_errors=True)
+ 
+print(json.dumps({
+    'seconds': elapsed,
+    'latencies': latencies,
+    'matched': matched,
+    'errors': errors,
+    'baseline_rss_mb': baseline_rss,
+    'peak_rss_mb': peak_rss_mb(),
+}))
+sys.stdout.flush()
+os._exit(0)
+'''
+ 
+ 
+def percentile(values, fraction):
+    # Nearest rank, which stays a real measurement for small samples
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+ 
+ 
+def run_phase(python, spec):
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+ 
+    output = subprocess.run(
+        [python, '-c', f'SPEC = {spec!r}\n' + PROBE],
+        cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+ 
+    return json.loads(output.strip().splitlines()[-1])
+ 
+ 
+def summarize(run, total_bytes):
+    latencies = run['latencies']
+    seconds = run['seconds']
+    return {
+        'files': len(latencies),
+        'bytes': total_bytes,
+        'seconds': seconds,
+        'files_per_second': len(latencies) / seconds if seconds else None,
+        'mb_per_second': total_bytes / 1e6 / seconds if seconds else None,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'matched': run['matched'],
+        'errors': run['errors'],
+        'baseline_rss_mb': run['baseline_rss_mb'],
+        'peak_rss_mb': run['peak_rss_mb'],
+    }
+ 
+ 
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception as e:
+        return None
+ 
+ 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure Smart Key Search throughput on a generated corpus.')
+    parser.add_argument('corpus', help='corpus folder with a manifest.json')
+    parser.add_argument('--generate', action='store_true', help='generate the corpus first with the options below')
+    add_corpus_arguments(parser)
+    parser.add_argument('--search-keywords', default=None,
+                        help='comma separated keywords to search for (default: the corpus keywords)')
+    parser.add_argument('--regex', default='', help='regex a whole word must match')
+    parser.add_argument('--phases', nargs='+', default=PHASES, choices=PHASES, help='phases to measure')
+    parser.add_argument('--python', default=sys.executable, help='interpreter to measure')
+    parser.add_argument('--output', default=None, help='JSON results file (default: search-benchmark-<time>.json)')
+    args = parser.parse_args(argv)
+ 
+    corpus_dir = os.path.abspath(args.corpus)
+    manifest_path = os.path.join(corpus_dir, 'manifest.json')
+ 
+    if args.generate or not os.path.exists(manifest_path):
+        manifest = generate_corpus(corpus_dir, **corpus_kwargs(args))
+    else:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+ 
+    if args.search_keywords is not None:
+        keywords = [k.strip() for k in args.search_keywords.split(',')]
+    else:
+        keywords = list(manifest['keywords'])
+    if args.regex != '':
+        keywords.append('((regex))')
+ 
+    results = {}
+ 
+    for fmt in FORMATS:
+        entries = [entry for entry in manifest['entries'] if entry['format'] == fmt]
+        if not entries:
+            continue
+ 
+        paths = [os.path.join(corpus_dir, entry['path']) for entry in entries]
+        total_bytes = sum(entry['bytes'] for entry in entries)
+        results[fmt] = {}
+ 
+        for phase in args.phases:
+            if phase == 'highlight' and fmt not in HIGHLIGHTERS:
+                continue
+ 
+            spec = {
+                'corpus': corpus_dir,
+                'format': fmt,
+                'phase': phase,
+                'paths': paths,
+                'keywords': keywords,
+                'regex': args.regex,
+                'highlighter': HIGHLIGHTERS.get(fmt),
+            }
+            summary = summarize(run_phase(args.python, spec), total_bytes)
+            results[fmt][phase] = summary
+ 
+            print(f"{fmt:5} {phase:14} {summary['files_per_second']:9.1f} files/s {summary['mb_per_second']:8.2f} MB/s "
+                  f"p50 {summary['p50_ms']:8.1f} ms  p99 {summary['p99_ms']:8.1f} ms  "
+                  f"peak {summary['peak_rss_mb'] or 0:7.1f} MB", file=sys.stderr)
+ 
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'keywords': keywords,
+        'regex': args.regex,
+        'corpus': {key: value for key, value in manifest.items() if key != 'entries'},
+        'results': results,
+    }
+ 
+    output_path = args.output or f"search-benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+ 
+    print(json.dumps(report['results'], indent=2))
+    return 0
+ 
+ 
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+ 
+# Startup benchmark: how long `import main` and showing the main window take in a
+# fresh interpreter, and which document libraries got imported on the way.
+# Exits with 1 when the median exceeds --max-seconds or a backend was loaded at
+# startup, so import-time regressions fail a CI job.
+#
+#   python benchmarks/startup.py --runs 10 --max-seconds 1.5
+ 
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ 
+# Libraries that must only be imported when a file of their format is used
+BACKENDS = ['fitz', 'pymupdf', 'reportlab', 'docx', 'pptx', 'extract_msg', 'python_calamine']
+ 
+# Runs in the child interpreter; prints one JSON line
+PROBE = r'''
+import os, sys, time, json
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+window = main.PDFHighlighter()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'window_seconds': shown - start,
+    'modules': sorted(name for name in sys.modules if name.split('.')[0] in BACKENDS),
+}))
+sys.stdout.flush()
+# Skip interpreter teardown, which is not part of startup
+os._exit(0)
+'''
+ 
+ 
+def run_once(python):
+    env = dict(os.environ)
+    # No display is needed to measure startup
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+ 
+    output = subprocess.run(
+        [python, '-c', f'BACKENDS = {BACKENDS!r}\n' + PROBE],
+        cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+ 
+    return json.loads(output.strip().splitlines()[-1])
+ 
+ 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure Smart Key Search startup time.')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start')
+    parser.add_argument('--python', default=sys.executable, help='interpreter to measure')
+    parser.add_argument('--max-seconds', type=float, default=None, help='fail when the median time to window exceeds this')
+    args = parser.parse_args(argv)
+ 
+    runs = [run_once(args.python) for _ in range(args.runs)]
+    loaded = sorted({name.split('.')[0] for run in runs for name in run['modules']})
+ 
+    result = {
+        'runs': args.runs,
+        'import_seconds_median': statistics.median(run['import_seconds'] for run in runs),
+        'window_seconds_median': statistics.median(run['window_seconds'] for run in runs),
+        'window_seconds_max': max(run['window_seconds'] for run in runs),
+        'backends_loaded_at_startup': loaded,
+    }
+    print(json.dumps(result, indent=2))
+ 
+    if loaded:
+        return 1
+    if args.max_seconds is not None and result['window_seconds_median'] > args.max_seconds:
+        return 1
+    return 0
+ 
+ 
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import os
+import re
+import sys
+import random
+ 
+import pytest
+ 
+# Checks the fast search paths against the per-word baseline the app started from:
+# every keyword is a substring of the lowercased text, and the regex fully matches
+# at least one word of text.split().
+#
+#   python -m pytest benchmarks
+ 
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+ 
+import text_files
+from matcher import SearchQuery, WordRegex
+from search_index import SearchIndex
+from text_files import TextFile, TextLines, search_txt
+ 
+WORDS = ['alpha', 'beta', 'gamma', 'délta', 'ÉCHO', 'über', 'INV12', 'inv', 'xINV3', 'naïve', 'x']
+ 
+REGEXES = [
+    r'INV\d+', r'[a-z]+', r'^INV\d+$', r'\bal', r'^(?:beta|zeta)$', r'(?<=a)lpha',
+    r'(?m)^x$', r'(?i)inv\d', r'INV\d( INV\d)?', r'a(?=l)\w+',
+]
+ 
+ENCODINGS = ['utf-8', 'utf-8-sig', 'cp1252', 'utf-16', 'utf-16-le', 'utf-32']
+ 
+ 
+def random_text(rnd, lines=30):
+    return '\n'.join(' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 8))) for _ in range(rnd.randint(1, lines)))
+ 
+ 
+def baseline_spans(regex_string, text):
+    return [word.span() for word in re.finditer(r'\S+', text) if re.fullmatch(regex_string, word.group())]
+ 
+ 
+def baseline_search(keywords, regex_string, text):
+    text_lower = text.lower()
+    return (all(keyword.lower() in text_lower for keyword in keywords)
+            and (regex_string == '' or any(re.fullmatch(regex_string, word) for word in text.split())))
+ 
+ 
+@pytest.mark.parametrize('regex_string', REGEXES)
+def test_word_regex_matches_every_word_on_its_own(regex_string):
+    rnd = random.Random(regex_string)
+    regex = WordRegex(regex_string)
+    query = SearchQuery(['((regex))'], regex_string)
+ 
+    for _ in range(200):
+        text = random_text(rnd, lines=3)
+        expected = baseline_spans(regex_string, text)
+        assert list(regex.finditer(text)) == expected
+        assert regex.search(text) == bool(expected)
+        # The highlight paths check single words through match_word
+        assert [word.span() for word in re.finditer(r'\S+', text) if query.match_word(word.group())] == expected
+ 
+ 
+@pytest.mark.parametrize('encoding', ENCODINGS)
+@pytest.mark.parametrize('chunk_size', [16, 64, 4096])
+def test_search_txt_agrees_with_the_whole_file(tmp_path, monkeypatch, encoding, chunk_size):
+    monkeypatch.setattr(TextFile.ranges, '__defaults__', (chunk_size,))
+    monkeypatch.setattr(TextFile.decoded_chunks, '__defaults__', (chunk_size,))
+    rnd = random.Random(f'{encoding}-{chunk_size}')
+    path = tmp_path / 'file.txt'
+ 
+    for _ in range(60):
+        # Long enough that the encoding is detected from the text, not a handful of bytes
+        text = 'alpha beta gamma\n' * 8 + random_text(rnd)
+        try:
+            path.write_bytes(text.encode(encoding))
+        except UnicodeEncodeError:
+            continue
+ 
+        keywords = rnd.sample(['alpha', 'beta gamma', 'délta', 'écho', 'über', 'x\nalpha'], 2)
+        regex_string = rnd.choice([''] + REGEXES)
+        query = SearchQuery(keywords + (['((regex))'] if regex_string else []), regex_string)
+ 
+        found = search_txt(str(path), query, stop_early=rnd.random() < 0.5)
+        assert bool(found) == baseline_search(keywords, regex_string, text), (keywords, regex_string)
+ 
+ 
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_text_lines_split_like_the_whole_file(tmp_path, monkeypatch, encoding):
+    # Small blocks, so lines are found across many checkpoints
+    monkeypatch.setattr(text_files, 'LINE_BLOCK_SIZE', 64)
+    monkeypatch.setattr(text_files, 'TXT_CHUNK_SIZE', 256)
+    rnd = random.Random(encoding)
+    path = tmp_path / 'file.txt'
+ 
+    for _ in range(20):
+        text = 'alpha beta gamma\n' * 8 + random_text(rnd, lines=200) + rnd.choice(['', '\n'])
+        path.write_bytes(text.encode(encoding))
+        expected = text.split('\n')
+        if text.endswith('\n'):
+            expected.pop()
+ 
+        lines = TextLines(str(path))
+        try:
+            assert len(lines) == len(expected)
+            order = list(range(len(lines)))
+            rnd.shuffle(order)
+            for line_num in list(range(len(lines))) + order:
+                assert lines.line(line_num) == expected[line_num]
+        finally:
+            lines.close()
+ 
+ 
+def test_index_query_keeps_every_matching_file(tmp_path):
+    rnd = random.Random(5)
+    vocabulary = [''.join(rnd.choice('abcdefghijklmnoé') for _ in range(rnd.randint(2, 9))) for _ in range(3000)]
+    folder = tmp_path / 'folder'
+    folder.mkdir()
+    index = SearchIndex(str(folder), str(tmp_path / 'index'))
+    texts = {}
+ 
+    try:
+        for i in range(200):
+            path = folder / f'{i}.txt'
+            path.write_text('')
+            texts[str(path)] = ' '.join(rnd.choice(vocabulary) for _ in range(60))
+            index.add_file(str(path), [(0, texts[str(path)])])
+        index.commit()
+ 
+        keywords = []
+        for _ in range(150):
+            word = rnd.choice(vocabulary)
+            start = rnd.randint(0, len(word) - 1)
+            keywords.append(word[start:start + rnd.randint(1, 6)])
+        for _ in range(50):
+            words = rnd.choice(list(texts.values())).split()
+            start = rnd.randint(0, len(words) - 3)
+            phrase = ' '.join(words[start:start + 3])
+            keywords.append(phrase[rnd.randint(0, 3):len(phrase) - rnd.randint(0, 3)])
+ 
+        for keyword in keywords:
+            candidates = index.query([keyword])
+            matching = {path for path, text in texts.items() if keyword in text}
+            # None means the index cannot narrow the search, every file is searched
+            assert candidates is None or matching <= candidates, keyword
+    finally:
+        index.close()
@@ -0,0 +1,57 @@
+import time
+import multiprocessing
+ 
+# Cooperative stop and pause for searches and highlights. The state lives in shared
+# memory, so the search worker processes see it without any messages; loops call
+# check() at every page, row block, slide or paragraph.
+ 
+RUNNING = 0
+PAUSED = 1
+CANCELLED = 2
+ 
+# How often a paused loop looks for resume or cancel, in seconds
+PAUSE_POLL_INTERVAL = 0.05
+ 
+ 
+class SearchCancelled(BaseException):
+    """Raised by CancelToken.check once the search or highlight was stopped.
+ 
+    Derived from BaseException, like GeneratorExit, so the `except Exception`
+    handlers that skip unreadable files do not swallow it."""
+ 
+ 
+class CancelToken:
+    """Stop and pause state shared by a search thread and its worker processes."""
+ 
+    def __init__(self):
+        self.state = multiprocessing.RawValue('b', RUNNING)
+ 
+    def cancel(self):
+        self.state.value = CANCELLED
+ 
+    def pause(self):
+        if self.state.value == RUNNING:
+            self.state.value = PAUSED
+ 
+    def resume(self):
+        if self.state.value == PAUSED:
+            self.state.value = RUNNING
+ 
+    @property
+    def cancelled(self):
+        return self.state.value == CANCELLED
+ 
+    @property
+    def paused(self):
+        return self.state.value == PAUSED
+ 
+    def check(self):
+        # Blocks while paused and raises SearchCancelled once cancelled
+        state = self.state.value
+ 
+        while state == PAUSED:
+            time.sleep(PAUSE_POLL_INTERVAL)
+            state = self.state.value
+ 
+        if state == CANCELLED:
+            raise SearchCancelled()
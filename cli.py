@@ -0,0 +1,144 @@
+import os
+import re
+import sys
+import json
+import argparse
+import multiprocessing
+from itertools import chain, islice
+from matcher import SearchQuery
+from search_engine import SearchEngine, FolderScan, search_file, collect_files, refresh_index
+from search_index import SearchIndex
+ 
+# Headless entry point: the same search as the GUI, without importing PyQt.
+# Matching files are written to stdout as JSON lines while the search runs.
+#
+#   python cli.py FOLDER -k "invoice, total" -r "INV\d+" -e pdf xlsx
+#
+# Exit status: 0 when at least one file matched, 1 when none did, 2 on errors.
+ 
+EXIT_FOUND = 0
+EXIT_NOT_FOUND = 1
+EXIT_ERROR = 2
+ 
+FILE_EXTENSIONS = ['.pdf', '.docx', '.txt', '.xlsx', '.pptx', '.msg']
+ 
+ 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Search a folder for files containing all keywords and the regex.')
+    parser.add_argument('folder', help='folder to search, including subfolders')
+    parser.add_argument('-k', '--keywords', default='', help='comma separated keywords, every one must be found')
+    parser.add_argument('-r', '--regex', default='', help='regex a whole word must match')
+    parser.add_argument('-e', '--extensions', nargs='+', default=FILE_EXTENSIONS,
+                        help='file types to search (default: all supported)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='search processes (default: one per CPU)')
+    parser.add_argument('--use-index', action='store_true', help="narrow the files with the folder's inverted index")
+    return parser.parse_args(argv)
+ 
+ 
+def write_line(stream, record):
+    stream.write(json.dumps(record) + '\n')
+    stream.flush()
+ 
+ 
+def search_folder(folder_path, keywords, regex_string, file_extensions, workers=None, use_index=False):
+    # Yields (file_path, size, result) for every searched file, result being
+    # True/False, or None when the file could not be read
+    query = SearchQuery(keywords, regex_string)
+    engine = SearchEngine(query, workers)
+    scan = None
+ 
+    if use_index:
+        # The index needs the whole file list, so the folder is collected first
+        files_to_search = collect_files(folder_path, file_extensions)
+        index = SearchIndex(folder_path)
+ 
+        try:
+            file_paths = [file_path for file_path, _ in files_to_search]
+            for _ in refresh_index(index, file_paths, file_extensions, engine):
+                pass
+            candidates = index.query(keywords)
+        finally:
+            index.close()
+ 
+        if candidates is not None:
+            files_to_search = [(file_path, file_size) for file_path, file_size in files_to_search if file_path in candidates]
+    else:
+        # Files are searched while the folder is still being scanned, so results
+        # start coming out before a large share has been walked
+        scan = FolderScan(folder_path, file_extensions).start()
+        files_to_search = scan
+ 
+    sizes = {}
+ 
+    def file_paths(files):
+        # Sizes are noted as the files are handed out; None means the scan has no new file yet
+        for item in files:
+            if item is None:
+                yield None
+                continue
+ 
+            file_path, file_size = item
+            sizes[file_path] = file_size
+            yield file_path
+ 
+    try:
+        # Two files are enough to decide whether the worker processes are worth starting
+        files_to_search = iter(files_to_search)
+        first_files = list(islice(files_to_search, 2))
+ 
+        if engine.workers > 1 and len(first_files) > 1:
+            if scan is not None:
+                # Results keep coming back while the scan has no new file queued
+                files_to_search = scan.ready()
+            results = engine.search(file_paths(chain(first_files, files_to_search)))
+        else:
+            results = ((file_path, search_file(file_path, query)) for file_path in file_paths(chain(first_files, files_to_search)))
+ 
+        for file_path, result in results:
+            yield file_path, sizes[file_path], result
+ 
+    finally:
+        if scan is not None:
+            scan.stop()
+ 
+ 
+def main(argv=None, stdout=sys.stdout, stderr=sys.stderr):
+    args = parse_args(argv)
+ 
+    # Same keyword handling as the search box: split on commas, regex as an extra keyword
+    keywords = [k.strip() for k in args.keywords.split(',')]
+    if args.regex != '':
+        keywords.append('((regex))')
+ 
+    file_extensions = [ext.lower() if ext.startswith('.') else '.' + ext.lower() for ext in args.extensions]
+ 
+    if not os.path.isdir(args.folder):
+        write_line(stderr, {'error': 'folder not found', 'folder': args.folder})
+        return EXIT_ERROR
+ 
+    if keywords == [''] and args.regex == '':
+        write_line(stderr, {'error': 'no keywords or regex given'})
+        return EXIT_ERROR
+ 
+    try:
+        SearchQuery(keywords, args.regex)
+    except re.error as e:
+        write_line(stderr, {'error': 'invalid regex', 'regex': args.regex, 'detail': str(e)})
+        return EXIT_ERROR
+ 
+    found = 0
+ 
+    for file_path, file_size, result in search_folder(args.folder, keywords, args.regex, file_extensions,
+                                                      args.workers, args.use_index):
+        if result:
+            found += 1
+            write_line(stdout, {'path': file_path, 'size': file_size})
+        elif result is None:
+            write_line(stderr, {'error': 'unreadable file', 'path': file_path})
+ 
+    return EXIT_FOUND if found else EXIT_NOT_FOUND
+ 
+ 
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Needed by the search worker processes in frozen builds
+    sys.exit(main())
@@ -1,3025 +1,2374 @@
-import sys
-
-import re
-
-import fitz
-
-from PyQt5.QtWidgets import (
-
-    QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QFileDialog, QGraphicsTransform, QSizePolicy, QProgressBar,
-
-    QPushButton, QTextEdit, QScrollArea, QListWidget, QListWidgetItem, QHBoxLayout, QSplitter, QItemDelegate, QGroupBox
-
-)
-
-from PyQt5.QtGui import QPixmap, QImage, QColor, QFont, QTransform, QPainter, QIcon
-
-from PyQt5.QtCore import Qt, QSize, QThread, pyqtSignal
-
-import os
-
-import io
-
-from reportlab.lib.pagesizes import letter
-
-from reportlab.pdfgen import canvas
-
-from reportlab.lib import colors
-
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-from reportlab.lib.colors import yellow, cyan, magenta, red, blue, pink, orange, green
-
-from docx import Document
-
-from pptx import Presentation
-
-import extract_msg
-
-from python_calamine import CalamineWorkbook
-
- 
-
- 
-
-class HighlightThread(QThread):
-
-    highlight_complete = pyqtSignal(str)  # Emits the path of the highlighted file when done
-
-    error = pyqtSignal(str)
-
- 
-
-    def __init__(self, file_path, keywords, regex_string, file_extension, parent=None):
-
-        super().__init__(parent)
-
-        self.file_path = file_path
-
-        self.keywords = keywords
-
-        self.regex_string = regex_string
-
-        self.file_extension = file_extension
-
- 
-
-    def run(self):
-
-        try:
-
-            if self.file_extension in ['.pdf', '.txt']:
-
-                highlighted_file_path = self.highlight_keywords_in_pdf(self.file_path, self.keywords)
-
-                self.highlight_complete.emit(highlighted_file_path)
-
-            elif self.file_extension == '.docx':
-
-                highlighted_file_path = self.highlight_keywords_in_docx(self.file_path, self.keywords)
-
-                self.highlight_complete.emit(highlighted_file_path)
-
-            elif self.file_extension == '.pptx':
-
-                highlighted_file_path = self.highlight_keywords_in_pptx(self.file_path, self.keywords)
-
-                self.highlight_complete.emit(highlighted_file_path)
-
-            elif self.file_extension == '.xlsx':
-
-                highlighted_file_path = self.highlight_keywords_in_xlsx(self.file_path, self.keywords)
-
-                self.highlight_complete.emit(highlighted_file_path)
-
-            elif self.file_extension == '.msg':
-
-                highlighted_file_path = self.highlight_keywords_in_msg(self.file_path, self.keywords)
-
-                self.highlight_complete.emit(highlighted_file_path)
-
-        except Exception as e:
-
-            self.error.emit(str(e))
-
- 
-
-    def match_regex(self, word):
-
-        try:
-
-            # Compile the regex pattern to check if it is valid
-
-            pattern = re.compile(self.regex_string)
-
-            # Match the word against the compiled pattern
-
-            return bool(pattern.fullmatch(word))
-
-        except re.error as e:
-
-            # Handle invalid regex patterns
-
-            raise ValueError(f"Invalid regex pattern: {e}")
-
- 
-
-    def highlight_keywords_in_pdf(self, pdf_path, keywords):
-
-        base, _ = os.path.splitext(pdf_path)
-
-        highlighted_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
-
- 
-
-        document = fitz.open(pdf_path)
-
-        highlight_colors = [
-
-                            fitz.utils.getColor("magenta"),
-
-                            fitz.utils.getColor("red"),
-
-                            fitz.utils.getColor("blue"),
-
-                            fitz.utils.getColor("pink"),
-
-                            fitz.utils.getColor("orange"),
-
-                            fitz.utils.getColor("green"),
-
-                            fitz.utils.getColor("yellow"),
-
-                            fitz.utils.getColor("cyan")
-
-                           ]
-
- 
-
- 
-
-        for page_num in range(len(document)):
-
-            page = document.load_page(page_num)
-
- 
-
-            for i, keyword in enumerate(keywords):
-
-                if keyword != '' and keyword != '((regex))':
-
-                    text_instances = page.search_for(keyword, quads = True)
-
- 
-
-                    for inst in text_instances:
-
-                        highlight = page.add_highlight_annot(inst)
-
-                        highlight.set_colors({"stroke": highlight_colors[i % len(highlight_colors)]})
-
-                        highlight.update()
-
- 
-
-                # Highlight words matching the regex
-
-                if keyword == '((regex))':
-
-                    words = page.get_text("words")  # Extract all words on the page
-
-                    for word_data in words:
-
-                        if self.match_regex(word_data[4]):  # Match the word against the regex
-
-                            inst = fitz.Rect(word_data[0], word_data[1], word_data[2], word_data[3])
-
-                            highlight = page.add_highlight_annot(inst)
-
-                            highlight.set_colors({"stroke": highlight_colors[len(keywords)-1 % len(highlight_colors)]})
-
-                            highlight.update()
-
- 
-
-        document.save(highlighted_pdf_path)
-
-        document.close()
-
- 
-
-        return highlighted_pdf_path
-
- 
-
-    def convert_to_column_alphabet(self, num):
-
-        """Convert column number to Excel column alphabet."""
-
-        result = ''
-
-        while num > 0:
-
-            num, remainder = divmod(num - 1, 26)
-
-            result = chr(65 + remainder) + result
-
-        return result
-
- 
-
- 
-
-    def highlight_keywords_in_xlsx(self, xlsx_path, keywords):
-
-        # Save the PDF to a file
-
-        base, _ = os.path.splitext(xlsx_path)
-
-        summary_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
-
- 
-
-        wb = CalamineWorkbook.from_path(xlsx_path)
-
-        keyword_positions = {keyword: [] for keyword in keywords}
-
- 
-
-        for sheet_name in wb.sheet_names:
-
-            ws = wb.get_sheet_by_name(sheet_name)
-
- 
-
-            for i, row in enumerate(ws.to_python(), start=1):
-
-                for j, cell in enumerate(row, start=1):
-
-                    if cell:  # Check if cell has a value
-
-                        cell_value = str(cell).lower()  # Convert cell value to lowercase
-
-                        for keyword in keywords:
-
-                            if keyword != '' and keyword != '((regex))':
-
-                                if keyword.lower() in cell_value:  # Case-insensitive search
-
-                                    # Add the keyword, sheet name, row number, and column number
-
-                                    cell_position = {
-
-                                        "sheet": sheet_name,
-
-                                        "row": i,     # Row number from cell object
-
-                                        "col": self.convert_to_column_alphabet(j),  # Column number from cell object
-
-                                        "value": str(cell)
-
-                                    }
-
-                                    keyword_positions[keyword].append(cell_position)
-
-                            if keyword == '((regex))':
-
-                                for word in str(cell).split():
-
-                                    if self.match_regex(word):
-
-                                        cell_position = {
-
-                                            "sheet": sheet_name,
-
-                                            "row": i,     # Row number from cell object
-
-                                            "col": self.convert_to_column_alphabet(j),  # Column number from cell object
-
-                                            "value": str(cell)
-
-                                        }
-
-                                        keyword_positions[keyword].append(cell_position)
-
-                                        break
-
- 
-
- 
-
-        # Filter out empty keyword lists
-
-        keyword_positions = {k: v for k, v in keyword_positions.items() if v}
-
- 
-
-        # Create an in-memory PDF buffer
-
-        buffer = io.BytesIO()
-
-        pdf = SimpleDocTemplate(buffer, pagesize=letter)
-
-        styles = getSampleStyleSheet()
-
-        story = []
-
- 
-
-        # Add a title to the PDF
-
-        story.append(Paragraph("Keyword Search Results for XLSX", styles['Title']))
-
-        story.append(Spacer(1, 12))
-
- 
-
-        # Iterate over the found keyword positions
-
-        for keyword, positions in keyword_positions.items():
-
-            story.append(Paragraph(f"Keyword: {keyword}", styles['Heading2']))
-
-            story.append(Spacer(1, 12))
-
- 
-
-            # Create a table with headers for displaying the results
-
-            data = [["Sheet Name", "Row", "Column", "Value"]]  # Header row
-
- 
-
-            for position in positions:
-
-                sheet = position['sheet']
-
-                row = position['row']
-
-                col = position['col']
-
-                value = position['value']
-
-                data.append([sheet, row, col, value])  # Append the found position details
-
- 
-
-            # Wrap long text values using Paragraph and Table
-
-            wrapped_data = []
-
-            for row_data in data:
-
-                wrapped_row = []
-
-                for cell in row_data:
-
-                    wrapped_row.append(Paragraph(str(cell), styles['Normal']))  # Convert cell to string for Paragraph
-
-                wrapped_data.append(wrapped_row)
-
- 
-
-            # Create the table
-
-            table = Table(wrapped_data, colWidths=[100, 50, 50, 300])  # Set column widths
-
-            table.setStyle(TableStyle([
-
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Vertically align text
-
-            ]))
-
- 
-
-            # Add the table to the story
-
-            story.append(table)
-
-            story.append(Spacer(1, 24))
-
- 
-
-        # Build the PDF
-
-        pdf.build(story)
-
- 
-
-        with open(summary_pdf_path, 'wb') as f:
-
-            f.write(buffer.getvalue())
-
- 
-
-        return summary_pdf_path
-
- 
-
-    def highlight_keywords_in_pptx(self, pptx_path, keywords):
-
-        # Save the highlighted PDF
-
-        base, _ = os.path.splitext(pptx_path)
-
-        highlighted_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
-
- 
-
-        prs = Presentation(pptx_path)
-
- 
-
-        # Create an in-memory PDF buffer
-
-        buffer = io.BytesIO()
-
-        pdf = SimpleDocTemplate(buffer, pagesize=letter)
-
-        styles = getSampleStyleSheet()
-
-        story = []
-
-        colors = ['magenta', 'red', 'blue', 'pink', 'orange', 'green','yellow', 'cyan']
-
- 
-
-        for slide in prs.slides:
-
-            for shape in slide.shapes:
-
-                if hasattr(shape, "text"):
-
-                    words = shape.text.split()
-
-                    highlighted_words = []
-
- 
-
-                    for word in words:
-
-                        found_keyword = False
-
-                        for i, keyword in enumerate(keywords):
-
-                            if keyword != '' and keyword != '((regex))':
-
-                                if keyword.lower() in word.lower():
-
-                                    text_split = word.lower().split(keyword.lower())
-
-                                    for j in range(len(text_split)):
-
-                                        highlighted_words.append(text_split[j])
-
-                                        if j != len(text_split)-1:
-
-                                            highlighted_word = f'<span bgcolor="{colors[i % len(colors)]}">{keyword.lower()}</span>'
-
-                                            highlighted_words.append(highlighted_word)
-
-                                    found_keyword = True
-
-                                    break
-
-                            if keyword == '((regex))' and self.match_regex(word):
-
-                                highlighted_word = f'<span bgcolor="{colors[len(keywords)-1 % len(colors)]}">{word}</span>'
-
-                                highlighted_words.append(highlighted_word)
-
-                                found_keyword = True
-
-                                break
-
- 
-
-                        if not found_keyword:
-
-                            highlighted_words.append(word)
-
- 
-
-                    highlighted_text = Paragraph(' '.join(highlighted_words), styles['Normal'])
-
-                    story.append(highlighted_text)
-
-                    story.append(Spacer(1, 12))
-
- 
-
-        pdf.build(story)
-
- 
-
-        with open(highlighted_pdf_path, 'wb') as f:
-
-            f.write(buffer.getvalue())
-
- 
-
-        return highlighted_pdf_path
-
- 
-
- 
-
-    def highlight_keywords_in_docx(self, docx_path, keywords):
-
-        # Save the highlighted PDF
-
-        base, _ = os.path.splitext(docx_path)
-
-        highlighted_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
-
- 
-
-        doc = Document(docx_path)
-
-   
-
-        # Create an in-memory PDF
-
-        buffer = io.BytesIO()
-
-        pdf = SimpleDocTemplate(buffer, pagesize=letter)
-
-        styles = getSampleStyleSheet()
-
-        story = []
-
-        colors = ['magenta', 'red', 'blue', 'pink', 'orange', 'green', 'yellow', 'cyan']
-
- 
-
-        for paragraph in doc.paragraphs:
-
-            words = paragraph.text.split()
-
-            highlighted_words = []
-
- 
-
-            for word in words:
-
-                found_keyword = False
-
-                for i, keyword in enumerate(keywords):
-
-                    if keyword != '' and keyword != '((regex))':
-
-                        if keyword.lower() in word.lower():
-
-                            text_split = word.lower().split(keyword.lower())
-
-                            for j in range(len(text_split)):
-
-                                highlighted_words.append(text_split[j])
-
-                                if j != len(text_split)-1:
-
-                                    highlighted_word = f'<span bgcolor="{colors[i % len(colors)]}">{keyword.lower()}</span>'
-
-                                    highlighted_words.append(highlighted_word)
-
-                            found_keyword = True
-
-                            break
-
-                    if keyword == '((regex))' and self.match_regex(word):
-
-                        highlighted_word = f'<span bgcolor="{colors[len(keywords)-1 % len(colors)]}">{word}</span>'
-
-                        highlighted_words.append(highlighted_word)
-
-                        found_keyword = True
-
-                        break
-
- 
-
-                if not found_keyword:
-
-                    highlighted_words.append(word)
-
- 
-
-            highlighted_text = Paragraph(' '.join(highlighted_words), styles['Normal'])
-
-            story.append(highlighted_text)
-
-            story.append(Spacer(1, 12))
-
- 
-
-        pdf.build(story)
-
- 
-
-        with open(highlighted_pdf_path, 'wb') as f:
-
-            f.write(buffer.getvalue())
-
- 
-
-        return highlighted_pdf_path
-
- 
-
-    def highlight_keywords_in_msg(self, msg_path, keywords):
-
-        try:
-
-            # Save the highlighted PDF
-
-            base, _ = os.path.splitext(msg_path)
-
-            highlighted_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
-
- 
-
-            msg = extract_msg.Message(msg_path)
-
-            msg_content = msg.body  # Extract the email content (body)
-
- 
-
-            # Create an in-memory PDF
-
-            buffer = io.BytesIO()
-
-            pdf = SimpleDocTemplate(buffer, pagesize=letter)
-
-            styles = getSampleStyleSheet()
-
-            story = []
-
-            colors = ['magenta', 'red', 'blue', 'pink', 'orange', 'green', 'yellow', 'cyan']
-
- 
-
-            # Split the email content into words and highlight the keywords
-
-            words = msg_content.split()
-
-            highlighted_words = []
-
- 
-
-            for word in words:
-
-                found_keyword = False
-
-                for i, keyword in enumerate(keywords):
-
-                    if keyword != '' and keyword != '((regex))':
-
-                        if keyword.lower() in word.lower():
-
-                            text_split = word.lower().split(keyword.lower())
-
-                            for j in range(len(text_split)):
-
-                                highlighted_words.append(text_split[j])
-
-                                if j != len(text_split)-1:
-
-                                    highlighted_word = f'<span bgcolor="{colors[i % len(colors)]}">{keyword.lower()}</span>'
-
-                                    highlighted_words.append(highlighted_word)
-
-                            found_keyword = True
-
-                            break
-
-                    if keyword == '((regex))' and self.match_regex(word):
-
-                        highlighted_word = f'<span bgcolor="{colors[len(keywords)-1 % len(colors)]}">{word}</span>'
-
-                        highlighted_words.append(highlighted_word)
-
-                        found_keyword = True
-
-                        break
-
- 
-
-                if not found_keyword:
-
-                    highlighted_words.append(word)
-
- 
-
-            # Create a paragraph for the highlighted content
-
-            highlighted_text = Paragraph(' '.join(highlighted_words), styles['Normal'])
-
-            story.append(highlighted_text)
-
-            story.append(Spacer(1, 12))
-
- 
-
-            # Build the PDF
-
-            pdf.build(story)
-
- 
-
-            with open(highlighted_pdf_path, 'wb') as f:
-
- 
-
-                f.write(buffer.getvalue())
-
- 
-
-            return highlighted_pdf_path
-
- 
-
-        except Exception as e:
-
-            return None
-
- 
-
- 
-
- 
-
-class SearchThread(QThread):
-
-    progress_within_file = pyqtSignal(int)  # Progress within a single file
-
-    update_current_file = pyqtSignal(str)   # Signal for updating current file
-
-    file_found = pyqtSignal(str)            # Signal when a file with the keyword is found
-
-    search_complete = pyqtSignal()          # Signal when the search is done
-
-    files_searched = pyqtSignal(int, int)   # Signal for updating number of searched files
-
- 
-
-    def __init__(self, folder_path, keywords, regex_string, file_extensions, parent=None):
-
-        super().__init__(parent)
-
-        self.folder_path = folder_path
-
-        self.keywords = keywords
-
-        self.file_extensions = file_extensions
-
-        self.regex_string = regex_string
-
- 
-
-    def run(self):
-
-        files_to_search = []
-
- 
-
-        # Collect files to search, along with their sizes
-
-        for root, _, files in os.walk(self.folder_path):
-
-            for file in files:
-
-                if any(file.lower().endswith(ext) for ext in self.file_extensions):
-
-                    full_path = os.path.join(root, file)
-
-                    file_size = os.path.getsize(full_path)  # Get file size
-
-                    files_to_search.append((full_path, file_size))
-
- 
-
-        # Sort files by size (smallest first)
-
-        files_to_search.sort(key=lambda x: x[1])
-
- 
-
-        total_files = len(files_to_search)
-
-        if total_files == 0:
-
-            self.search_complete.emit()
-
-            return
-
- 
-
-        for idx, (file_path, _) in enumerate(files_to_search):
-
-            self.update_current_file.emit(file_path)
-
-            keyword_found = self.search_within_file(file_path, self.keywords, self.regex_string)
-
- 
-
-            if keyword_found:
-
-                self.file_found.emit(file_path)
-
-           
-
-            # Emit the progress for total files searched
-
-            self.files_searched.emit(idx + 1, total_files)
-
- 
-
-        self.search_complete.emit()
-
- 
-
-    def search_within_file(self, file_path, keywords, regex_string):
-
-        file_name, file_extension = os.path.splitext(file_path)
-
-        file_extension = file_extension.lower()
-
- 
-
-        found_keywords = {}
-
- 
-
-        # Initialize found_keywords dictionary to track each keyword
-
-        if '' not in keywords:
-
-            found_keywords = {keyword.lower(): False for keyword in keywords}
-
- 
-
-        if regex_string != '':
-
-            try:
-
-                pattern = re.compile(regex_string)
-
-            except:
-
-                return False
-
-            found_keywords['((regex))'] = False
-
- 
-
-        if found_keywords:
-
-            # For .xlsx files
-
-            if file_extension == '.xlsx':
-
-                try:
-
-                    # Open the workbook using calamine
-
-                    wb = CalamineWorkbook.from_path(file_path)
-
-                    found_keywords = {keyword.lower(): False for keyword in keywords}
-
- 
-
-                    if regex_string != '':
-
-                        found_keywords['((regex))'] = False
-
- 
-
-                    total_rows = 0
-
-                    # Calculate total number of rows across all sheets
-
-                    # Hard coded for faster processing
-
-                    for sheet_name in wb.sheet_names:
-
-                        sheet = wb.get_sheet_by_name(sheet_name)
-
-                        total_rows += len(sheet.to_python())
-
- 
-
-                    processed_rows = 0
-
- 
-
-                    # Iterate through each sheet and each row
-
-                    for sheet_name in wb.sheet_names:
-
-                        sheet = wb.get_sheet_by_name(sheet_name)
-
- 
-
-                        for row in sheet.to_python():
-
-                            for cell in row:
-
-                                if cell:
-
-                                    cell_value = str(cell).lower()
-
-                                    for keyword in keywords:
-
-                                        if keyword.lower() in cell_value:
-
-                                            found_keywords[keyword.lower()] = True
-
-                                        if keyword.lower() == '((regex))':
-
-                                            for word in cell_value.split():
-
-                                                # Match the word against the compiled pattern
-
-                                                if bool(pattern.fullmatch(word)):
-
-                                                    found_keywords['((regex))'] = True
-
-                                                    break
-
- 
-
- 
-
-                            # Emit progress after processing each row
-
-                            processed_rows += 1
-
-                            self.progress_within_file.emit(int((processed_rows / total_rows) * 100))
-
- 
-
-                            # Early exit if all keywords are found
-
-                            if all(found_keywords.values()):
-
-                                return True
-
- 
-
-                    # Check if all keywords are found after loop
-
-                    return all(found_keywords.values())
-
- 
-
-                except Exception as e:
-
-                    return None
-
- 
-
-            # For .pptx files
-
-            elif file_extension == '.pptx':
-
-                try:
-
-                    prs = Presentation(file_path)
-
-                    total_slides = len(prs.slides)
-
- 
-
-                    for i, slide in enumerate(prs.slides):
-
-                        for shape in slide.shapes:
-
-                            if hasattr(shape, "text"):
-
-                                text = shape.text
-
-                                for keyword in keywords:
-
-                                    if keyword.lower() in text.lower():
-
-                                        found_keywords[keyword.lower()] = True
-
-                                    if keyword.lower() == '((regex))':
-
-                                        for word in text.split():
-
-                                            # Match the word against the compiled pattern
-
-                                            if bool(pattern.fullmatch(word)):
-
-                                                found_keywords['((regex))'] = True
-
-                                                break
-
-                                   
-
- 
-
-                        # Emit progress after processing each slide
-
-                        self.progress_within_file.emit(int(((i + 1) / total_slides) * 100))
-
- 
-
-                    # Check if all keywords are found
-
-                    return all(found_keywords.values())
-
- 
-
-                except Exception as e:
-
-                    return None
-
- 
-
-            # For .msg files
-
-            elif file_extension == '.msg':
-
-                try:
-
-                    msg = extract_msg.Message(file_path)
-
-                    msg_content = msg.body.lower()
-
-                    total_lines = len(msg_content.splitlines())
-
- 
-
-                    for i, line in enumerate(msg_content.splitlines()):
-
-                        for keyword in keywords:
-
-                            if keyword.lower() in line:
-
-                                found_keywords[keyword.lower()] = True
-
-                            if keyword.lower() == '((regex))':
-
-                                for word in line.split():
-
-                                    # Match the word against the compiled pattern
-
-                                    if bool(pattern.fullmatch(word)):
-
-                                        found_keywords['((regex))'] = True
-
-                                        break
-
- 
-
-                        # Emit progress after processing each line
-
-                        self.progress_within_file.emit(int(((i + 1) / total_lines) * 100))
-
- 
-
-                    # Check if all keywords are found
-
-                    return all(found_keywords.values())
-
- 
-
-                except Exception as e:
-
-                    return None
-
- 
-
-            # For .txt files
-
-            elif file_extension == '.txt':
-
-                try:
-
-                    with open(file_path, 'r', encoding='utf-8') as file:
-
-                        lines = file.readlines()
-
-                        total_lines = len(lines)
-
- 
-
-                        for i, line in enumerate(lines):
-
-                            for keyword in keywords:
-
-                                if keyword.lower() in line.lower():
-
-                                    found_keywords[keyword.lower()] = True
-
-                                if keyword.lower() == '((regex))':
-
-                                    for word in line.split():
-
-                                        # Match the word against the compiled pattern
-
-                                        if bool(pattern.fullmatch(word)):
-
-                                            found_keywords['((regex))'] = True
-
-                                            break
-
- 
-
-                            # Emit progress after processing each line
-
-                            self.progress_within_file.emit(int(((i + 1) / total_lines) * 100))
-
- 
-
-                    # Check if all keywords are found
-
-                    return all(found_keywords.values())
-
- 
-
-                except Exception as e:
-
-                    return None
-
- 
-
-            # For .pdf files
-
-            elif file_extension == '.pdf':
-
-                try:
-
-                    document = fitz.open(file_path)
-
-                    total_pages = len(document)
-
- 
-
-                    for page_num in range(total_pages):
-
-                        page = document.load_page(page_num)
-
- 
-
-                        for keyword in keywords:
-
-                            if page.search_for(keyword):
-
-                                found_keywords[keyword.lower()] = True
-
-                            if keyword == '((regex))':
-
-                                words = page.get_text("words")
-
-                                # Extract all words on the page
-
-                                for word_data in words:
-
-                                    if bool(pattern.fullmatch(word_data[4])):
-
-                                        found_keywords['((regex))'] = True
-
-                                        break
-
- 
-
-                        # Emit progress after processing each page
-
-                        self.progress_within_file.emit(int(((page_num + 1) / total_pages) * 100))
-
- 
-
-                    document.close()
-
- 
-
-                    # Check if all keywords are found
-
-                    return all(found_keywords.values())
-
- 
-
-                except Exception as e:
-
-                    return None
-
- 
-
-            # For .docx files
-
-            elif file_extension == '.docx':
-
-                try:
-
-                    doc = Document(file_path)
-
- 
-
-                    for paragraph in doc.paragraphs:
-
-                        for keyword in keywords:
-
-                            if keyword.lower() in paragraph.text.lower():
-
-                                found_keywords[keyword.lower()] = True
-
-                            if keyword.lower() == '((regex))':
-
-                                for word in paragraph.text.split():
-
-                                    # Match the word against the compiled pattern
-
-                                    if bool(pattern.fullmatch(word)):
-
-                                        found_keywords['((regex))'] = True
-
-                                        break
-
- 
-
-                    # Check if all keywords are found
-
-                    return all(found_keywords.values())
-
- 
-
-                except Exception as e:
-
-                    return None
-
- 
-
-        else:
-
-            return False
-
- 
-
-        # Default return if no matches
-
-        return False
-
- 
-
- 
-
-class VerticalLabel(QLabel):
-
-    def __init__(self, text, parent=None):
-
-        super().__init__(text, parent)
-
- 
-
-    def paintEvent(self, event):
-
-        painter = QPainter(self)
-
-        painter.setPen(QColor(85, 85, 85))
-
-        painter.setFont(QFont("Arial", 7))
-
- 
-
-        painter.translate(self.width()-3, self.height()-14)
-
-        painter.rotate(-90)      
-
- 
-
-        painter.drawText(0, 0, self.text())
-
-        painter.end()
-
- 
-
-    def sizeHint(self):
-
-        return QSize(8, 1100)
-
- 
-
- 
-
-class PDFViewer(QWidget):
-
-    def __init__(self, parent=None):
-
-        super().__init__(parent)
-
-        self.zoom_level = 1.0
-
-        self.current_page = 0
-
-        self.doc = None
-
-        self.initUI()
-
- 
-
-    def initUI(self):
-
-        self.layout = QVBoxLayout()
-
-         #--Credit label DAO-----------------------------------------------------------------------------#
-
- 
-
-        self.credit_label = QPushButton('https://github.com/nilayp99/Smart-Key-Search', self)
-
-        self.credit_label.setStyleSheet("font-weight: bold")
-
-        self.credit_label.setFont(QFont('Arial', 7))
-
-        self.layout.addWidget(self.credit_label)
-
-        #-----------------------------------------------------------------------------------------------#
-
- 
-
-        #--Scroll Area----------------------------------------------------------------------------------#
-
- 
-
-        self.scrollArea = QScrollArea()
-
-        self.scrollWidget = QWidget()
-
-        self.scrollLayout = QVBoxLayout()
-
-        self.scrollLayout.setAlignment(Qt.AlignCenter)
-
-        self.scrollWidget.setLayout(self.scrollLayout)
-
-        self.scrollArea.setWidget(self.scrollWidget)
-
-        self.scrollArea.setWidgetResizable(True)
-
-        self.scrollArea.verticalScrollBar().valueChanged.connect(self.on_scroll)
-
-        self.layout.addWidget(self.scrollArea)
-
- 
-
-        #----------------------------------------------------------------------------------------------#
-
-
- 
-
-        #--Bottom Functions----------------------------------------------------------------------------#
-
- 
-
-        self.button_layout = QHBoxLayout()
-
-        # self.button_layout.addStretch()
-
- 
-
-
-        self.file_name_label = QLabel(self)
-
-        self.file_name_label.setFixedSize(QSize(315, 18))
-
-        self.button_layout.addWidget(self.file_name_label, alignment=Qt.AlignCenter | Qt.AlignLeft)
-
-
- 
-
-        self.page_label = QLabel(self)
-
-        self.page_label.setFixedSize(QSize(150, 30))
-
-        self.page_label.setAlignment(Qt.AlignRight | Qt.AlignCenter)
-
-        self.button_layout.addWidget(self.page_label)
-
-
- 
-
-        self.zoom_out_button = QPushButton('-', self)
-
-        self.zoom_out_button.setFixedSize(QSize(30, 30))
-
-        self.zoom_out_button.clicked.connect(self.zoom_out)
-
-        self.button_layout.addWidget(self.zoom_out_button)
-
-
- 
-
-        self.zoom_in_button = QPushButton('+', self)
-
-        self.zoom_in_button.setFixedSize(QSize(30, 30))
-
-        self.zoom_in_button.clicked.connect(self.zoom_in)
-
-        self.button_layout.addWidget(self.zoom_in_button)
-
-
- 
-
-        self.layout.addLayout(self.button_layout)
-
- 
-
-        #----------------------------------------------------------------------------------------------#
-
- 
-
-        self.setLayout(self.layout)
-
-        self.scrollArea.viewport().installEventFilter(self)
-
- 
-
-
-    def eventFilter(self, source, event):
-
-        return super(PDFViewer, self).eventFilter(source, event)
-
-
- 
-
-    def clear_layout(self, layout):
-
-        if layout is not None:
-
-            while layout.count():
-
-                child = layout.takeAt(0)
-
-                if child.widget():
-
-                    child.widget().deleteLater()
-
-
- 
-
-    def display_pdf(self, pdf_path, page_num=0):
-
-        self.pdf_path = pdf_path
-
-        self.file_name_label.setText(os.path.basename(pdf_path).split('_highlighted')[0]+'.pdf')
-
- 
-
-        if hasattr(self, 'pdf_path'):
-
-            self.doc = fitz.open(self.pdf_path)
-
-            self.clear_layout(self.scrollLayout)
-
-
- 
-
-            self.page_labels = []
-
- 
-
-            for p_num in range(len(self.doc)):
-
-                self.add_page_to_layout(p_num)
-
-            self.current_page = page_num
-
-            self.scroll_to_page(page_num)
-
-            self.update_page_label()
-
- 
-
-
-    def add_page_to_layout(self, page_num):
-
-        page = self.doc.load_page(page_num)
-
-        zoom_matrix = fitz.Matrix(self.zoom_level, self.zoom_level)
-
-        pix = page.get_pixmap(matrix=zoom_matrix)
-
-        image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-
-        pixmap = QPixmap.fromImage(image)
-
-        label = QLabel()
-
-        label.setPixmap(pixmap)
-
- 
-
-        if page_num < len(self.page_labels):
-
-            self.scrollLayout.replaceWidget(self.page_labels[page_num], label)
-
-            self.page_labels[page_num].deleteLater()
-
-            self.page_labels[page_num] = label
-
-        else:
-
-            self.scrollLayout.addWidget(label)
-
-            self.page_labels.append(label)
-
- 
-
-
-    def scroll_to_page(self, page_num):
-
-        page_height = self.scrollArea.widget().height() / len(self.doc)
-
-        self.scrollArea.verticalScrollBar().setValue(int(page_height * page_num))
-
-        self.current_page = page_num
-
-        self.update_page_label()
-
-
- 
-
-    def zoom_in(self):
-
-        try:
-
-            self.zoom_level += 0.1
-
-            self.update_zoom()
-
-        except:
-
-            pass
-
- 
-
-
-    def zoom_out(self):
-
-        try:
-
-            if self.zoom_level > 0.1:
-
-                self.zoom_level -= 0.1
-
-            self.update_zoom()
-
-        except:
-
-            pass
-
- 
-
-
-    def update_zoom(self):
-
-        for page_num in range(len(self.page_labels)):
-
-            self.add_page_to_layout(page_num)
-
-        self.update_page_label()
-
- 
-
-
-    def update_page_label(self):
-
-        self.page_label.setText(f"Page {self.current_page+1} of {len(self.doc)}")
-
- 
-
-
-    def on_scroll(self):
-
-        scroll_value = self.scrollArea.verticalScrollBar().value()
-
- 
-
-        try:
-
-            page_height = self.scrollArea.widget().height() / len(self.doc)
-
-            self.current_page = int(scroll_value / page_height)
-
-            self.update_page_label()
-
-        except:
-
-            pass
-
-
- 
-
-    def close_pdf(self):
-
-        if self.doc:
-
-            self.doc.close()
-
-            self.doc = None
-
-            self.clear_layout(self.scrollLayout)
-
-
- 
-
-class PDFHighlighter(QMainWindow):
-
- 
-
-    def __init__(self):
-
-        super().__init__()
-
-        self.initUI()
-
-
- 
-
-    def initUI(self):
-
- 
-
-        self.setWindowTitle('Smart Key Search')
-
-        self.setGeometry(100, 100, 1200, 900)
-
- 
-
-        self.setWindowIcon(QApplication.style().standardIcon(QApplication.style().SP_FileDialogContentsView))
-
-        self.layout = QHBoxLayout()
-
-        self.splitter = QSplitter(Qt.Horizontal)
-
-
- 
-
-        #--Credits Section----------------------------------------------------------------------------------#
-
- 
-
-        self.credit_label = VerticalLabel("       Original | https://github.com/nilayp99/Smart-Key-Search")
-
-        self.credit_label.setFixedSize(QSize(13, 800))
-
-        self.layout.addWidget(self.credit_label, alignment=Qt.AlignRight | Qt.AlignBottom)
-
- 
-
-        #---------------------------------------------------------------------------------------------------
-
- 
-
- 
-
-        #--Left Section-------------------------------------------------------------------------------------#
-
- 
-
-        self.left_panel = QWidget()
-
-        self.left_layout = QVBoxLayout()
-
- 
-
-        #--Extension Selector------------------------------------------------------------------------------#
-
- 
-
-        self.extensionGroupBox = QGroupBox(' Select Extension ')
-
-        self.extensionGroupBoxLayout = QVBoxLayout()
-
- 
-
-        self.extension_selector_row_1 = QHBoxLayout()
-
-        self.extension_selector_row_2 = QHBoxLayout()
-
- 
-
-        self.pdf_button = QPushButton("PDF", self)
-
-        self.docx_button = QPushButton("DOC", self)
-
-        self.txt_button = QPushButton("TXT", self)
-
-        self.xlsx_button = QPushButton("EXCEL", self)
-
-        self.ppt_button = QPushButton("PPT", self)
-
-        self.msg_button = QPushButton("OUTLOOK", self)
-
-
- 
-
-        # Add buttons to the layout
-
-        self.extension_selector_row_1.addWidget(self.pdf_button)
-
-        self.extension_selector_row_1.addWidget(self.docx_button)
-
-        self.extension_selector_row_1.addWidget(self.txt_button)
-
-        self.extension_selector_row_2.addWidget(self.xlsx_button)
-
-        self.extension_selector_row_2.addWidget(self.ppt_button)
-
-        self.extension_selector_row_2.addWidget(self.msg_button)
-
-
- 
-
-        # Connect the buttons to toggle functions
-
-        self.pdf_button.clicked.connect(lambda: self.toggle_button(self.pdf_button))
-
-        self.docx_button.clicked.connect(lambda: self.toggle_button(self.docx_button))
-
-        self.txt_button.clicked.connect(lambda: self.toggle_button(self.txt_button))
-
-        self.xlsx_button.clicked.connect(lambda: self.toggle_button(self.xlsx_button))
-
-        self.ppt_button.clicked.connect(lambda: self.toggle_button(self.ppt_button))
-
-        self.msg_button.clicked.connect(lambda: self.toggle_button(self.msg_button))
-
-
-        # Initialize button states (selected)
-
-        self.pdf_button.setProperty('selected', True)
-
-        self.docx_button.setProperty('selected', True)
-
-        self.txt_button.setProperty('selected', True)
-
-        self.xlsx_button.setProperty('selected', True)
-
-        self.ppt_button.setProperty('selected', True)
-
-        self.msg_button.setProperty('selected', True)
-
- 
-
-        self.pdf_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
-
-        self.docx_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
-
-        self.txt_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
-
-        self.xlsx_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
-
-        self.ppt_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
-
-        self.msg_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
-
- 
-
-        self.extensionGroupBoxLayout.addLayout(self.extension_selector_row_1)
-
-        self.extensionGroupBoxLayout.addLayout(self.extension_selector_row_2)
-
- 
-
-        self.extensionGroupBox.setLayout(self.extensionGroupBoxLayout)
-
- 
-
-        self.left_layout.addWidget(self.extensionGroupBox)
-
- 
-
-
-        #--Search Section-----------------------------------------------------------------------------------#
-
- 
-
-        self.searchGroupBox = QGroupBox(' Search Folder ')
-
-        self.searchGroupBoxLayout = QVBoxLayout()
-
- 
-
-        self.openFolderButton = QPushButton('Open Folder', self)
-
-        self.openFolderButton.clicked.connect(self.open_folder)
-
-        self.searchGroupBoxLayout.addWidget(self.openFolderButton)
-
- 
-
-        # Add the new QLabel to display the selected folder path
-
-        self.folderPathLabel = QLabel('No folder selected', self)
-
-        self.folderPathLabel.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)  # Expands horizontally
-
-        self.folderPathLabel.setWordWrap(True)  # Allows the label to wrap text if the path is long
-
-        self.folderPathLabel.setStyleSheet("background-color: #333333; border: 1px solid #666; border-radius: 5px; padding: 5px; color: #DDDDDD;")
-
- 
-
-        # Add the folderPathLabel to the layout below the "Open Folder" button
-
-        self.searchGroupBoxLayout.addWidget(self.folderPathLabel)
-
- 
-
-        self.keywordInput = QTextEdit(self)
-
-        self.keywordInput.setPlaceholderText('Enter keywords separated by commas')
-
-        self.searchGroupBoxLayout.addWidget(self.keywordInput)
-
- 
-
-        self.regexInput = QTextEdit(self)
-
-        self.regexInput.setPlaceholderText('Enter Regex')
-
-        self.regexInput.setFixedHeight(38)
-
-        self.searchGroupBoxLayout.addWidget(self.regexInput)
-
- 
-
-        self.file_progress_bar = QProgressBar(self)
-
-        self.file_progress_bar.setVisible(False)  # Hide initially
-
-        self.searchGroupBoxLayout.addWidget(self.file_progress_bar)
-
- 
-
-        self.total_progress_label = QLabel(self)
-
-        self.total_progress_label.setVisible(False)  # Hide initially
-
-        self.left_layout.addWidget(self.total_progress_label)
-
- 
-
-        self.searchButton = QPushButton('Search', self)
-
-        self.searchButton.clicked.connect(self.search_keywords)
-
-        self.searchGroupBoxLayout.addWidget(self.searchButton)
-
- 
-
-        self.searchGroupBox.setLayout(self.searchGroupBoxLayout)
-
-        self.left_layout.addWidget(self.searchGroupBox)
-
- 
-
-
- 
-
-        #--File list Section--------------------------------------------------------------------------------#
-
- 
-
-        self.fileListGroupBox = QGroupBox(' Results ')
-
-        self.fileListGroupBoxLayout = QVBoxLayout()
-
- 
-
-        self.fileList = QListWidget(self)
-
-        self.fileList.itemClicked.connect(self.open_selected_pdf)
-
-        self.fileListGroupBoxLayout.addWidget(self.fileList)      
-
- 
-
-        self.fileListGroupBox.setLayout(self.fileListGroupBoxLayout)
-
- 
-
-        self.left_layout.addWidget(self.fileListGroupBox)
-
- 
-
-        #---------------------------------------------------------------------------------------------------
-
- 
-
-        # Label to show currently searched file
-
-        self.current_file_label = QLabel(self)
-
-        self.current_file_label.setAlignment(Qt.AlignLeft | Qt.AlignBottom)
-
-        self.current_file_label.setFixedSize(QSize(300, 20))  # Adjust size as needed
-
-        self.left_layout.addWidget(self.current_file_label)
-
- 
-
-        self.left_panel.setLayout(self.left_layout)
-
- 
-
-        #---------------------------------------------------------------------------------------------------
-
- 
-
- 
-
-        #--Right Section------------------------------------------------------------------------------------#
-
- 
-
-        self.right_panel = QWidget()
-
-        self.right_layout = QVBoxLayout()
-
- 
-
-        #--Toggle Mode-------------------------------------------------------------------------------------#
-
- 
-
-        self.mode_toggle_button = QPushButton('Toggle Dark/Light', self)
-
-        self.mode_toggle_button.clicked.connect(self.toggle_mode)
-
-        self.right_layout.addWidget(self.mode_toggle_button)
-
-       
-
- 
-
-        #--Keyword List-------------------------------------------------------------------------------------#
-
- 
-
-        self.keyWordListGroupBox = QGroupBox(' Keyword List ')
-
-        self.keyWordListGroupBoxLayout = QVBoxLayout()
-
- 
-
-        self.keywordList = QListWidget(self)
-
-        self.keyWordListGroupBoxLayout.addWidget(self.keywordList)
-
-        self.keywordList.itemClicked.connect(self.on_keyword_selected)
-
- 
-
-        self.up_down_button_layout = QHBoxLayout()
-
- 
-
-        self.upButton = QPushButton('Up', self)
-
-        self.upButton.clicked.connect(self.scroll_keyword_up)
-
-        self.up_down_button_layout.addWidget(self.upButton)
-
- 
-
-        self.downButton = QPushButton('Down', self)
-
-        self.downButton.clicked.connect(self.scroll_keyword_down)
-
-        self.up_down_button_layout.addWidget(self.downButton)
-
- 
-
-        self.keyWordListGroupBoxLayout.addLayout(self.up_down_button_layout)
-
- 
-
-        self.keyWordListGroupBox.setLayout(self.keyWordListGroupBoxLayout)
-
- 
-
-        self.right_layout.addWidget(self.keyWordListGroupBox)
-
- 
-
-        #---------------------------------------------------------------------------------------------------
-
- 
-
- 
-
-        #--Page Line List----------------------------------------------------------------------------------#
-
- 
-
-        self.pageLineListGroupBox = QGroupBox(' Position Details ')
-
-        self.pageLineListGroupBoxLayout = QVBoxLayout()
-
- 
-
-        self.page_line_list = QListWidget(self)
-
-        self.page_line_list.itemClicked.connect(self.navigate_to_page_line)
-
-        self.pageLineListGroupBoxLayout.addWidget(self.page_line_list)
-
- 
-
-        self.pageLineListGroupBox.setLayout(self.pageLineListGroupBoxLayout)
-
- 
-
-        self.right_layout.addWidget(self.pageLineListGroupBox)
-
- 
-
-        #---------------------------------------------------------------------------------------------------
-
- 
-
-        self.right_panel.setLayout(self.right_layout)
-
- 
-
-        #---------------------------------------------------------------------------------------------------
-
- 
-
-        self.pdf_viewer = PDFViewer()
-
- 
-
-        self.splitter.addWidget(self.left_panel)
-
-        self.splitter.addWidget(self.pdf_viewer)
-
-        self.splitter.addWidget(self.right_panel)
-
- 
-
-        # self.splitter.setStretchFactor(0, 1)
-
-        # self.splitter.setStretchFactor(1, 3)
-
-        # self.splitter.setStretchFactor(2, 1)
-
- 
-
-        self.splitter.setSizes([300, 800, 300])
-
-        self.layout.addWidget(self.splitter)
-
- 
-
-        container = QWidget()
-
-        container.setLayout(self.layout)
-
- 
-
-        self.setCentralWidget(container)
-
- 
-
-        self.temp_files = []
-
-        self.page_positions = {}
-
-        self.keyword_positions = {}
-
-        self.keyword_list = []
-
-        self.regex_string = ''
-
- 
-
-        self.apply_stylesheet()
-
- 
-
-    def toggle_button(self, button):
-
-        # Check if the button is already selected
-
-        if button.property('selected'):
-
-            # Deselect the button, set normal color
-
-            button.setStyleSheet("background-color: none")
-
-            button.setProperty('selected', False)
-
-        else:
-
-            # Select the button, set to red
-
-            button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
-
-            button.setProperty('selected', True)
-
-
- 
-
-    def toggle_mode(self):
-
-        if hasattr(self, 'dark_mode_enabled') and self.dark_mode_enabled:
-
-            self.setStyleSheet(self.light_mode_stylesheet)
-
-            self.folderPathLabel.setStyleSheet("background-color: #F0F0F0; border: 1px solid #999; border-radius: 5px; padding: 5px;")
-
-            self.dark_mode_enabled = False
-
-        else:
-
-            self.setStyleSheet(self.dark_mode_stylesheet)
-
-            self.folderPathLabel.setStyleSheet("background-color: #333333; border: 1px solid #666; border-radius: 5px; padding: 5px; color: #DDDDDD;")
-
-            self.dark_mode_enabled = True
-
-
- 
-
-    def apply_stylesheet(self):
-
-        light_mode_stylesheet = """
-
-            QWidget {
-
-                background-color: #F0F0F0;
-
-                color: #333;
-
-                font-family: Arial, sans-serif;
-
-            }
-
-            QPushButton {
-
-                background-color: #E0E0E0;
-
-                border: 1px solid #999;
-
-                padding: 5px;
-
-                border-radius: 5px;
-
-            }
-
-            QPushButton#searchButton {
-
-                background-color: #D32F2F;
-
-                color: white;
-
-            }
-
-            QListWidget::item:selected {
-
-                background-color: #D32F2F;
-
-                color: white;
-
-                border: 1px solid #D32F2F;
-
-            }
-
-            QPushButton:hover {
-
-                background-color: #C0C0C0;
-
-            }
-
-            QTextEdit, QListWidget {
-
-                background-color: #FFFFFF;
-
-                border: 1px solid #999;
-
-                padding: 5px;
-
-                border-radius: 5px;
-
-            }
-
-            QGroupBox {
-
-                border: 1px solid #999;
-
-                padding-top: 10px;
-
-                border-radius: 5px;
-
-            }
-
-            QSplitter::handle {
-
-                background-color: #858484;
-
-                width: 1px;
-
-                height: 1px;
-
-                border-radius: 1px;
-
-            }
-
-            QProgressBar {
-
-                border: 1px solid #999;
-
-                border-radius: 5px;
-
-                background-color: #E0E0E0;
-
-                text-align: center;
-
-                height: 10px;  /* Adjust the height */
-
-            }
-
-            QProgressBar::chunk {
-
-                background-color: #4CAF50;  /* Green progress chunk */
-
-                width: 10px;  /* Chunk width */
-
-            }
-
-        """
-
-
-        dark_mode_stylesheet = """
-
-            QWidget {
-
-                background-color: #2C2C2C;
-
-                color: #DDDDDD;
-
-                font-family: Arial, sans-serif;
-
-            }
-
-            QPushButton {
-
-                background-color: #444444;
-
-                border: 1px solid #666;
-
-                padding: 5px;
-
-                border-radius: 5px;
-
-            }
-
-            QPushButton#searchButton {
-
-                background-color: #8B0000;
-
-                color: white;
-
-            }
-
-            QListWidget::item:selected {
-
-                background-color: #8B0000;
-
-                color: white;
-
-                border: 1px solid #8B0000;
-
-            }
-
-            QPushButton:hover {
-
-                background-color: #555555;
-
-            }
-
-            QTextEdit, QListWidget {
-
-                background-color: #333333;
-
-                border: 1px solid #666;
-
-                padding: 5px;
-
-                border-radius: 5px;
-
-            }
-
-            QGroupBox {
-
-                border: 1px solid #666;
-
-                padding-top: 10px;
-
-                border-radius: 5px;
-
-            }
-
-            QSplitter::handle {
-
-                background-color: #444444;
-
-                width: 1px;
-
-                height: 1px;
-
-                border-radius: 1px;
-
-            }
-
-            QProgressBar {
-
-                border: 1px solid #666;
-
-                border-radius: 5px;
-
-                background-color: #2E2E2E;
-
-                text-align: center;
-
-                height: 10px;  /* Adjust the height */
-
-            }
-
-            QProgressBar::chunk {
-
-                background-color: #2196F3;  /* Blue progress chunk */
-
-                width: 10px;  /* Chunk width */
-
-            }
-
-        """
-
- 
-
-        self.light_mode_stylesheet = light_mode_stylesheet
-
-        self.dark_mode_stylesheet = dark_mode_stylesheet
-
-        self.dark_mode_enabled = True  # Start in light mode
-
- 
-
-        # Apply light mode initially
-
-        self.setStyleSheet(self.dark_mode_stylesheet)
-
- 
-
- 
-
-    def open_folder(self):
-
-        options = QFileDialog.Options()
-
-        self.folder_path = QFileDialog.getExistingDirectory(self, 'Open Folder', '', options=options)
-
- 
-
-        if self.folder_path:
-
-            self.folderPathLabel.setText(self.folder_path)
-
-        else:
-
-            self.folderPathLabel.setText('No folder selected')
-
- 
-
-        if self.folder_path:
-
-            self.keywordList.clear()
-
-            self.page_line_list.clear()
-
-            self.fileList.clear()
-
-            self.pdf_viewer.close_pdf()
-
- 
-
-            for temp_file in self.temp_files:
-
-                try:
-
-                    os.remove(temp_file)
-
-                    self.temp_files = []
-
-                except:
-
-                    pass
-
-
- 
-
-    def convert_txt_to_pdf(self, txt_path):
-
-        pdf_path = txt_path.rsplit('.', 1)[0] + '.pdf'      
-
- 
-
-        with open(txt_path, 'r', encoding='utf-8') as file:
-
-            content = file.read()
-
- 
-
-        pdf = SimpleDocTemplate(pdf_path, pagesize=letter)
-
-        styles = getSampleStyleSheet()
-
-        story = [Paragraph(content.replace('\n', '<br/>'), styles['Normal'])]
-
-        pdf.build(story)
-
- 
-
-        self.temp_files.append(pdf_path)
-
- 
-
-        return pdf_path
-
- 
-
- 
-
-    def search_keywords(self):
-
-        # Clear previous search data
-
-        self.keywordList.clear()
-
-        self.page_line_list.clear()
-
-        self.pdf_viewer.close_pdf()
-
- 
-
-        # Remove temporary files
-
-        for temp_file in self.temp_files:
-
-            try:
-
-                os.remove(temp_file)
-
-            except:
-
-                pass
-
- 
-
-        self.temp_files = []
-
-        self.keyword_list = []
-
-        self.regex_string = ''
-
- 
-
-        # Check if a folder is selected
-
-        if hasattr(self, 'folder_path'):
-
-            keywords = self.keywordInput.toPlainText().split(',')
-
-            self.regex_string = self.regexInput.toPlainText()
-
- 
-
-            self.keyword_list = [k.strip() for k in keywords]
-
- 
-
-            if self.regex_string != '':
-
-                self.keyword_list.append('((regex))')
-
- 
-
-            self.fileList.clear()
-
- 
-
-            # if '' not in keywords:
-
-            # Get selected file formats based on button states
-
-            file_extensions = []
-
-            if self.pdf_button.property('selected'):
-
-                file_extensions.append('.pdf')
-
-            if self.docx_button.property('selected'):
-
-                file_extensions.append('.docx')
-
-            if self.txt_button.property('selected'):
-
-                file_extensions.append('.txt')
-
-            if self.xlsx_button.property('selected'):
-
-                file_extensions.append('.xlsx')
-
-            if self.ppt_button.property('selected'):
-
-                file_extensions.append('.pptx')
-
-            if self.msg_button.property('selected'):
-
-                file_extensions.append('.msg')
-
- 
-
-            # Start the search in a background thread
-
-            self.file_progress_bar.setVisible(True)
-
-            self.total_progress_label.setVisible(True)
-
-            self.current_file_label.setVisible(True)
-
- 
-
-            # Initialize and start the SearchThread
-
-            self.search_thread = SearchThread(self.folder_path, self.keyword_list, self.regex_string, file_extensions)
-
-            self.search_thread.progress_within_file.connect(self.update_file_progress_bar)
-
-            self.search_thread.update_current_file.connect(self.update_current_file_label)
-
-            self.search_thread.file_found.connect(self.add_file_to_list)  # Connect the file_found signal
-
-            self.search_thread.search_complete.connect(self.on_search_complete)
-
-            self.search_thread.files_searched.connect(self.update_files_searched_label)  # Connect new signal
-
- 
-
-            # Start the thread
-
-            self.search_thread.start()
-
- 
-
-            # else:
-
-            #     self.current_file_label.setText("Empty Keyword Error! Check After Comma.")
-
- 
-
-        else:
-
-            self.current_file_label.setText("Folder Path NOT Selected.")
-
- 
-
- 
-
-    def update_file_progress_bar(self, progress):
-
-        self.file_progress_bar.setValue(progress)
-
- 
-
- 
-
-    def update_files_searched_label(self, current_file_index, total_files):
-
-        self.total_progress_label.setText(f"Files searched: {current_file_index}/{total_files}")
-
- 
-
- 
-
-    def update_current_file_label(self, file_path):
-
-        self.current_file_label.setText(f"Searching: {os.path.basename(file_path)}")
-
- 
-
- 
-
-    def add_file_to_list(self, file_path):
-
-        self.fileList.addItem(file_path)  # Add the file with matching keywords to the file list
-
- 
-
- 
-
-    def on_search_complete(self):
-
-        self.file_progress_bar.setVisible(False)
-
-        self.total_progress_label.setVisible(False)
-
-        if self.fileList.count():
-
-            self.current_file_label.setText("Search Complete.")
-
-        else:
-
-            self.current_file_label.setText("All Keywords NOT Found.")
-
- 
-
-
-    def open_selected_pdf(self, item):
-
-        self.page_line_list.clear()
-
- 
-
-        # Use the full path of the selected file from the item
-
-        full_file_path = item.text()
-
-        file_name, file_extension = os.path.splitext(full_file_path)
-
-        file_extension = file_extension.lower()
-
-        existing_highlighted_pdf_path = f"{file_name}_highlighted_{'_'.join(self.keyword_list)}.pdf"
-
- 
-
-        if existing_highlighted_pdf_path in self.temp_files:
-
-            self.on_highlight_complete(existing_highlighted_pdf_path)
-
-            return None
-
- 
-
-        if file_extension == '.txt':
-
-            full_file_path = self.convert_txt_to_pdf(full_file_path)
-
- 
-
-        # Start a new thread to highlight the selected file
-
-        self.highlight_thread = HighlightThread(full_file_path, self.keyword_list, self.regex_string, file_extension)
-
- 
-
-        # Connect signals to handle completion and errors
-
-        self.highlight_thread.highlight_complete.connect(self.on_highlight_complete)
-
-        self.highlight_thread.error.connect(self.on_highlight_error)
-
- 
-
-        # Start the thread (this runs the highlighting in the background)
-
-        self.highlight_thread.start()
-
- 
-
-    def on_highlight_complete(self, highlighted_file_path):
-
-        self.temp_files.append(highlighted_file_path)
-
-        current_page = self.page_positions.get(highlighted_file_path, 0)
-
-        self.pdf_viewer.display_pdf(highlighted_file_path, current_page)
-
-        self.keyword_positions = self.get_keyword_positions(highlighted_file_path, self.keyword_list)
-
-        self.populate_keyword_list(self.keyword_list)
-
- 
-
-    def on_highlight_error(self, error_message):
-
-        print(f"Error during highlighting: {error_message}")
-
- 
-
-    def get_keyword_positions(self, pdf_path, keywords):
-
-        document = fitz.open(pdf_path)
-
-        keyword_positions = {keyword: [] for keyword in keywords}
-
- 
-
-        for page_num in range(len(document)):
-
-            page = document.load_page(page_num)
-
-            blocks = page.get_text("dict")["blocks"]
-
- 
-
-            lines = []
-
-            line_number = 1
-
- 
-
-            for block in blocks:
-
-                for line in block.get("lines", []):
-
-                    line_bbox = line["bbox"]
-
-                    line_y0 = line_bbox[1]
-
-                    line_y1 = line_bbox[3]
-
-                    line_text = " ".join([span["text"] for span in line["spans"] if span["text"].strip() != ""])
-
- 
-
-                    if line_text.strip():
-
-                        lines.append((line_number, line_y0, line_y1, line_text))
-
-                        line_number += 1
-
- 
-
-            for keyword in keywords:
-
-                if keyword == '((regex))':
-
-                    words = page.get_text("words")  # Extract all words on the page
-
-                    for word_data in words:
-
-                        if bool(re.compile(self.regex_string).fullmatch(word_data[4])):
-
-                            # inst = fitz.Rect(word_data[0], word_data[1], word_data[2], word_data[3])
-
-                            y0 = word_data[1]
-
-                            y1 = word_data[3]
-
-                            line_text = None
-
- 
-
-                            for line_num, line_y0, line_y1, text in lines:
-
-                                if abs(line_y0 - y0) < 2 and abs(line_y1 - y1) < 2:
-
-                                    line_text = text
-
-                                    break
-
- 
-
-                            if line_text:
-
-                                snippet = line_text[:20] + "..."
-
-                                keyword_positions[keyword].append((page_num, line_num, snippet))
-
-                elif keyword != '':
-
-                    text_instances = page.search_for(keyword)
-
-                    for inst in text_instances:
-
-                        y0 = inst.y0
-
-                        y1 = inst.y1
-
-                        line_text = None
-
- 
-
-                        for line_num, line_y0, line_y1, text in lines:
-
-                            if abs(line_y0 - y0) < 2 and abs(line_y1 - y1) < 2:
-
-                                line_text = text
-
-                                break
-
- 
-
-                        if line_text:
-
-                            snippet = line_text[:20] + "..."
-
-                            keyword_positions[keyword].append((page_num, line_num, snippet))
-
- 
-
-        document.close()
-
- 
-
-        return keyword_positions
-
-
- 
-
-    def populate_keyword_list(self, keywords):
-
-        self.keywordList.clear()
-
-        colors = [QColor("magenta"), QColor("red"), QColor("blue"), QColor("pink"), QColor("orange"), QColor("green"), QColor("yellow"), QColor("cyan")]
-
- 
-
-        for i, keyword in enumerate(keywords):
-
-            if keyword == '((regex))':
-
-                item = QListWidgetItem(keyword)
-
-                item.setBackground(colors[len(keywords)-1 % len(colors)])
-
-                self.keywordList.addItem(item)
-
-            elif keyword != '':
-
-                item = QListWidgetItem(keyword)
-
-                item.setBackground(colors[i % len(colors)])
-
-                self.keywordList.addItem(item)
-
-           
-
- 
-
-    def on_keyword_selected(self, item):
-
-        selected_keyword = item.text()
-
-        self.populate_page_line_list(selected_keyword)
-
- 
-
-    def scroll_keyword_up(self):
-
-        selected_items = self.keywordList.selectedItems()
-
-        if not selected_items:
-
-            return
-
- 
-
-        selected_keyword = selected_items[0].text()
-
- 
-
-        if selected_keyword in self.keyword_positions:
-
-            current_page = self.pdf_viewer.current_page
-
-            pages = [pos[0] for pos in self.keyword_positions[selected_keyword]]
-
-            previous_pages = [p for p in pages if p < current_page]
-
- 
-
-            if previous_pages:
-
-                self.pdf_viewer.scroll_to_page(previous_pages[-1])
-
-            else:
-
-                self.pdf_viewer.scroll_to_page(pages[-1])
-
- 
-
-            self.populate_page_line_list(selected_keyword)
-
- 
-
-    def scroll_keyword_down(self):
-
-        selected_items = self.keywordList.selectedItems()
-
- 
-
-        if not selected_items:
-
-            return
-
- 
-
-        selected_keyword = selected_items[0].text()
-
-        if selected_keyword in self.keyword_positions:
-
-            current_page = self.pdf_viewer.current_page
-
-            pages = [pos[0] for pos in self.keyword_positions[selected_keyword]]
-
-            next_pages = [p for p in pages if p > current_page]
-
-            if next_pages:
-
-                self.pdf_viewer.scroll_to_page(next_pages[0])
-
-            else:
-
-                self.pdf_viewer.scroll_to_page(pages[0])
-
- 
-
-            self.populate_page_line_list(selected_keyword)
-
- 
-
-
-    def populate_page_line_list(self, keyword):
-
-        self.page_line_list.clear()
-
-        if keyword in self.keyword_positions:
-
-            for page_num, y_pos, snippet in self.keyword_positions[keyword]:
-
-                item = QListWidgetItem(f"Page {page_num + 1}: Line {int(y_pos)} | {snippet}")
-
-                item.setData(Qt.UserRole, (page_num, y_pos))
-
-                self.page_line_list.addItem(item)
-
- 
-
-
-    def navigate_to_page_line(self, item):
-
-        page_num, y_pos = item.data(Qt.UserRole)
-
-        self.pdf_viewer.scroll_to_page(page_num)
-
-        scroll_value = self.pdf_viewer.scrollArea.verticalScrollBar().value() + y_pos + 2
-
-        self.pdf_viewer.scrollArea.verticalScrollBar().setValue(scroll_value)
-
- 
-
-
-    def closeEvent(self, event):
-
-        self.pdf_viewer.close_pdf()
-
-        for temp_file in self.temp_files:
-
-            try:
-
-                os.remove(temp_file)
-
-            except:
-
-                pass
-
-        event.accept()
-
- 
-
-
-if __name__ == '__main__':
-
-    app = QApplication(sys.argv)
-
-    ex = PDFHighlighter()
-
-    ex.show()
-
-    sys.exit(app.exec_())
+import sys
+import re
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QFileDialog, QGraphicsTransform, QSizePolicy, QProgressBar,
+    QPushButton, QTextEdit, QScrollArea, QListWidget, QListWidgetItem, QHBoxLayout, QSplitter, QItemDelegate, QGroupBox,
+    QMessageBox, QAbstractScrollArea, QStackedWidget, QLineEdit, QColorDialog
+)
+from PyQt5.QtGui import QPixmap, QImage, QColor, QFont, QFontDatabase, QTransform, QPainter, QIcon, QIntValidator
+from PyQt5.QtCore import Qt, QSize, QRectF, QThread, QEvent, QTimer, pyqtSignal
+import os
+import io
+import threading
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+import multiprocessing
+from backends import fitz, warm_up  # Document libraries are imported on first use
+from search_engine import (
+    SearchEngine, FolderScan, search_file, collect_files, refresh_index, find_xlsx_cells, PDF_SEARCH_FLAGS
+)
+from matcher import SearchQuery
+from search_index import SearchIndex
+from search_stats import FileTimer, SearchStats, NULL_TIMER, PHASES
+from progress import Throttle, ProgressThrottle, Batcher, SearchProgress
+from cancellation import CancelToken, SearchCancelled
+from text_files import TextLines
+from output_cache import OutputCache
+ 
+# Highlighted documents generated for DOCX, PPTX, XLSX and MSG results, kept between sessions
+output_cache = OutputCache()
+ 
+# Highlight color of each keyword by its position in the keyword list; the regex takes the last position
+HIGHLIGHT_COLORS = ["magenta", "red", "blue", "pink", "orange", "green", "yellow", "cyan"]
+ 
+ 
+class LineIndex:
+    """Text lines of a PDF page sorted by their top edge, for mapping matches to line numbers."""
+ 
+    def __init__(self, page):
+        lines = []
+        line_number = 1
+ 
+        # Lines are numbered in reading order, skipping empty ones
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                line_bbox = line["bbox"]
+                line_text = " ".join([span["text"] for span in line["spans"] if span["text"].strip() != ""])
+ 
+                if line_text.strip():
+                    lines.append((line_bbox[1], line_bbox[3], line_number, line_text))
+                    line_number += 1
+ 
+        self.lines = sorted(lines, key=lambda line: line[0])
+        self.tops = [line[0] for line in self.lines]
+ 
+    def find(self, rect, tolerance=2):
+        # (line number, text) of the first line whose top and bottom are within
+        # the tolerance of the rect's, or None. Only lines with a close top are checked.
+        start = bisect_right(self.tops, rect.y0 - tolerance)
+        end = bisect_left(self.tops, rect.y0 + tolerance)
+        found = None
+ 
+        for line_y0, line_y1, line_num, text in self.lines[start:end]:
+            if abs(line_y1 - rect.y1) < tolerance and (found is None or line_num < found[0]):
+                found = (line_num, text)
+ 
+        return found
+ 
+    def snippet(self, text):
+        return text[:20] + "..."
+ 
+ 
+class HighlightThread(QThread):
+    # Lines listed per keyword of a text file; a log can match millions of times
+    MAX_TEXT_HITS = 10000
+ 
+    highlight_complete = pyqtSignal(str, object, object, object)  # Emits the name, the in-memory PDF (None to show the original), its hits and overlay quads
+    text_highlight_complete = pyqtSignal(str, object, object)  # Emits the path, the TextLines and the hits of a text file
+    error = pyqtSignal(str)
+    file_timed = pyqtSignal(object)                      # Emits the timing record of the highlighted file
+ 
+    def __init__(self, file_path, keywords, regex_string, file_extension, query=None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.keywords = keywords
+        self.regex_string = regex_string
+        self.file_extension = file_extension
+        self.query = query or SearchQuery(keywords, regex_string)  # Compiled once per search
+        self.cancel = CancelToken()  # Checked at every page, row, slide and paragraph
+ 
+    def run(self):
+        timer = FileTimer(self.file_path, 'highlight')
+ 
+        try:
+            timer.stat(self.file_path)
+            hits = None
+            lines = None
+            highlights = None
+ 
+            with timer.phase('highlight'):
+                if self.file_extension == '.txt':
+                    # Shown as text by the TextViewer, which paints the highlights of the visible lines
+                    lines, hits = self.highlight_keywords_in_txt(self.file_path, self.keywords)
+                elif self.file_extension == '.pdf':
+                    # The original pages are shown, the viewer paints the highlights over them
+                    hits, highlights = self.find_keywords_in_pdf(self.file_path, self.keywords)
+                    highlighted_file_path, pdf_data = self.file_path, None
+                elif self.file_extension in ['.docx', '.pptx', '.xlsx', '.msg']:
+                    highlighted_file_path, pdf_data = self.generate_highlighted_pdf(timer)
+                else:
+                    return
+ 
+            if hits is None:
+                with timer.phase('match'):
+                    hits = self.find_hits(pdf_data, self.keywords)
+ 
+            self.file_timed.emit(timer.finish(True))
+            if lines is not None:
+                self.text_highlight_complete.emit(self.file_path, lines, hits)
+            else:
+                self.highlight_complete.emit(highlighted_file_path, pdf_data, hits, highlights)
+        except SearchCancelled:
+            # Another file was opened or the window closed, nothing to report
+            pass
+        except Exception as e:
+            self.file_timed.emit(timer.finish(None))
+            self.error.emit(str(e))
+ 
+    def generate_highlighted_pdf(self, timer):
+        # The highlighted summary PDF of a DOCX, PPTX, XLSX or MSG file, from the output
+        # cache when the file was opened with the same keywords before
+        highlighters = {
+            '.docx': self.highlight_keywords_in_docx,
+            '.pptx': self.highlight_keywords_in_pptx,
+            '.xlsx': self.highlight_keywords_in_xlsx,
+            '.msg': self.highlight_keywords_in_msg,
+        }
+        base, _ = os.path.splitext(self.file_path)
+        highlighted_file_path = f"{base}_highlighted_{'_'.join(self.keywords)}.pdf"
+ 
+        with timer.phase('cache'):
+            key = output_cache.key(self.file_path, self.keywords, self.regex_string)
+            pdf_data = output_cache.get(key)
+ 
+        if pdf_data is None:
+            # Failures raise to run(), which reports them, so nothing is cached for them
+            highlighted_file_path, pdf_data = highlighters[self.file_extension](self.file_path, self.keywords)
+            if pdf_data is not None:
+                with timer.phase('cache'):
+                    output_cache.put(key, pdf_data)
+ 
+        return highlighted_file_path, pdf_data
+ 
+    def match_regex(self, word):
+        # Match the word against the pattern compiled once for the whole search
+        return self.query.match_word(word)
+ 
+    def check_cancelled(self, *args):
+        # Also the page callback of the reportlab builds, which get (canvas, doc)
+        self.cancel.check()
+ 
+    def highlight_words(self, text, keywords, matcher, colors):
+        # Check the whole paragraph once, then only test words against the keywords it contains
+        present_keywords = matcher.find(text)
+        present_keywords = [keyword for keyword in matcher.keywords if keyword in present_keywords]
+        highlighted_words = []
+ 
+        for word in text.split():
+            keyword = matcher.first_match(word, present_keywords)
+ 
+            if keyword is not None:
+                text_split = word.lower().split(keyword)
+                for j in range(len(text_split)):
+                    highlighted_words.append(text_split[j])
+                    if j != len(text_split)-1:
+                        highlighted_word = f'<span bgcolor="{colors[matcher.indexes[keyword] % len(colors)]}">{keyword}</span>'
+                        highlighted_words.append(highlighted_word)
+ 
+            elif '((regex))' in keywords and self.match_regex(word):
+                highlighted_word = f'<span bgcolor="{colors[(len(keywords) - 1) % len(colors)]}">{word}</span>'
+                highlighted_words.append(highlighted_word)
+ 
+            else:
+                highlighted_words.append(word)
+ 
+        return ' '.join(highlighted_words)
+ 
+    def find_keywords_in_pdf(self, pdf_path, keywords):
+        # The hits and {page: [(keyword, quads)]} of a PDF; the document itself is not changed,
+        # so its rendered pages stay valid for every keyword set
+        document = fitz.open(pdf_path)
+        hits = []
+        highlights = {}
+ 
+        for page_num in range(len(document)):
+            self.check_cancelled()
+            page = document.load_page(page_num)
+            page_matches = self.find_page_matches(page, keywords)
+ 
+            page_highlights = [(keyword, quads) for _, keyword, quads in page_matches if quads]
+            if page_highlights:
+                highlights[page_num] = page_highlights
+ 
+            self.add_hits(hits, page, page_num, page_matches)
+ 
+        document.close()
+        return hits, highlights
+ 
+    def find_page_matches(self, page, keywords):
+        # Returns (color index, keyword, quads) for every keyword and the regex on the page
+        matcher = self.query.matcher
+        page_matches = []
+ 
+        # Extract the page text once and only search for the keywords it contains
+        textpage = page.get_textpage(flags=PDF_SEARCH_FLAGS)
+        present_keywords = matcher.find(' '.join(page.get_text(textpage=textpage).split()))
+ 
+        for i, keyword in enumerate(keywords):
+            if keyword != '' and keyword != '((regex))' and keyword.lower() in present_keywords:
+                page_matches.append((i, keyword, page.search_for(keyword, quads = True, textpage = textpage)))
+ 
+            # Words matching the regex
+            if keyword == '((regex))':
+                words = page.get_text("words")  # Extract all words on the page
+                quads = [fitz.Rect(word_data[:4]).quad for word_data in words if self.match_regex(word_data[4])]
+                page_matches.append((len(keywords) - 1, keyword, quads))
+ 
+        return page_matches
+ 
+    def add_hits(self, hits, page, page_num, page_matches):
+        # One hit per match with the text line it sits on, which the keyword
+        # list, the page/line list and the Up/Down buttons use directly
+        if not any(quads for _, _, quads in page_matches):
+            return
+ 
+        # Built once per page, every match is then mapped to its line with a bisect
+        line_index = LineIndex(page)
+ 
+        for _, keyword, quads in page_matches:
+            for quad in quads:
+                line = line_index.find(quad.rect)
+ 
+                if line:
+                    line_num, text = line
+                    hits.append({
+                        "keyword": keyword,
+                        "page": page_num,
+                        "quad": quad,
+                        "line": line_num,
+                        "snippet": line_index.snippet(text),
+                    })
+ 
+    def find_hits(self, pdf_data, keywords):
+        # Hits of a generated summary PDF, found here so the GUI thread does not search it again
+        document = fitz.open(stream=pdf_data, filetype='pdf')
+        hits = []
+ 
+        for page_num in range(len(document)):
+            self.check_cancelled()
+            page = document.load_page(page_num)
+            self.add_hits(hits, page, page_num, self.find_page_matches(page, keywords))
+ 
+        document.close()
+ 
+        return hits
+ 
+    def highlight_keywords_in_txt(self, txt_path, keywords):
+        # One hit per keyword and line, found chunk by chunk in the memory-mapped file.
+        # The TextLines are returned open for the viewer.
+        matcher = self.query.matcher
+        lines = TextLines(txt_path)
+        hits = []
+        counts = {keyword: 0 for keyword in keywords}
+        first_line = 0  # Lines before the chunk
+ 
+        try:
+            for chunk in lines.text_file.chunks():
+                self.check_cancelled()
+                text = chunk.text()
+                text_lower = text.lower()
+                breaks = None
+ 
+                for keyword in keywords:
+                    if counts[keyword] >= self.MAX_TEXT_HITS:
+                        continue
+                    if keyword == '((regex))':
+                        positions = (start for start, _ in self.query.regex.finditer(text))
+                    elif keyword != '' and keyword.lower() in text_lower:
+                        positions = matcher.positions(text_lower, keyword.lower())
+                    else:
+                        continue
+ 
+                    if breaks is None:
+                        breaks = [match.start() for match in re.finditer('\n', text)]
+                    last_line = None
+ 
+                    for position in positions:
+                        line_index = bisect_right(breaks, position)
+                        if line_index == last_line:
+                            continue
+                        last_line = line_index
+                        line_start = breaks[line_index - 1] + 1 if line_index else 0
+                        line_end = breaks[line_index] if line_index < len(breaks) else len(text)
+                        line_num = first_line + line_index
+                        # From the start of the matching word, logs often begin every line the same way
+                        word_start = max(text.rfind(' ', line_start, position) + 1, line_start)
+                        hits.append({
+                            "keyword": keyword,
+                            "page": line_num // TextViewer.LINES_PER_PAGE,
+                            "line": line_num + 1,
+                            "snippet": text[word_start:line_end][:20] + "...",
+                        })
+                        counts[keyword] += 1
+                        if counts[keyword] >= self.MAX_TEXT_HITS:
+                            break
+ 
+                first_line += text.count('\n')
+        except BaseException:
+            lines.close()
+            raise
+ 
+        return lines, hits
+ 
+    def convert_to_column_alphabet(self, num):
+        """Convert column number to Excel column alphabet."""
+        result = ''
+        while num > 0:
+            num, remainder = divmod(num - 1, 26)
+            result = chr(65 + remainder) + result
+        return result
+ 
+ 
+    def highlight_keywords_in_xlsx(self, xlsx_path, keywords):
+        # Name the summary PDF is exported under
+        base, _ = os.path.splitext(xlsx_path)
+        summary_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
+ 
+        keyword_positions = {keyword: [] for keyword in keywords}
+ 
+        # Cell hits for all keywords, matched column by column in bulk
+        sheet_hits = find_xlsx_cells(xlsx_path, self.query, self.cancel)
+ 
+        for sheet_name, hits in sheet_hits.items():
+            for keyword in keywords:
+                if keyword != '':
+                    for row, col, value in hits[keyword if keyword == '((regex))' else keyword.lower()]:
+                        # Add the keyword, sheet name, row number, and column number
+                        cell_position = {
+                            "sheet": sheet_name,
+                            "row": row,
+                            "col": self.convert_to_column_alphabet(col),
+                            "value": value
+                        }
+                        keyword_positions[keyword].append(cell_position)
+ 
+        # Filter out empty keyword lists
+        keyword_positions = {k: v for k, v in keyword_positions.items() if v}
+ 
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+ 
+        # Create an in-memory PDF buffer
+        buffer = io.BytesIO()
+        pdf = SimpleDocTemplate(buffer, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+ 
+        # Add a title to the PDF
+        story.append(Paragraph("Keyword Search Results for XLSX", styles['Title']))
+        story.append(Spacer(1, 12))
+ 
+        # Iterate over the found keyword positions
+        for keyword, positions in keyword_positions.items():
+            story.append(Paragraph(f"Keyword: {keyword}", styles['Heading2']))
+            story.append(Spacer(1, 12))
+ 
+            # Create a table with headers for displaying the results
+            data = [["Sheet Name", "Row", "Column", "Value"]]  # Header row
+ 
+            for position in positions:
+                sheet = position['sheet']
+                row = position['row']
+                col = position['col']
+                value = position['value']
+                data.append([sheet, row, col, value])  # Append the found position details
+ 
+            # Wrap long text values using Paragraph and Table
+            wrapped_data = []
+            for row_data in data:
+                wrapped_row = []
+                for cell in row_data:
+                    wrapped_row.append(Paragraph(str(cell), styles['Normal']))  # Convert cell to string for Paragraph
+                wrapped_data.append(wrapped_row)
+ 
+            # Create the table
+            table = Table(wrapped_data, colWidths=[100, 50, 50, 300])  # Set column widths
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Vertically align text
+            ]))
+ 
+            # Add the table to the story
+            story.append(table)
+            story.append(Spacer(1, 24))
+ 
+        # Build the PDF
+        pdf.build(story, onFirstPage=self.check_cancelled, onLaterPages=self.check_cancelled)
+ 
+        return summary_pdf_path, buffer.getvalue()
+ 
+    def highlight_keywords_in_pptx(self, pptx_path, keywords):
+        # Name the highlighted PDF is exported under
+        base, _ = os.path.splitext(pptx_path)
+        highlighted_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
+ 
+        from pptx import Presentation
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+ 
+        prs = Presentation(pptx_path)
+ 
+        # Create an in-memory PDF buffer
+        buffer = io.BytesIO()
+        pdf = SimpleDocTemplate(buffer, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+        colors = ['magenta', 'red', 'blue', 'pink', 'orange', 'green','yellow', 'cyan']
+        matcher = self.query.matcher
+ 
+        for slide in prs.slides:
+            self.check_cancelled()
+ 
+            for shape in slide.shapes:
+                if hasattr(shape, "text"):
+                    highlighted_text = Paragraph(self.highlight_words(shape.text, keywords, matcher, colors), styles['Normal'])
+                    story.append(highlighted_text)
+                    story.append(Spacer(1, 12))
+ 
+        pdf.build(story, onFirstPage=self.check_cancelled, onLaterPages=self.check_cancelled)
+ 
+        return highlighted_pdf_path, buffer.getvalue()
+ 
+ 
+    def highlight_keywords_in_docx(self, docx_path, keywords):
+        # Name the highlighted PDF is exported under
+        base, _ = os.path.splitext(docx_path)
+        highlighted_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
+ 
+        from docx import Document
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+ 
+        doc = Document(docx_path)
+   
+        # Create an in-memory PDF
+        buffer = io.BytesIO()
+        pdf = SimpleDocTemplate(buffer, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+        colors = ['magenta', 'red', 'blue', 'pink', 'orange', 'green', 'yellow', 'cyan']
+        matcher = self.query.matcher
+ 
+        for paragraph in doc.paragraphs:
+            self.check_cancelled()
+            highlighted_text = Paragraph(self.highlight_words(paragraph.text, keywords, matcher, colors), styles['Normal'])
+            story.append(highlighted_text)
+            story.append(Spacer(1, 12))
+ 
+        pdf.build(story, onFirstPage=self.check_cancelled, onLaterPages=self.check_cancelled)
+ 
+        return highlighted_pdf_path, buffer.getvalue()
+ 
+    def highlight_keywords_in_msg(self, msg_path, keywords):
+        # Name the highlighted PDF is exported under
+        base, _ = os.path.splitext(msg_path)
+        highlighted_pdf_path = f"{base}_highlighted_{'_'.join(keywords)}.pdf"
+ 
+        import extract_msg
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+ 
+        msg = extract_msg.Message(msg_path)
+        msg_content = msg.body  # Extract the email content (body)
+ 
+        # Create an in-memory PDF
+        buffer = io.BytesIO()
+        pdf = SimpleDocTemplate(buffer, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+        colors = ['magenta', 'red', 'blue', 'pink', 'orange', 'green', 'yellow', 'cyan']
+        matcher = self.query.matcher
+ 
+        # Create a paragraph for the highlighted content
+        highlighted_text = Paragraph(self.highlight_words(msg_content, keywords, matcher, colors), styles['Normal'])
+        story.append(highlighted_text)
+        story.append(Spacer(1, 12))
+ 
+        # Build the PDF
+        pdf.build(story, onFirstPage=self.check_cancelled, onLaterPages=self.check_cancelled)
+ 
+        return highlighted_pdf_path, buffer.getvalue()
+ 
+ 
+ 
+class SearchThread(QThread):
+    progress_within_file = pyqtSignal(int)         # Progress within a single file
+    update_current_file = pyqtSignal(str)          # Signal for updating current file
+    files_found = pyqtSignal(list)                 # Files with every keyword, in batches
+    search_complete = pyqtSignal()                 # Signal when the search is done
+    files_searched = pyqtSignal(int, int, float)   # Files searched, files to search and the ETA in seconds (-1 while unknown)
+    files_timed = pyqtSignal(list)                 # Timing records of the searched files, in batches
+ 
+    def __init__(self, folder_path, keywords, regex_string, file_extensions, workers=None, use_index=False, query=None, parent=None):
+        super().__init__(parent)
+        self.folder_path = folder_path
+        self.keywords = keywords
+        self.file_extensions = file_extensions
+        self.regex_string = regex_string
+        self.query = query or SearchQuery(keywords, regex_string)  # Compiled once per search
+        self.workers = workers or os.cpu_count() or 1  # Number of search processes
+        self.use_index = use_index                      # Narrow the files with the folder's inverted index
+ 
+        # Progress within a file is throttled, so long documents do not flood the event loop
+        self.file_progress = ProgressThrottle(self.progress_within_file.emit)
+ 
+        # Stop and pause, shared with the worker processes
+        self.cancel = CancelToken()
+        self.scan = None  # FolderScan of the running search
+ 
+    def run(self):
+        # Results and timings are sent in batches, the current file and count at most once per interval
+        found = Batcher(self.files_found.emit)
+        timed = Batcher(self.files_timed.emit)
+ 
+        try:
+            self.search_files(found, timed)
+        except SearchCancelled:
+            # Stopped, the files found so far are still reported
+            pass
+        finally:
+            # Send what is still batched. Completion is signalled even when the search
+            # failed, so the window does not stay in the searching state.
+            found.flush()
+            timed.flush()
+ 
+            self.search_complete.emit()
+ 
+    def search_files(self, found, timed):
+        if self.use_index:
+            # The index needs the whole file list, so the folder is collected first, smallest files first
+            files_to_search = self.filter_with_index(collect_files(self.folder_path, self.file_extensions))
+            self.scan = None
+            progress = SearchProgress(len(files_to_search), sum(file_size for _, file_size in files_to_search))
+        else:
+            # Files are searched while the folder is still being scanned
+            self.scan = FolderScan(self.folder_path, self.file_extensions, self.cancel).start()
+            files_to_search = self.scan
+            progress = SearchProgress(0, 0)
+ 
+        try:
+            # Two files are enough to decide whether the worker processes are worth starting
+            files_to_search = iter(files_to_search)
+            first_files = list(islice(files_to_search, 2))
+            files_to_search = chain(first_files, files_to_search)
+ 
+            if not first_files:
+                return
+ 
+            if self.workers > 1 and len(first_files) > 1:
+                if self.scan is not None:
+                    # Results keep coming back while the scan has no new file queued
+                    files_to_search = chain(first_files, self.scan.ready())
+                self.search_in_processes(files_to_search, progress, found, timed)
+            else:
+                self.search_in_thread(files_to_search, progress, found, timed)
+ 
+        finally:
+            if self.scan is not None:
+                self.scan.stop()
+ 
+        # The final count
+        self.report_progress(progress)
+ 
+    def search_in_thread(self, files_to_search, progress, found, timed):
+        report = Throttle()
+ 
+        for file_path, file_size in files_to_search:
+            self.cancel.check()
+            timer = FileTimer(file_path)
+ 
+            with timer.phase('signal'):
+                if report.ready():
+                    self.update_current_file.emit(file_path)
+                    self.report_progress(progress)
+ 
+            keyword_found = self.search_within_file(file_path, timer)
+            progress.advance(file_size)
+ 
+            with timer.phase('signal'):
+                if keyword_found:
+                    found.add(file_path)
+                else:
+                    found.tick()
+ 
+            timed.add(timer.finish(keyword_found))
+ 
+    def search_in_processes(self, files_to_search, progress, found, timed):
+        sizes = {}
+        engine = SearchEngine(self.query, self.workers, self.cancel)
+        report = Throttle()
+ 
+        def file_paths():
+            # Sizes are noted as the files are handed to the workers
+            for item in files_to_search:
+                if item is None:
+                    # The folder scan has no new file yet
+                    yield None
+                    continue
+ 
+                file_path, file_size = item
+                sizes[file_path] = file_size
+                yield file_path
+ 
+        # Results arrive in completion order, so the progress bar tracks finished files
+        for file_path, outcome in engine.search_timed(file_paths()):
+            self.cancel.check()
+            keyword_found, record = outcome or (None, None)
+            progress.advance(sizes[file_path])
+ 
+            if keyword_found:
+                found.add(file_path)
+            else:
+                found.tick()
+            if record is not None:
+                timed.add(record)
+ 
+            if report.ready():
+                self.update_current_file.emit(file_path)
+                self.report_progress(progress)
+                self.progress_within_file.emit(int((progress.files / max(progress.total_files, 1)) * 100))
+ 
+    def report_progress(self, progress):
+        # While the folder is being scanned, the total is the number of files found so far
+        if self.scan is not None:
+            progress.set_total(self.scan.files, self.scan.bytes, counting=not self.scan.done)
+ 
+        eta = progress.eta()
+        self.files_searched.emit(progress.files, progress.total_files, -1.0 if eta is None else eta)
+ 
+    def filter_with_index(self, files_to_search):
+        index = SearchIndex(self.folder_path)
+ 
+        try:
+            file_paths = [file_path for file_path, _ in files_to_search]
+            engine = SearchEngine(self.query, self.workers, self.cancel)
+            report = Throttle()
+ 
+            for file_path, indexed, total in refresh_index(index, file_paths, self.file_extensions, engine):
+                self.cancel.check()
+ 
+                if report.ready():
+                    self.update_current_file.emit(file_path)
+                    self.progress_within_file.emit(int((indexed / total) * 100))
+ 
+            candidates = index.query(self.keywords)
+ 
+        finally:
+            index.close()
+ 
+        if candidates is None:
+            return files_to_search
+ 
+        # Candidates are still verified by search_within_file, which reads the text cache
+        return [(file_path, file_size) for file_path, file_size in files_to_search if file_path in candidates]
+ 
+    def search_within_file(self, file_path, timer=None):
+        # Progress signals are timed as the 'signal' phase of the file
+        progress = (timer or NULL_TIMER).timed('signal', self.file_progress)
+        return search_file(file_path, self.query, progress, timer=timer, cancel=self.cancel)
+ 
+ 
+class VerticalLabel(QLabel):
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+ 
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setPen(QColor(85, 85, 85))
+        painter.setFont(QFont("Arial", 7))
+ 
+        painter.translate(self.width()-3, self.height()-14)
+        painter.rotate(-90)      
+ 
+        painter.drawText(0, 0, self.text())
+        painter.end()
+ 
+    def sizeHint(self):
+        return QSize(8, 1100)
+ 
+ 
+def add_highlight(page, quads, color):
+    # One annotation holding all quads of a keyword on the page, so its appearance
+    # stream is built once per keyword instead of once per match
+    highlight = page.add_highlight_annot(quads)
+    highlight.set_colors({"stroke": color})
+    highlight.update()
+ 
+ 
+def open_pdf(pdf_path, pdf_data=None):
+    # Highlighted documents live in memory, other PDFs are opened from disk
+    if pdf_data is not None:
+        return fitz.open(stream=pdf_data, filetype='pdf')
+    return fitz.open(pdf_path)
+ 
+ 
+class PageRenderThread(QThread):
+    """Renders PDF pages to QImages off the GUI thread, in the order they were requested."""
+    page_rendered = pyqtSignal(object, int, float, QImage)
+ 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.condition = threading.Condition()
+        self.pending = []
+        self.doc_key = None
+        self.pdf_path = None
+        self.pdf_data = None
+        self.doc = None
+        self.open_key = None
+        self.idle = True
+        self.running = True
+ 
+    def request(self, doc_key, pdf_path, pdf_data, page_nums, zoom_level):
+        # Replaces the pages still waiting, which are no longer the visible ones
+        with self.condition:
+            self.doc_key = doc_key
+            self.pdf_path = pdf_path
+            self.pdf_data = pdf_data
+            self.pending = [(page_num, zoom_level) for page_num in page_nums]
+            self.condition.notify_all()
+ 
+    def release(self):
+        # Drops the waiting pages and returns once the document is closed, so the file can be deleted
+        with self.condition:
+            self.pending = []
+            self.condition.notify_all()
+            while not self.idle:
+                self.condition.wait()
+ 
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.wait()
+ 
+    def next_request(self):
+        with self.condition:
+            self.idle = False
+            while self.running and not self.pending:
+                if self.doc:
+                    self.doc.close()
+                    self.doc = None
+                    self.open_key = None
+                self.idle = True
+                self.condition.notify_all()
+                self.condition.wait()
+                self.idle = False
+ 
+            if not self.running:
+                self.idle = True
+                self.condition.notify_all()
+                return None
+ 
+            page_num, zoom_level = self.pending.pop(0)
+            return self.doc_key, self.pdf_path, self.pdf_data, page_num, zoom_level
+ 
+    def run(self):
+        # A single worker with its own document: MuPDF objects must not be shared between threads
+        while True:
+            request = self.next_request()
+            if request is None:
+                break
+ 
+            doc_key, pdf_path, pdf_data, page_num, zoom_level = request
+ 
+            try:
+                if self.open_key != doc_key:
+                    if self.doc:
+                        self.doc.close()
+                    self.doc = open_pdf(pdf_path, pdf_data)
+                    self.open_key = doc_key
+ 
+                pix = self.doc.load_page(page_num).get_pixmap(matrix=fitz.Matrix(zoom_level, zoom_level))
+                # Copied because the pixmap's buffer is freed with it
+                image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888).copy()
+            except Exception as e:
+                continue
+ 
+            self.page_rendered.emit(doc_key, page_num, zoom_level, image)
+ 
+        if self.doc:
+            self.doc.close()
+            self.doc = None
+ 
+ 
+class PageLabel(QLabel):
+    """A page of the PDFViewer, with the keyword highlights painted over its pixmap."""
+ 
+    def __init__(self, viewer, page_num):
+        super().__init__()
+        self.viewer = viewer
+        self.page_num = page_num
+ 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        highlights = self.viewer.page_highlights(self.page_num)
+        if not highlights:
+            return
+ 
+        # Multiplied like a highlighter pen, so the text stays readable under any color
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode_Multiply)
+        scale = self.width() / self.viewer.page_rects[self.page_num].width
+ 
+        for keyword, rects in highlights:
+            color = self.viewer.highlight_colors.get(keyword)
+            if color is None:
+                continue
+            for x0, y0, x1, y1 in rects:
+                painter.fillRect(QRectF(x0 * scale, y0 * scale, (x1 - x0) * scale, (y1 - y0) * scale), color)
+        painter.end()
+ 
+ 
+class PDFViewer(QWidget):
+    # Pages rendered above and below the visible ones, so scrolling does not show blank pages
+    RENDER_MARGIN = 2
+    # Memory kept for cached page pixmaps before the least recently shown ones are dropped
+    RENDER_BUDGET = 256 * 1024 * 1024
+ 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.zoom_level = 1.0
+        self.current_page = 0
+        self.doc = None
+        self.highlights = {}         # {page: [(keyword, quads)]} painted over the pages
+        self.highlight_rects = {}    # The same as rects in shown page coordinates, filled when a page is painted
+        self.highlight_colors = {}   # Color of every shown keyword, hidden keywords are left out
+        self.page_labels = []
+        self.shown_pages = {}
+        self.pixmap_cache = OrderedDict()
+        self.cache_size = 0
+ 
+        self.render_thread = PageRenderThread(self)
+        self.render_thread.page_rendered.connect(self.on_page_rendered)
+        self.render_thread.start()
+        QApplication.instance().aboutToQuit.connect(self.render_thread.stop)
+ 
+        self.initUI()
+ 
+    def initUI(self):
+        self.layout = QVBoxLayout()
+         #--Credit label DAO-----------------------------------------------------------------------------#
+ 
+        self.credit_label = QPushButton('https://github.com/nilayp99/Smart-Key-Search', self)
+        self.credit_label.setStyleSheet("font-weight: bold")
+        self.credit_label.setFont(QFont('Arial', 7))
+        self.layout.addWidget(self.credit_label)
+        #-----------------------------------------------------------------------------------------------#
+ 
+        #--Scroll Area----------------------------------------------------------------------------------#
+ 
+        self.scrollArea = QScrollArea()
+        self.scrollWidget = QWidget()
+        self.scrollLayout = QVBoxLayout()
+        self.scrollLayout.setAlignment(Qt.AlignCenter)
+        self.scrollWidget.setLayout(self.scrollLayout)
+        self.scrollArea.setWidget(self.scrollWidget)
+        self.scrollArea.setWidgetResizable(True)
+        self.scrollArea.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.layout.addWidget(self.scrollArea)
+ 
+        #----------------------------------------------------------------------------------------------#
+
+ 
+        #--Bottom Functions----------------------------------------------------------------------------#
+ 
+        self.button_layout = QHBoxLayout()
+        # self.button_layout.addStretch()
+ 
+
+        self.file_name_label = QLabel(self)
+        self.file_name_label.setFixedSize(QSize(315, 18))
+        self.button_layout.addWidget(self.file_name_label, alignment=Qt.AlignCenter | Qt.AlignLeft)
+
+ 
+        self.page_label = QLabel(self)
+        self.page_label.setFixedSize(QSize(150, 30))
+        self.page_label.setAlignment(Qt.AlignRight | Qt.AlignCenter)
+        self.button_layout.addWidget(self.page_label)
+
+ 
+        self.zoom_out_button = QPushButton('-', self)
+        self.zoom_out_button.setFixedSize(QSize(30, 30))
+        self.zoom_out_button.clicked.connect(self.zoom_out)
+        self.button_layout.addWidget(self.zoom_out_button)
+
+ 
+        self.zoom_in_button = QPushButton('+', self)
+        self.zoom_in_button.setFixedSize(QSize(30, 30))
+        self.zoom_in_button.clicked.connect(self.zoom_in)
+        self.button_layout.addWidget(self.zoom_in_button)
+ 
+ 
+        self.export_button = QPushButton('Export', self)
+        self.export_button.setFixedSize(QSize(60, 30))
+        self.export_button.clicked.connect(self.export_pdf)
+        self.button_layout.addWidget(self.export_button)
+
+ 
+        self.layout.addLayout(self.button_layout)
+ 
+        #----------------------------------------------------------------------------------------------#
+ 
+        self.setLayout(self.layout)
+        self.scrollArea.viewport().installEventFilter(self)
+ 
+
+    def eventFilter(self, source, event):
+        # A larger viewport can show pages that were not rendered yet
+        if event.type() == QEvent.Resize and self.doc:
+            self.render_visible_pages()
+        return super(PDFViewer, self).eventFilter(source, event)
+
+ 
+    def clear_layout(self, layout):
+        if layout is not None:
+            while layout.count():
+                child = layout.takeAt(0)
+                if child.widget():
+                    child.widget().deleteLater()
+
+ 
+    def display_pdf(self, pdf_path, page_num=0, pdf_data=None, highlights=None):
+        # pdf_path names the document, pdf_data holds it when it only exists in memory
+        self.pdf_path = pdf_path
+        self.pdf_data = pdf_data
+        self.highlights = highlights or {}
+        self.highlight_rects = {}
+        self.file_name_label.setText(os.path.splitext(os.path.basename(pdf_path).split('_highlighted')[0])[0]+'.pdf')
+ 
+        if hasattr(self, 'pdf_path'):
+            self.doc = open_pdf(self.pdf_path, self.pdf_data)
+            self.clear_layout(self.scrollLayout)
+ 
+ 
+            # Rendered pages are cached by document version, page and zoom, so a generated
+            # document never shows the highlights of other keywords. Original PDFs keep their
+            # pages for every keyword set, their highlights are painted over them.
+            if pdf_data is not None:
+                self.doc_key = (os.path.abspath(pdf_path), hash(pdf_data))
+            else:
+                self.doc_key = (os.path.abspath(pdf_path), os.stat(pdf_path).st_mtime_ns)
+ 
+            # Pages start as empty placeholders of the right size, only the pages
+            # around the viewport are rendered (see render_visible_pages)
+            self.page_rects = [self.doc.load_page(p_num).rect for p_num in range(len(self.doc))]
+            self.page_labels = []
+            self.shown_pages = {}
+ 
+            for p_num in range(len(self.doc)):
+                self.add_page_to_layout(p_num)
+            self.update_page_tops()
+            self.current_page = page_num
+            self.scroll_to_page(page_num)
+            self.render_visible_pages()
+ 
+ 
+    def add_page_to_layout(self, page_num):
+        label = PageLabel(self, page_num)
+        label.setStyleSheet("background-color: white")
+        label.setFixedSize(self.page_size(page_num))
+        self.scrollLayout.addWidget(label)
+        self.page_labels.append(label)
+ 
+ 
+    def page_highlights(self, page_num):
+        # [(keyword, rects)] of a page, unzoomed and turned like the rendered page;
+        # the search quads are in the coordinates of the unrotated page
+        if page_num not in self.highlights:
+            return None
+        if page_num not in self.highlight_rects:
+            page = self.doc.load_page(page_num)
+            rects = []
+            for keyword, quads in self.highlights[page_num]:
+                if page.rotation:
+                    quads = [quad * page.rotation_matrix for quad in quads]
+                rects.append((keyword, [tuple(quad.rect) for quad in quads]))
+            self.highlight_rects[page_num] = rects
+        return self.highlight_rects[page_num]
+ 
+    def set_highlight_colors(self, colors):
+        # Recoloring or hiding a keyword only repaints the shown pages, nothing is rendered again
+        self.highlight_colors = colors
+        for page_num in self.shown_pages:
+            self.page_labels[page_num].update()
+ 
+    def zoom_bucket(self):
+        # Zoom steps are 0.1, rounding keeps float drift out of the cache keys
+        return max(round(self.zoom_level, 1), 0.1)
+ 
+ 
+    def page_size(self, page_num):
+        # Same size get_pixmap produces at the current zoom, without rendering the page
+        zoom = self.zoom_bucket()
+        rect = (self.page_rects[page_num] * fitz.Matrix(zoom, zoom)).irect
+        return QSize(rect.width, rect.height)
+ 
+ 
+    def render_visible_pages(self):
+        if not self.doc or not self.page_labels:
+            return
+ 
+        scroll_value = self.scrollArea.verticalScrollBar().value()
+        first_visible = max(bisect_right(self.page_tops, scroll_value) - 1, 0)
+        last_visible = max(bisect_right(self.page_tops, scroll_value + self.scrollArea.viewport().height()) - 1, 0)
+ 
+        first_page = max(first_visible - self.RENDER_MARGIN, 0)
+        last_page = min(last_visible + self.RENDER_MARGIN, len(self.page_labels) - 1)
+        self.render_range = (first_page, last_page)
+ 
+        # Visible pages are rendered first, then the margins around them
+        page_nums = list(range(first_visible, last_visible + 1))
+        page_nums += [p for p in range(first_page, last_page + 1) if p not in page_nums]
+ 
+        zoom = self.zoom_bucket()
+        missing = []
+ 
+        for page_num in page_nums:
+            key = (self.doc_key, page_num, zoom)
+            if key in self.pixmap_cache:
+                self.pixmap_cache.move_to_end(key)
+                self.show_page(page_num, key)
+            else:
+                if page_num not in self.shown_pages:
+                    self.preview_page(page_num)
+                missing.append(page_num)
+ 
+        self.render_thread.request(self.doc_key, self.pdf_path, self.pdf_data, missing, zoom)
+ 
+        # Off-screen labels give their pixmaps back, the cache decides what stays in memory
+        for page_num in list(self.shown_pages):
+            if not first_page <= page_num <= last_page:
+                self.page_labels[page_num].setPixmap(QPixmap())
+                del self.shown_pages[page_num]
+ 
+ 
+    def show_page(self, page_num, key):
+        if self.shown_pages.get(page_num) != key:
+            self.page_labels[page_num].setPixmap(self.pixmap_cache[key])
+            self.shown_pages[page_num] = key
+ 
+ 
+    def preview_page(self, page_num):
+        # Until the sharp page arrives, stretch what the label shows or a copy cached at another zoom
+        label = self.page_labels[page_num]
+        pixmap = label.pixmap()
+ 
+        if pixmap is None or pixmap.isNull():
+            pixmap = None
+            for (doc_key, cached_page, _), cached in reversed(self.pixmap_cache.items()):
+                if doc_key == self.doc_key and cached_page == page_num:
+                    pixmap = cached
+                    break
+ 
+        if pixmap is not None:
+            label.setPixmap(pixmap.scaled(label.size(), Qt.IgnoreAspectRatio, Qt.FastTransformation))
+            self.shown_pages[page_num] = None
+ 
+ 
+    def on_page_rendered(self, doc_key, page_num, zoom, image):
+        if doc_key != self.doc_key:
+            return
+ 
+        key = (doc_key, page_num, zoom)
+        pixmap = QPixmap.fromImage(image)
+        self.pixmap_cache[key] = pixmap
+        self.cache_size += pixmap.width() * pixmap.height() * pixmap.depth() // 8
+ 
+        # Least recently shown pixmaps go first
+        while self.cache_size > self.RENDER_BUDGET and len(self.pixmap_cache) > 1:
+            _, evicted = self.pixmap_cache.popitem(last=False)
+            self.cache_size -= evicted.width() * evicted.height() * evicted.depth() // 8
+ 
+        first_page, last_page = self.render_range
+        if key in self.pixmap_cache and zoom == self.zoom_bucket() and first_page <= page_num <= last_page:
+            self.show_page(page_num, key)
+ 
+ 
+    def update_page_tops(self):
+        # Top of every page inside the scroll widget, computed from the placeholder
+        # sizes so it is right before Qt has laid the widgets out
+        _, top, _, _ = self.scrollLayout.getContentsMargins()
+        spacing = self.scrollLayout.spacing()
+        self.page_tops = []
+ 
+        for label in self.page_labels:
+            self.page_tops.append(top)
+            top += label.height() + spacing
+ 
+        self.scrollWidget.setMinimumHeight(top)
+ 
+ 
+    def scroll_to_page(self, page_num):
+        self.scrollArea.verticalScrollBar().setValue(self.page_tops[page_num])
+        self.current_page = page_num
+        self.update_page_label()
+ 
+ 
+    def zoom_in(self):
+        try:
+            self.zoom_level += 0.1
+            self.update_zoom()
+        except:
+            pass
+ 
+ 
+    def zoom_out(self):
+        try:
+            if self.zoom_level > 0.1:
+                self.zoom_level -= 0.1
+            self.update_zoom()
+        except:
+            pass
+ 
+ 
+    def update_zoom(self):
+        # Resize the placeholders and show the current pixmaps stretched while
+        # the visible pages are rendered again in the background
+        for page_num, label in enumerate(self.page_labels):
+            label.setFixedSize(self.page_size(page_num))
+        for page_num in self.shown_pages:
+            self.preview_page(page_num)
+        self.update_page_tops()
+        self.scroll_to_page(self.current_page)
+        self.render_visible_pages()
+ 
+ 
+    def update_page_label(self):
+        self.page_label.setText(f"Page {self.current_page+1} of {len(self.doc)}")
+ 
+ 
+    def on_scroll(self):
+        scroll_value = self.scrollArea.verticalScrollBar().value()
+ 
+        try:
+            self.current_page = max(bisect_right(self.page_tops, scroll_value) - 1, 0)
+            self.update_page_label()
+            self.render_visible_pages()
+        except:
+            pass
+ 
+ 
+    def export_pdf(self):
+        # The highlighted document is only written to disk when the user asks for it
+        if not self.doc:
+            return
+ 
+        suggested_path = self.pdf_path
+        if self.highlights:
+            suggested_path = os.path.splitext(self.pdf_path)[0] + '_highlighted.pdf'
+        export_path, _ = QFileDialog.getSaveFileName(self, 'Export PDF', suggested_path, 'PDF Files (*.pdf)')
+ 
+        if export_path:
+            try:
+                if self.pdf_data is not None:
+                    with open(export_path, 'wb') as f:
+                        f.write(self.pdf_data)
+                else:
+                    self.export_highlighted(export_path)
+            except Exception as e:
+                QMessageBox.warning(self, 'Export PDF', f"Could not export the PDF: {e}")
+ 
+ 
+    def export_highlighted(self, export_path):
+        # The painted highlights become annotations of a copy, in the colors shown
+        document = open_pdf(self.pdf_path)
+        for page_num, highlights in self.highlights.items():
+            page = document.load_page(page_num)
+            for keyword, quads in highlights:
+                color = self.highlight_colors.get(keyword)
+                if color is not None:
+                    add_highlight(page, quads, color.getRgbF()[:3])
+        document.save(export_path)
+        document.close()
+ 
+    def scroll_to_hit(self, hit):
+        self.scroll_to_page(hit["page"])
+        # The hit is in PDF points from the top of the page, the page is shown at the viewer's zoom
+        scroll_value = self.scrollArea.verticalScrollBar().value() + int(hit["quad"].rect.y0 * self.zoom_bucket())
+        self.scrollArea.verticalScrollBar().setValue(scroll_value)
+ 
+    def close_pdf(self):
+        if self.doc:
+            self.render_thread.release()
+            self.doc.close()
+            self.doc = None
+            self.pdf_data = None
+            self.highlights = {}
+            self.highlight_rects = {}
+            self.clear_layout(self.scrollLayout)
+            self.page_labels = []
+            self.shown_pages = {}
+ 
+ 
+class TextLinesView(QAbstractScrollArea):
+    """Paints the visible lines of a TextLines with their keyword highlights; one scroll step is one line."""
+ 
+    def __init__(self, viewer):
+        super().__init__(viewer)
+        self.viewer = viewer
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.widest_line = 0
+ 
+    def line_height(self):
+        return self.fontMetrics().lineSpacing()
+ 
+    def visible_lines(self):
+        return max(self.viewport().height() // self.line_height(), 1)
+ 
+    def update_scroll_range(self):
+        lines = self.viewer.lines
+        count = len(lines) if lines else 0
+        self.verticalScrollBar().setRange(0, max(count - self.visible_lines(), 0))
+        self.verticalScrollBar().setPageStep(self.visible_lines())
+        # Lines are only measured when shown, so the width grows as wider lines scroll into view
+        self.horizontalScrollBar().setRange(0, max(self.widest_line - self.viewport().width(), 0))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+ 
+    def resizeEvent(self, event):
+        self.update_scroll_range()
+        super().resizeEvent(event)
+ 
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), Qt.white)
+        lines = self.viewer.lines
+        if not lines:
+            return
+ 
+        metrics = self.fontMetrics()
+        line_height = self.line_height()
+        first_line = self.verticalScrollBar().value()
+        last_line = min(first_line + self.visible_lines() + 1, len(lines))
+        gutter = metrics.horizontalAdvance(str(len(lines))) + 16
+        left = gutter - self.horizontalScrollBar().value()
+        widest_line = self.widest_line
+ 
+        painter.fillRect(0, 0, gutter - 8, self.viewport().height(), QColor("#EEEEEE"))
+        painter.setClipRect(gutter - 4, 0, self.viewport().width(), self.viewport().height())
+ 
+        for line_num in range(first_line, last_line):
+            top = (line_num - first_line) * line_height
+            text = lines.line(line_num, self.viewer.MAX_LINE_BYTES).expandtabs(4)
+            if line_num == self.viewer.marked_line:
+                painter.fillRect(gutter - 4, top, self.viewport().width(), line_height, QColor("#FFF3B0"))
+            for start, end, color in self.viewer.highlight_spans(text):
+                x = left + metrics.horizontalAdvance(text[:start])
+                painter.fillRect(x, top, metrics.horizontalAdvance(text[start:end]), line_height, color)
+            painter.setPen(Qt.black)
+            painter.drawText(left, top + metrics.ascent(), text)
+            widest_line = max(widest_line, gutter + metrics.horizontalAdvance(text))
+ 
+        painter.setClipping(False)
+        painter.setPen(QColor(85, 85, 85))
+        for line_num in range(first_line, last_line):
+            top = (line_num - first_line) * line_height
+            painter.drawText(0, top, gutter - 12, line_height, Qt.AlignRight, str(line_num + 1))
+        painter.end()
+ 
+        if widest_line > self.widest_line:
+            self.widest_line = widest_line
+            self.update_scroll_range()
+ 
+ 
+class TextViewer(QWidget):
+    """Shows TXT results straight from the memory-mapped file, laying out only the visible lines.
+ 
+    Pages are groups of LINES_PER_PAGE lines, so the keyword and page/line navigation
+    works the same as in the PDFViewer."""
+    LINES_PER_PAGE = 100
+    # Bytes of a line that are shown; minified or binary-like lines can be megabytes long
+    MAX_LINE_BYTES = 16 * 1024
+    # Opacity of the keyword highlights behind the text
+    HIGHLIGHT_ALPHA = 110
+ 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lines = None
+        self.query = None
+        self.keywords = []
+        self.highlight_colors = {}  # Color of every shown keyword, hidden keywords are left out
+        self.marked_line = None
+        self.initUI()
+ 
+    def initUI(self):
+        self.layout = QVBoxLayout()
+ 
+        #--Credit label DAO-----------------------------------------------------------------------------#
+        self.credit_label = QPushButton('https://github.com/nilayp99/Smart-Key-Search', self)
+        self.credit_label.setStyleSheet("font-weight: bold")
+        self.credit_label.setFont(QFont('Arial', 7))
+        self.layout.addWidget(self.credit_label)
+        #-----------------------------------------------------------------------------------------------#
+ 
+        self.text_view = TextLinesView(self)
+        self.text_view.verticalScrollBar().valueChanged.connect(self.update_page_label)
+        self.layout.addWidget(self.text_view)
+ 
+        #--Bottom Functions----------------------------------------------------------------------------#
+        self.button_layout = QHBoxLayout()
+ 
+        self.file_name_label = QLabel(self)
+        self.file_name_label.setFixedSize(QSize(315, 18))
+        self.button_layout.addWidget(self.file_name_label, alignment=Qt.AlignCenter | Qt.AlignLeft)
+ 
+        self.page_label = QLabel(self)
+        self.page_label.setFixedSize(QSize(220, 30))
+        self.page_label.setAlignment(Qt.AlignRight | Qt.AlignCenter)
+        self.button_layout.addWidget(self.page_label)
+ 
+        self.line_input = QLineEdit(self)
+        self.line_input.setPlaceholderText('Line')
+        self.line_input.setValidator(QIntValidator(1, 2 ** 31 - 1, self))
+        self.line_input.setFixedSize(QSize(80, 30))
+        self.line_input.returnPressed.connect(self.go_to_line)
+        self.button_layout.addWidget(self.line_input)
+ 
+        self.zoom_out_button = QPushButton('-', self)
+        self.zoom_out_button.setFixedSize(QSize(30, 30))
+        self.zoom_out_button.clicked.connect(self.zoom_out)
+        self.button_layout.addWidget(self.zoom_out_button)
+ 
+        self.zoom_in_button = QPushButton('+', self)
+        self.zoom_in_button.setFixedSize(QSize(30, 30))
+        self.zoom_in_button.clicked.connect(self.zoom_in)
+        self.button_layout.addWidget(self.zoom_in_button)
+ 
+        self.layout.addLayout(self.button_layout)
+        #----------------------------------------------------------------------------------------------#
+        self.setLayout(self.layout)
+ 
+    def display_text(self, file_path, lines, query, keywords, page_num=0):
+        self.lines = lines
+        self.query = query
+        self.keywords = keywords
+        self.marked_line = None
+        self.file_name_label.setText(os.path.basename(file_path))
+        self.text_view.widest_line = 0
+        self.text_view.horizontalScrollBar().setValue(0)
+        self.text_view.update_scroll_range()
+        self.scroll_to_page(page_num)
+        self.text_view.viewport().update()
+ 
+    def highlight_spans(self, text):
+        # (start, end, color) of every keyword and regex match in a line
+        matcher = self.query.matcher
+        text_lower = text.lower()
+        spans = []
+ 
+        for keyword in matcher.find(text):
+            color = self.highlight_color(self.keywords[matcher.indexes[keyword]])
+            if color is not None:
+                spans.extend((start, start + len(keyword), color) for start in matcher.positions(text_lower, keyword))
+ 
+        color = self.highlight_color('((regex))')
+        if self.query.regex is not None and color is not None:
+            spans.extend((start, end, color) for start, end in self.query.regex.finditer(text))
+ 
+        return spans
+ 
+    def highlight_color(self, keyword):
+        # Translucent, the text is painted over it
+        if keyword not in self.highlight_colors:
+            return None
+        color = QColor(self.highlight_colors[keyword])
+        color.setAlpha(self.HIGHLIGHT_ALPHA)
+        return color
+ 
+    def set_highlight_colors(self, colors):
+        self.highlight_colors = colors
+        self.text_view.viewport().update()
+ 
+    @property
+    def current_page(self):
+        return self.text_view.verticalScrollBar().value() // self.LINES_PER_PAGE
+ 
+    def page_count(self):
+        return (len(self.lines) + self.LINES_PER_PAGE - 1) // self.LINES_PER_PAGE
+ 
+    def scroll_to_page(self, page_num):
+        self.scroll_to_line(page_num * self.LINES_PER_PAGE, context=0)
+ 
+    def scroll_to_line(self, line_num, context=3):
+        # Shows the line with a few lines of context above it
+        if not self.lines:
+            return
+        self.text_view.verticalScrollBar().setValue(max(line_num - context, 0))
+        self.update_page_label()
+ 
+    def scroll_to_hit(self, hit):
+        self.marked_line = hit["line"] - 1
+        self.scroll_to_line(self.marked_line)
+        self.text_view.viewport().update()
+ 
+    def go_to_line(self):
+        if self.lines and self.line_input.text():
+            self.marked_line = min(int(self.line_input.text()), len(self.lines)) - 1
+            self.scroll_to_line(self.marked_line)
+            self.text_view.viewport().update()
+ 
+    def update_page_label(self):
+        if self.lines:
+            line_num = self.text_view.verticalScrollBar().value()
+            self.page_label.setText(f"Page {self.current_page+1} of {self.page_count()} | Line {line_num+1} of {len(self.lines)}")
+ 
+    def zoom_in(self):
+        self.set_font_size(self.text_view.font().pointSize() + 1)
+ 
+    def zoom_out(self):
+        self.set_font_size(self.text_view.font().pointSize() - 1)
+ 
+    def set_font_size(self, size):
+        if size >= 4:
+            font = self.text_view.font()
+            font.setPointSize(size)
+            self.text_view.setFont(font)
+            self.text_view.widest_line = 0
+            self.text_view.update_scroll_range()
+            self.text_view.viewport().update()
+ 
+    def close_text(self):
+        # The TextLines stay open in the window's cache of highlighted documents
+        self.lines = None
+        self.marked_line = None
+        self.page_label.clear()
+        self.file_name_label.clear()
+        self.text_view.update_scroll_range()
+        self.text_view.viewport().update()
+ 
+ 
+class PDFHighlighter(QMainWindow):
+    # Highlighted documents kept in memory for reopening, oldest dropped first
+    HIGHLIGHTED_DOCS_KEPT = 10
+ 
+    # Slowest files listed in the statistics panel, and how often it is refreshed while searching
+    SLOWEST_FILES_SHOWN = 10
+    STATS_REFRESH_MS = 500
+ 
+    def __init__(self):
+        super().__init__()
+        self.initUI()
+
+ 
+    def initUI(self):
+ 
+        self.setWindowTitle('Smart Key Search')
+        self.setGeometry(100, 100, 1200, 900)
+ 
+        self.setWindowIcon(QApplication.style().standardIcon(QApplication.style().SP_FileDialogContentsView))
+        self.layout = QHBoxLayout()
+        self.splitter = QSplitter(Qt.Horizontal)
+
+ 
+        #--Credits Section----------------------------------------------------------------------------------#
+ 
+        self.credit_label = VerticalLabel("       Original | https://github.com/nilayp99/Smart-Key-Search")
+        self.credit_label.setFixedSize(QSize(13, 800))
+        self.layout.addWidget(self.credit_label, alignment=Qt.AlignRight | Qt.AlignBottom)
+ 
+        #---------------------------------------------------------------------------------------------------
+ 
+ 
+        #--Left Section-------------------------------------------------------------------------------------#
+ 
+        self.left_panel = QWidget()
+        self.left_layout = QVBoxLayout()
+ 
+        #--Extension Selector------------------------------------------------------------------------------#
+ 
+        self.extensionGroupBox = QGroupBox(' Select Extension ')
+        self.extensionGroupBoxLayout = QVBoxLayout()
+ 
+        self.extension_selector_row_1 = QHBoxLayout()
+        self.extension_selector_row_2 = QHBoxLayout()
+ 
+        self.pdf_button = QPushButton("PDF", self)
+        self.docx_button = QPushButton("DOC", self)
+        self.txt_button = QPushButton("TXT", self)
+        self.xlsx_button = QPushButton("EXCEL", self)
+        self.ppt_button = QPushButton("PPT", self)
+        self.msg_button = QPushButton("OUTLOOK", self)
+
+ 
+        # Add buttons to the layout
+        self.extension_selector_row_1.addWidget(self.pdf_button)
+        self.extension_selector_row_1.addWidget(self.docx_button)
+        self.extension_selector_row_1.addWidget(self.txt_button)
+        self.extension_selector_row_2.addWidget(self.xlsx_button)
+        self.extension_selector_row_2.addWidget(self.ppt_button)
+        self.extension_selector_row_2.addWidget(self.msg_button)
+
+ 
+        # Connect the buttons to toggle functions
+        self.pdf_button.clicked.connect(lambda: self.toggle_button(self.pdf_button))
+        self.docx_button.clicked.connect(lambda: self.toggle_button(self.docx_button))
+        self.txt_button.clicked.connect(lambda: self.toggle_button(self.txt_button))
+        self.xlsx_button.clicked.connect(lambda: self.toggle_button(self.xlsx_button))
+        self.ppt_button.clicked.connect(lambda: self.toggle_button(self.ppt_button))
+        self.msg_button.clicked.connect(lambda: self.toggle_button(self.msg_button))
+
+        # Initialize button states (selected)
+        self.pdf_button.setProperty('selected', True)
+        self.docx_button.setProperty('selected', True)
+        self.txt_button.setProperty('selected', True)
+        self.xlsx_button.setProperty('selected', True)
+        self.ppt_button.setProperty('selected', True)
+        self.msg_button.setProperty('selected', True)
+ 
+        self.pdf_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
+        self.docx_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
+        self.txt_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
+        self.xlsx_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
+        self.ppt_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
+        self.msg_button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
+ 
+        self.extensionGroupBoxLayout.addLayout(self.extension_selector_row_1)
+        self.extensionGroupBoxLayout.addLayout(self.extension_selector_row_2)
+ 
+        self.extensionGroupBox.setLayout(self.extensionGroupBoxLayout)
+ 
+        self.left_layout.addWidget(self.extensionGroupBox)
+ 
+
+        #--Search Section-----------------------------------------------------------------------------------#
+ 
+        self.searchGroupBox = QGroupBox(' Search Folder ')
+        self.searchGroupBoxLayout = QVBoxLayout()
+ 
+        self.openFolderButton = QPushButton('Open Folder', self)
+        self.openFolderButton.clicked.connect(self.open_folder)
+        self.searchGroupBoxLayout.addWidget(self.openFolderButton)
+ 
+        # Add the new QLabel to display the selected folder path
+        self.folderPathLabel = QLabel('No folder selected', self)
+        self.folderPathLabel.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)  # Expands horizontally
+        self.folderPathLabel.setWordWrap(True)  # Allows the label to wrap text if the path is long
+        self.folderPathLabel.setStyleSheet("background-color: #333333; border: 1px solid #666; border-radius: 5px; padding: 5px; color: #DDDDDD;")
+ 
+        # Add the folderPathLabel to the layout below the "Open Folder" button
+        self.searchGroupBoxLayout.addWidget(self.folderPathLabel)
+ 
+        self.keywordInput = QTextEdit(self)
+        self.keywordInput.setPlaceholderText('Enter keywords separated by commas')
+        self.searchGroupBoxLayout.addWidget(self.keywordInput)
+ 
+        self.regexInput = QTextEdit(self)
+        self.regexInput.setPlaceholderText('Enter Regex')
+        self.regexInput.setFixedHeight(38)
+        self.searchGroupBoxLayout.addWidget(self.regexInput)
+ 
+        # Toggle for answering keyword searches from the folder's inverted index
+        self.index_button = QPushButton('Use Index', self)
+        self.index_button.setProperty('selected', False)
+        self.index_button.clicked.connect(lambda: self.toggle_button(self.index_button))
+        self.searchGroupBoxLayout.addWidget(self.index_button)
+ 
+        self.file_progress_bar = QProgressBar(self)
+        self.file_progress_bar.setVisible(False)  # Hide initially
+        self.searchGroupBoxLayout.addWidget(self.file_progress_bar)
+ 
+        self.total_progress_label = QLabel(self)
+        self.total_progress_label.setVisible(False)  # Hide initially
+        self.left_layout.addWidget(self.total_progress_label)
+ 
+        self.searchButton = QPushButton('Search', self)
+        self.searchButton.clicked.connect(self.search_keywords)
+        self.searchGroupBoxLayout.addWidget(self.searchButton)
+ 
+        # Pause and Stop for the running search
+        self.search_control_layout = QHBoxLayout()
+ 
+        self.pauseButton = QPushButton('Pause', self)
+        self.pauseButton.setEnabled(False)
+        self.pauseButton.clicked.connect(self.toggle_pause)
+        self.search_control_layout.addWidget(self.pauseButton)
+ 
+        self.stopButton = QPushButton('Stop', self)
+        self.stopButton.setEnabled(False)
+        self.stopButton.clicked.connect(self.stop_search)
+        self.search_control_layout.addWidget(self.stopButton)
+ 
+        self.searchGroupBoxLayout.addLayout(self.search_control_layout)
+ 
+        self.searchGroupBox.setLayout(self.searchGroupBoxLayout)
+        self.left_layout.addWidget(self.searchGroupBox)
+ 
+
+ 
+        #--File list Section--------------------------------------------------------------------------------#
+ 
+        self.fileListGroupBox = QGroupBox(' Results ')
+        self.fileListGroupBoxLayout = QVBoxLayout()
+ 
+        self.fileList = QListWidget(self)
+        self.fileList.itemClicked.connect(self.open_selected_pdf)
+        self.fileListGroupBoxLayout.addWidget(self.fileList)      
+ 
+        self.fileListGroupBox.setLayout(self.fileListGroupBoxLayout)
+ 
+        self.left_layout.addWidget(self.fileListGroupBox)
+ 
+        #--Statistics Section------------------------------------------------------------------------------#
+ 
+        self.statsGroupBox = QGroupBox(' Statistics ')
+        self.statsGroupBoxLayout = QVBoxLayout()
+ 
+        # Totals and where the time went, over the searched and highlighted files
+        self.stats_label = QLabel('No search yet.', self)
+        self.stats_label.setWordWrap(True)
+        self.statsGroupBoxLayout.addWidget(self.stats_label)
+ 
+        # Slowest files first, with their phase times as tooltip
+        self.slowest_list = QListWidget(self)
+        self.slowest_list.setFixedHeight(110)
+        self.statsGroupBoxLayout.addWidget(self.slowest_list)
+ 
+        self.export_stats_button = QPushButton('Export Statistics', self)
+        self.export_stats_button.clicked.connect(self.export_stats)
+        self.statsGroupBoxLayout.addWidget(self.export_stats_button)
+ 
+        self.statsGroupBox.setLayout(self.statsGroupBoxLayout)
+ 
+        self.left_layout.addWidget(self.statsGroupBox)
+ 
+        #---------------------------------------------------------------------------------------------------
+ 
+        # Label to show currently searched file
+        self.current_file_label = QLabel(self)
+        self.current_file_label.setAlignment(Qt.AlignLeft | Qt.AlignBottom)
+        self.current_file_label.setFixedSize(QSize(300, 20))  # Adjust size as needed
+        self.left_layout.addWidget(self.current_file_label)
+ 
+        self.left_panel.setLayout(self.left_layout)
+ 
+        #---------------------------------------------------------------------------------------------------
+ 
+ 
+        #--Right Section------------------------------------------------------------------------------------#
+ 
+        self.right_panel = QWidget()
+        self.right_layout = QVBoxLayout()
+ 
+        #--Toggle Mode-------------------------------------------------------------------------------------#
+ 
+        self.mode_toggle_button = QPushButton('Toggle Dark/Light', self)
+        self.mode_toggle_button.clicked.connect(self.toggle_mode)
+        self.right_layout.addWidget(self.mode_toggle_button)
+       
+ 
+        #--Keyword List-------------------------------------------------------------------------------------#
+ 
+        self.keyWordListGroupBox = QGroupBox(' Keyword List ')
+        self.keyWordListGroupBoxLayout = QVBoxLayout()
+ 
+        self.keywordList = QListWidget(self)
+        self.keyWordListGroupBoxLayout.addWidget(self.keywordList)
+        self.keywordList.itemClicked.connect(self.on_keyword_selected)
+        # Unchecking a keyword hides its highlights, double-clicking picks another color
+        self.keywordList.itemChanged.connect(self.on_keyword_toggled)
+        self.keywordList.itemDoubleClicked.connect(self.recolor_keyword)
+ 
+        self.up_down_button_layout = QHBoxLayout()
+ 
+        self.upButton = QPushButton('Up', self)
+        self.upButton.clicked.connect(self.scroll_keyword_up)
+        self.up_down_button_layout.addWidget(self.upButton)
+ 
+        self.downButton = QPushButton('Down', self)
+        self.downButton.clicked.connect(self.scroll_keyword_down)
+        self.up_down_button_layout.addWidget(self.downButton)
+ 
+        self.keyWordListGroupBoxLayout.addLayout(self.up_down_button_layout)
+ 
+        self.keyWordListGroupBox.setLayout(self.keyWordListGroupBoxLayout)
+ 
+        self.right_layout.addWidget(self.keyWordListGroupBox)
+ 
+        #---------------------------------------------------------------------------------------------------
+ 
+ 
+        #--Page Line List----------------------------------------------------------------------------------#
+ 
+        self.pageLineListGroupBox = QGroupBox(' Position Details ')
+        self.pageLineListGroupBoxLayout = QVBoxLayout()
+ 
+        self.page_line_list = QListWidget(self)
+        self.page_line_list.itemClicked.connect(self.navigate_to_page_line)
+        self.pageLineListGroupBoxLayout.addWidget(self.page_line_list)
+ 
+        self.pageLineListGroupBox.setLayout(self.pageLineListGroupBoxLayout)
+ 
+        self.right_layout.addWidget(self.pageLineListGroupBox)
+ 
+        #---------------------------------------------------------------------------------------------------
+ 
+        self.right_panel.setLayout(self.right_layout)
+ 
+        #---------------------------------------------------------------------------------------------------
+ 
+        self.pdf_viewer = PDFViewer()
+        self.text_viewer = TextViewer()
+        # Shows whichever viewer the opened result needs
+        self.viewer_stack = QStackedWidget()
+        self.viewer_stack.addWidget(self.pdf_viewer)
+        self.viewer_stack.addWidget(self.text_viewer)
+        self.viewer = self.pdf_viewer
+ 
+        self.splitter.addWidget(self.left_panel)
+        self.splitter.addWidget(self.viewer_stack)
+        self.splitter.addWidget(self.right_panel)
+ 
+        # self.splitter.setStretchFactor(0, 1)
+        # self.splitter.setStretchFactor(1, 3)
+        # self.splitter.setStretchFactor(2, 1)
+ 
+        self.splitter.setSizes([300, 800, 300])
+        self.layout.addWidget(self.splitter)
+ 
+        container = QWidget()
+        container.setLayout(self.layout)
+ 
+        self.setCentralWidget(container)
+ 
+        self.highlighted_docs = OrderedDict()  # Highlighted PDFs and text files of the current search, kept in memory
+        self.page_positions = {}
+        self.keyword_positions = {}
+        self.keyword_list = []
+        self.keyword_colors = {}     # Highlight color of every keyword of the search
+        self.hidden_keywords = set() # Keywords unchecked in the keyword list
+        self.regex_string = ''
+        self.query = None
+        self.search_thread = None
+        self.highlight_thread = None
+        self.stopping_threads = set()  # Replaced threads still finishing their current file
+ 
+        self.search_stats = SearchStats()  # Per-file timings of the current search
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(self.STATS_REFRESH_MS)
+        self.stats_timer.timeout.connect(self.update_stats_view)
+ 
+        self.apply_stylesheet()
+ 
+    def toggle_button(self, button):
+        # Check if the button is already selected
+        if button.property('selected'):
+            # Deselect the button, set normal color
+            button.setStyleSheet("background-color: none")
+            button.setProperty('selected', False)
+        else:
+            # Select the button, set to red
+            button.setStyleSheet("QPushButton { background-color: #D32F2F; color: white }")
+            button.setProperty('selected', True)
+
+ 
+    def toggle_mode(self):
+        if hasattr(self, 'dark_mode_enabled') and self.dark_mode_enabled:
+            self.setStyleSheet(self.light_mode_stylesheet)
+            self.folderPathLabel.setStyleSheet("background-color: #F0F0F0; border: 1px solid #999; border-radius: 5px; padding: 5px;")
+            self.dark_mode_enabled = False
+        else:
+            self.setStyleSheet(self.dark_mode_stylesheet)
+            self.folderPathLabel.setStyleSheet("background-color: #333333; border: 1px solid #666; border-radius: 5px; padding: 5px; color: #DDDDDD;")
+            self.dark_mode_enabled = True
+
+ 
+    def apply_stylesheet(self):
+        light_mode_stylesheet = """
+            QWidget {
+                background-color: #F0F0F0;
+                color: #333;
+                font-family: Arial, sans-serif;
+            }
+            QPushButton {
+                background-color: #E0E0E0;
+                border: 1px solid #999;
+                padding: 5px;
+                border-radius: 5px;
+            }
+            QPushButton#searchButton {
+                background-color: #D32F2F;
+                color: white;
+            }
+            QListWidget::item:selected {
+                background-color: #D32F2F;
+                color: white;
+                border: 1px solid #D32F2F;
+            }
+            QPushButton:hover {
+                background-color: #C0C0C0;
+            }
+            QTextEdit, QListWidget {
+                background-color: #FFFFFF;
+                border: 1px solid #999;
+                padding: 5px;
+                border-radius: 5px;
+            }
+            QGroupBox {
+                border: 1px solid #999;
+                padding-top: 10px;
+                border-radius: 5px;
+            }
+            QSplitter::handle {
+                background-color: #858484;
+                width: 1px;
+                height: 1px;
+                border-radius: 1px;
+            }
+            QProgressBar {
+                border: 1px solid #999;
+                border-radius: 5px;
+                background-color: #E0E0E0;
+                text-align: center;
+                height: 10px;  /* Adjust the height */
+            }
+            QProgressBar::chunk {
+                background-color: #4CAF50;  /* Green progress chunk */
+                width: 10px;  /* Chunk width */
+            }
+        """
+
+        dark_mode_stylesheet = """
+            QWidget {
+                background-color: #2C2C2C;
+                color: #DDDDDD;
+                font-family: Arial, sans-serif;
+            }
+            QPushButton {
+                background-color: #444444;
+                border: 1px solid #666;
+                padding: 5px;
+                border-radius: 5px;
+            }
+            QPushButton#searchButton {
+                background-color: #8B0000;
+                color: white;
+            }
+            QListWidget::item:selected {
+                background-color: #8B0000;
+                color: white;
+                border: 1px solid #8B0000;
+            }
+            QPushButton:hover {
+                background-color: #555555;
+            }
+            QTextEdit, QListWidget {
+                background-color: #333333;
+                border: 1px solid #666;
+                padding: 5px;
+                border-radius: 5px;
+            }
+            QGroupBox {
+                border: 1px solid #666;
+                padding-top: 10px;
+                border-radius: 5px;
+            }
+            QSplitter::handle {
+                background-color: #444444;
+                width: 1px;
+                height: 1px;
+                border-radius: 1px;
+            }
+            QProgressBar {
+                border: 1px solid #666;
+                border-radius: 5px;
+                background-color: #2E2E2E;
+                text-align: center;
+                height: 10px;  /* Adjust the height */
+            }
+            QProgressBar::chunk {
+                background-color: #2196F3;  /* Blue progress chunk */
+                width: 10px;  /* Chunk width */
+            }
+        """
+ 
+        self.light_mode_stylesheet = light_mode_stylesheet
+        self.dark_mode_stylesheet = dark_mode_stylesheet
+        self.dark_mode_enabled = True  # Start in light mode
+ 
+        # Apply light mode initially
+        self.setStyleSheet(self.dark_mode_stylesheet)
+ 
+ 
+    def open_folder(self):
+        options = QFileDialog.Options()
+        self.folder_path = QFileDialog.getExistingDirectory(self, 'Open Folder', '', options=options)
+ 
+        if self.folder_path:
+            self.folderPathLabel.setText(self.folder_path)
+        else:
+            self.folderPathLabel.setText('No folder selected')
+ 
+        if self.folder_path:
+            self.keywordList.clear()
+            self.page_line_list.clear()
+            self.fileList.clear()
+            self.pdf_viewer.close_pdf()
+            self.text_viewer.close_text()
+            self.clear_highlighted_docs()
+
+ 
+    def search_keywords(self):
+        # Only one search and highlight at a time; the previous ones stop at their next page
+        if self.search_thread is not None and self.search_thread.isRunning():
+            self.retire_thread(self.search_thread)
+            # Its own search_complete is cut off with the other signals
+            self.on_search_complete()
+        self.retire_thread(self.highlight_thread)
+ 
+        # Deliver the signals the stopped threads already queued, before the lists are cleared
+        QApplication.sendPostedEvents(None, QEvent.MetaCall)
+ 
+        # Clear previous search data
+        self.keywordList.clear()
+        self.page_line_list.clear()
+        self.pdf_viewer.close_pdf()
+        self.text_viewer.close_text()
+ 
+        self.clear_highlighted_docs()
+        self.keyword_list = []
+        self.regex_string = ''
+ 
+        # Check if a folder is selected
+        if hasattr(self, 'folder_path'):
+            keywords = self.keywordInput.toPlainText().split(',')
+            self.regex_string = self.regexInput.toPlainText()
+ 
+            self.keyword_list = [k.strip() for k in keywords]
+ 
+            if self.regex_string != '':
+                self.keyword_list.append('((regex))')
+ 
+            # Colors and shown keywords carry over to every file opened from this search
+            self.keyword_colors = self.default_keyword_colors(self.keyword_list)
+            self.hidden_keywords = set()
+ 
+            self.fileList.clear()
+ 
+            # Compile the keywords and regex once; the search and highlight threads share them
+            try:
+                self.query = SearchQuery(self.keyword_list, self.regex_string)
+            except re.error:
+                self.current_file_label.setText("Invalid Regex Pattern.")
+                return
+ 
+            # if '' not in keywords:
+            # Get selected file formats based on button states
+            file_extensions = []
+            if self.pdf_button.property('selected'):
+                file_extensions.append('.pdf')
+            if self.docx_button.property('selected'):
+                file_extensions.append('.docx')
+            if self.txt_button.property('selected'):
+                file_extensions.append('.txt')
+            if self.xlsx_button.property('selected'):
+                file_extensions.append('.xlsx')
+            if self.ppt_button.property('selected'):
+                file_extensions.append('.pptx')
+            if self.msg_button.property('selected'):
+                file_extensions.append('.msg')
+ 
+            # Start the search in a background thread
+            self.file_progress_bar.setVisible(True)
+            self.total_progress_label.setVisible(True)
+            self.current_file_label.setVisible(True)
+ 
+            # Initialize and start the SearchThread
+            self.search_thread = SearchThread(self.folder_path, self.keyword_list, self.regex_string, file_extensions,
+                                              use_index=bool(self.index_button.property('selected')), query=self.query)
+            self.search_thread.progress_within_file.connect(self.update_file_progress_bar)
+            self.search_thread.update_current_file.connect(self.update_current_file_label)
+            self.search_thread.files_found.connect(self.add_files_to_list)  # Matching files arrive in batches
+            self.search_thread.search_complete.connect(self.on_search_complete)
+            self.search_thread.files_searched.connect(self.update_files_searched_label)  # Connect new signal
+            self.search_thread.files_timed.connect(self.search_stats.extend)
+ 
+            # The statistics are refreshed on a timer instead of after every file
+            self.search_stats.clear()
+            self.update_stats_view()
+            self.stats_timer.start()
+ 
+            # Start the thread
+            self.search_thread.start()
+            self.pauseButton.setEnabled(True)
+            self.stopButton.setEnabled(True)
+ 
+            # else:
+            #     self.current_file_label.setText("Empty Keyword Error! Check After Comma.")
+ 
+        else:
+            self.current_file_label.setText("Folder Path NOT Selected.")
+ 
+ 
+    def stop_search(self):
+        # Cancels the running search without waiting for it, a worker stuck in a document
+        # library would freeze the window. search_complete follows once the thread is done.
+        if self.search_thread is not None and self.search_thread.isRunning():
+            self.search_thread.cancel.cancel()
+            self.pauseButton.setEnabled(False)
+            self.stopButton.setEnabled(False)
+            self.current_file_label.setText("Stopping Search...")
+ 
+    def stop_highlight(self):
+        if self.highlight_thread is not None and self.highlight_thread.isRunning():
+            self.highlight_thread.cancel.cancel()
+            self.highlight_thread.wait()
+ 
+    def retire_thread(self, thread):
+        # Cancels a search or highlight thread that is being replaced, without waiting for it.
+        # Its signals are cut off so its last results do not reach the new one, and it stays
+        # referenced until it finishes, as a running QThread must not be deleted.
+        if thread is None or not thread.isRunning():
+            return
+ 
+        thread.cancel.cancel()
+        thread.disconnect()
+        thread.finished.connect(self.forget_stopped_thread)
+        self.stopping_threads.add(thread)
+ 
+    def forget_stopped_thread(self):
+        thread = self.sender()
+        thread.wait()  # Already past run(), returns at once
+        self.stopping_threads.discard(thread)
+ 
+    def toggle_pause(self):
+        if self.search_thread is None or not self.search_thread.isRunning():
+            return
+ 
+        if self.search_thread.cancel.paused:
+            self.search_thread.cancel.resume()
+            self.pauseButton.setText('Pause')
+        else:
+            self.search_thread.cancel.pause()
+            self.pauseButton.setText('Resume')
+            self.current_file_label.setText("Search Paused.")
+ 
+    def update_file_progress_bar(self, progress):
+        self.file_progress_bar.setValue(progress)
+ 
+ 
+    def update_files_searched_label(self, current_file_index, total_files, eta):
+        text = f"Files searched: {current_file_index}/{total_files}"
+ 
+        # The ETA is estimated from the bytes searched per second so far
+        if eta >= 0 and current_file_index < total_files:
+            minutes, seconds = divmod(int(eta + 0.5), 60)
+            text += f" | ETA {minutes}:{seconds:02d}"
+ 
+        self.total_progress_label.setText(text)
+ 
+ 
+    def update_current_file_label(self, file_path):
+        self.current_file_label.setText(f"Searching: {os.path.basename(file_path)}")
+ 
+ 
+    def add_files_to_list(self, file_paths):
+        self.fileList.addItems(file_paths)  # Add the files with matching keywords to the file list
+ 
+ 
+    def on_search_complete(self):
+        self.stats_timer.stop()
+        self.update_stats_view()
+        self.file_progress_bar.setVisible(False)
+        self.total_progress_label.setVisible(False)
+        self.pauseButton.setText('Pause')
+        self.pauseButton.setEnabled(False)
+        self.stopButton.setEnabled(False)
+        if self.search_thread is not None and self.search_thread.cancel.cancelled:
+            self.current_file_label.setText("Search Stopped.")
+        elif self.fileList.count():
+            self.current_file_label.setText("Search Complete.")
+        else:
+            self.current_file_label.setText("All Keywords NOT Found.")
+ 
+
+    def open_selected_pdf(self, item):
+        self.page_line_list.clear()
+ 
+        # Use the full path of the selected file from the item
+        full_file_path = item.text()
+        file_name, file_extension = os.path.splitext(full_file_path)
+        file_extension = file_extension.lower()
+        existing_highlighted_pdf_path = f"{file_name}_highlighted_{'_'.join(self.keyword_list)}.pdf"
+ 
+        if existing_highlighted_pdf_path in self.highlighted_docs:
+            self.on_highlight_complete(existing_highlighted_pdf_path, *self.highlighted_docs[existing_highlighted_pdf_path])
+            return None
+ 
+        # PDF and text files are kept under their own path, they are shown without a highlighted copy
+        if full_file_path in self.highlighted_docs:
+            if file_extension == '.txt':
+                self.on_text_highlight_complete(full_file_path, *self.highlighted_docs[full_file_path])
+            else:
+                self.on_highlight_complete(full_file_path, *self.highlighted_docs[full_file_path])
+            return None
+ 
+        # The file opened before is not needed anymore
+        self.retire_thread(self.highlight_thread)
+ 
+        # Start a new thread to highlight the selected file
+        self.highlight_thread = HighlightThread(full_file_path, self.keyword_list, self.regex_string, file_extension, self.query)
+ 
+        # Connect signals to handle completion and errors
+        self.highlight_thread.highlight_complete.connect(self.on_highlight_complete)
+        self.highlight_thread.text_highlight_complete.connect(self.on_text_highlight_complete)
+        self.highlight_thread.error.connect(self.on_highlight_error)
+        self.highlight_thread.file_timed.connect(self.on_highlight_timed)
+ 
+        # Start the thread (this runs the highlighting in the background)
+        self.highlight_thread.start()
+ 
+    def on_highlight_complete(self, highlighted_file_path, pdf_data, hits, highlights):
+        self.keep_highlighted_doc(highlighted_file_path, pdf_data, hits, highlights)
+ 
+        current_page = self.page_positions.get(highlighted_file_path, 0)
+        self.text_viewer.close_text()
+        self.viewer = self.pdf_viewer
+        self.viewer_stack.setCurrentWidget(self.pdf_viewer)
+        self.pdf_viewer.set_highlight_colors(self.shown_keyword_colors())
+        self.pdf_viewer.display_pdf(highlighted_file_path, current_page, pdf_data, highlights)
+        self.keyword_positions = self.get_keyword_positions(hits, self.keyword_list)
+        self.populate_keyword_list(self.keyword_list)
+ 
+    def on_text_highlight_complete(self, file_path, lines, hits):
+        self.keep_highlighted_doc(file_path, lines, hits)
+ 
+        current_page = self.page_positions.get(file_path, 0)
+        self.pdf_viewer.close_pdf()
+        self.viewer = self.text_viewer
+        self.viewer_stack.setCurrentWidget(self.text_viewer)
+        self.text_viewer.set_highlight_colors(self.shown_keyword_colors())
+        self.text_viewer.display_text(file_path, lines, self.query, self.keyword_list, current_page)
+        self.keyword_positions = self.get_keyword_positions(hits, self.keyword_list)
+        self.populate_keyword_list(self.keyword_list)
+ 
+    def keep_highlighted_doc(self, path, *entry):
+        # Keep the most recently opened highlighted documents in memory for reopening them
+        previous = self.highlighted_docs.pop(path, None)
+        if previous is not None and previous[0] is not entry[0]:
+            self.release_highlighted_doc(previous)
+        self.highlighted_docs[path] = entry
+        while len(self.highlighted_docs) > self.HIGHLIGHTED_DOCS_KEPT:
+            self.release_highlighted_doc(self.highlighted_docs.popitem(last=False)[1])
+ 
+    def release_highlighted_doc(self, entry):
+        # A text file's TextLines holds its memory map and file handle open, which on
+        # Windows locks the file; PDFs are kept as bytes and need nothing
+        lines = entry[0]
+        if isinstance(lines, TextLines) and lines is not self.text_viewer.lines:
+            lines.close()
+ 
+    def clear_highlighted_docs(self):
+        for entry in self.highlighted_docs.values():
+            self.release_highlighted_doc(entry)
+        self.highlighted_docs = OrderedDict()
+ 
+    def on_highlight_error(self, error_message):
+        print(f"Error during highlighting: {error_message}")
+ 
+    def on_highlight_timed(self, record):
+        self.search_stats.add(record)
+        self.update_stats_view()
+ 
+    def update_stats_view(self):
+        totals = self.search_stats.totals()
+ 
+        if not totals['files']:
+            self.stats_label.setText('No search yet.')
+            self.slowest_list.clear()
+            return
+ 
+        # Share of each phase in the time spent on files
+        phase_time = sum(totals[phase] for phase in PHASES) or 1
+        shares = '  '.join(
+            f"{phase} {totals[phase] / phase_time:.0%}" for phase in PHASES if totals[phase] / phase_time >= 0.005
+        )
+        self.stats_label.setText(
+            f"Files: {totals['files']} | {totals['bytes'] / 1e6:.1f} MB | Pages: {totals['pages']} | "
+            f"{totals['total']:.2f} s\n{shares}"
+        )
+ 
+        self.slowest_list.clear()
+        for record in self.search_stats.slowest(self.SLOWEST_FILES_SHOWN):
+            item = QListWidgetItem(f"{record['total'] * 1000:.0f} ms  {record['kind']}  {os.path.basename(record['path'])}")
+            item.setToolTip(record['path'] + '\n' + '  '.join(
+                f"{phase} {record[phase] * 1000:.1f} ms" for phase in PHASES if record[phase]
+            ))
+            self.slowest_list.addItem(item)
+ 
+    def export_stats(self):
+        export_path, _ = QFileDialog.getSaveFileName(self, 'Export Statistics', 'search_stats.csv',
+                                                     'CSV Files (*.csv);;JSON Files (*.json)')
+ 
+        if export_path:
+            try:
+                if export_path.lower().endswith('.json'):
+                    self.search_stats.export_json(export_path)
+                else:
+                    self.search_stats.export_csv(export_path)
+            except Exception as e:
+                QMessageBox.warning(self, 'Export Statistics', f"Could not export the statistics: {e}")
+ 
+    def get_keyword_positions(self, hits, keywords):
+        # Groups the hits found while highlighting by keyword, in page order
+        keyword_positions = {keyword: [] for keyword in keywords}
+ 
+        for hit in hits:
+            keyword_positions[hit["keyword"]].append(hit)
+ 
+        return keyword_positions
+ 
+ 
+    def default_keyword_colors(self, keywords):
+        colors = [QColor(color) for color in HIGHLIGHT_COLORS]
+        keyword_colors = {}
+ 
+        for i, keyword in enumerate(keywords):
+            if keyword == '((regex))':
+                keyword_colors[keyword] = colors[(len(keywords) - 1) % len(colors)]
+            elif keyword != '':
+                keyword_colors[keyword] = colors[i % len(colors)]
+ 
+        return keyword_colors
+ 
+    def shown_keyword_colors(self):
+        # The colors the viewers paint with, without the hidden keywords
+        return {keyword: color for keyword, color in self.keyword_colors.items() if keyword not in self.hidden_keywords}
+ 
+    def populate_keyword_list(self, keywords):
+        # Checking items must not count as the user toggling them
+        self.keywordList.blockSignals(True)
+        self.keywordList.clear()
+ 
+        for keyword in keywords:
+            if keyword in self.keyword_colors:
+                item = QListWidgetItem(keyword)
+                item.setBackground(self.keyword_colors[keyword])
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Unchecked if keyword in self.hidden_keywords else Qt.Checked)
+                self.keywordList.addItem(item)
+ 
+        self.keywordList.blockSignals(False)
+ 
+    def on_keyword_toggled(self, item):
+        if item.checkState() == Qt.Checked:
+            self.hidden_keywords.discard(item.text())
+        else:
+            self.hidden_keywords.add(item.text())
+        self.update_highlight_colors()
+ 
+    def recolor_keyword(self, item):
+        color = QColorDialog.getColor(self.keyword_colors[item.text()], self, f"Highlight color of {item.text()}")
+        if color.isValid():
+            self.keyword_colors[item.text()] = color
+            self.keywordList.blockSignals(True)
+            item.setBackground(color)
+            self.keywordList.blockSignals(False)
+            self.update_highlight_colors()
+ 
+    def update_highlight_colors(self):
+        # Repaints the highlights of the shown pages or lines; documents generated from
+        # DOCX, PPTX, XLSX and MSG files have their colors built in
+        colors = self.shown_keyword_colors()
+        self.pdf_viewer.set_highlight_colors(colors)
+        self.text_viewer.set_highlight_colors(colors)
+           
+ 
+    def on_keyword_selected(self, item):
+        selected_keyword = item.text()
+        self.populate_page_line_list(selected_keyword)
+ 
+    def scroll_keyword_up(self):
+        selected_items = self.keywordList.selectedItems()
+        if not selected_items:
+            return
+ 
+        selected_keyword = selected_items[0].text()
+ 
+        if selected_keyword in self.keyword_positions:
+            current_page = self.viewer.current_page
+            pages = [hit["page"] for hit in self.keyword_positions[selected_keyword]]
+            previous_pages = [p for p in pages if p < current_page]
+ 
+            if previous_pages:
+                self.viewer.scroll_to_page(previous_pages[-1])
+            else:
+                self.viewer.scroll_to_page(pages[-1])
+ 
+            self.populate_page_line_list(selected_keyword)
+ 
+    def scroll_keyword_down(self):
+        selected_items = self.keywordList.selectedItems()
+ 
+        if not selected_items:
+            return
+ 
+        selected_keyword = selected_items[0].text()
+        if selected_keyword in self.keyword_positions:
+            current_page = self.viewer.current_page
+            pages = [hit["page"] for hit in self.keyword_positions[selected_keyword]]
+            next_pages = [p for p in pages if p > current_page]
+            if next_pages:
+                self.viewer.scroll_to_page(next_pages[0])
+            else:
+                self.viewer.scroll_to_page(pages[0])
+ 
+            self.populate_page_line_list(selected_keyword)
+ 
+
+    def populate_page_line_list(self, keyword):
+        self.page_line_list.clear()
+        if keyword in self.keyword_positions:
+            for i, hit in enumerate(self.keyword_positions[keyword]):
+                item = QListWidgetItem(f"Page {hit['page'] + 1}: Line {hit['line']} | {hit['snippet']}")
+                item.setData(Qt.UserRole, (keyword, i))
+                self.page_line_list.addItem(item)
+ 
+
+    def navigate_to_page_line(self, item):
+        keyword, i = item.data(Qt.UserRole)
+        self.viewer.scroll_to_hit(self.keyword_positions[keyword][i])
+ 
+
+    def closeEvent(self, event):
+        # Stop the running threads and wait for them, so no worker process outlives the window
+        for thread in [self.search_thread, *self.stopping_threads]:
+            if thread is not None:
+                thread.cancel.cancel()
+                thread.wait()
+        self.stop_highlight()
+        self.pdf_viewer.close_pdf()
+        self.text_viewer.close_text()
+        self.clear_highlighted_docs()
+        event.accept()
+ 
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Needed by the search worker processes in frozen builds
+    app = QApplication(sys.argv)
+    ex = PDFHighlighter()
+    ex.show()
+    # Load the document libraries in the background once the window is up
+    QTimer.singleShot(0, warm_up)
+    sys.exit(app.exec_())
@@ -0,0 +1,144 @@
+import re
+ 
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse  # Python 3.10 and older
+ 
+# A word is a run of non-whitespace, the same split as str.split()
+WORD_PATTERN = re.compile(r'\S+')
+ 
+# Anchors, \b and lookarounds look past the word, so a scan of the whole text
+# would not give the same result as a fullmatch of each word on its own
+CONTEXT_OPCODES = (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT)
+ 
+ 
+class KeywordMatcher:
+    """Keyword list compiled once per search and shared by the search and highlight paths."""
+ 
+    def __init__(self, keywords):
+        # Lowercased keywords in list order, without the empty keyword and the regex placeholder
+        self.keywords = []
+        # Position of each keyword in the original list, which picks its highlight color
+        self.indexes = {}
+ 
+        for i, keyword in enumerate(keywords):
+            if keyword != '' and keyword != '((regex))' and keyword.lower() not in self.indexes:
+                self.keywords.append(keyword.lower())
+                self.indexes[keyword.lower()] = i
+ 
+    def find(self, text, keywords=None):
+        # Lowercases the text once and returns the keywords it contains. Pass the keywords
+        # that are still missing to skip the ones already found in earlier pages.
+        text_lower = text.lower()
+        if keywords is None:
+            keywords = self.keywords
+ 
+        return {keyword for keyword in keywords if keyword in text_lower}
+ 
+    def first_match(self, word, keywords=None):
+        # The first keyword in list order contained in the word, or None
+        word_lower = word.lower()
+        if keywords is None:
+            keywords = self.keywords
+ 
+        for keyword in keywords:
+            if keyword in word_lower:
+                return keyword
+ 
+        return None
+ 
+    def positions(self, text_lower, keyword):
+        # Start offsets of every occurrence of a keyword in already lowercased text
+        position = text_lower.find(keyword)
+        while position != -1:
+            yield position
+            position = text_lower.find(keyword, position + 1)
+ 
+ 
+class WordRegex:
+    """The user's regex, matched against whole words like pattern.fullmatch(word) for word in text.split()."""
+ 
+    def __init__(self, regex_string):
+        self.pattern = re.compile(regex_string)
+        self.prefix = self.literal_prefix(regex_string)
+        self.scanner = None
+ 
+        if not self.depends_on_context(sre_parse.parse(regex_string)):
+            try:
+                # Matches may only start and end at word boundaries, so one scan of the
+                # text finds the candidate words instead of one fullmatch call per word
+                self.scanner = re.compile(r'(?<!\S)(?:' + regex_string + r')(?!\S)')
+            except re.error:
+                # e.g. inline global flags, which have to stay at the start of the pattern
+                pass
+ 
+    def finditer(self, text):
+        # (start, end) of every word for which fullmatch() holds, the same check as
+        # SearchQuery.match_word, so searching and highlighting agree. The scanner only
+        # narrows the candidate words; without one every word of the text is a candidate.
+        if self.prefix not in text:
+            # No word of the text can start with the literal prefix
+            return
+ 
+        if self.scanner is None:
+            candidates = [(0, len(text))]
+        else:
+            candidates = (match.span() for match in self.scanner.finditer(text))
+ 
+        for start, end in candidates:
+            # A candidate can span several words if the regex allows whitespace, so every word is checked
+            for word in WORD_PATTERN.finditer(text, start, end):
+                if self.fullmatch(word.group()):
+                    yield word.span()
+ 
+    def search(self, text):
+        return next(self.finditer(text), None) is not None
+ 
+    def fullmatch(self, word):
+        # Words without the regex's literal prefix cannot match, so the regex is not even run
+        return word.startswith(self.prefix) and self.pattern.fullmatch(word) is not None
+ 
+    @staticmethod
+    def depends_on_context(node):
+        # Whether the parsed pattern contains an anchor or a lookaround anywhere
+        if isinstance(node, sre_parse.SubPattern):
+            return any(op in CONTEXT_OPCODES or WordRegex.depends_on_context(argument) for op, argument in node)
+        if isinstance(node, (tuple, list)):
+            return any(WordRegex.depends_on_context(child) for child in node)
+        return False
+ 
+    @staticmethod
+    def literal_prefix(regex_string):
+        # The literal characters every match starts with, e.g. 'INV' for INV\d+
+        parsed = sre_parse.parse(regex_string)
+        if parsed.state.flags & re.IGNORECASE:
+            return ''
+ 
+        prefix = []
+        for i, (op, argument) in enumerate(parsed):
+            if op == sre_parse.LITERAL:
+                prefix.append(chr(argument))
+            elif i == 0 and op == sre_parse.AT and argument in (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING):
+                continue
+            else:
+                break
+ 
+        return ''.join(prefix)
+ 
+ 
+class SearchQuery:
+    """Keywords and regex of one search, compiled once and shared by every file, worker and thread."""
+ 
+    def __init__(self, keywords, regex_string):
+        self.keywords = keywords
+        self.regex_string = regex_string
+        self.matcher = KeywordMatcher(keywords)
+        # Raises re.error for an invalid regex
+        self.regex = WordRegex(regex_string) if regex_string != '' else None
+ 
+        # An empty keyword (e.g. a trailing comma) means the search only requires the regex
+        self.required_keywords = frozenset() if '' in keywords else frozenset(self.matcher.keywords)
+ 
+    def match_word(self, word):
+        return self.regex is not None and self.regex.fullmatch(word)
@@ -0,0 +1,93 @@
+import os
+import json
+import hashlib
+from text_cache import CACHE_DIR
+ 
+# Highlighted PDFs generated for DOCX, PPTX, XLSX and MSG results, kept between
+# searches and sessions so opening a result again skips the conversion. Kept free
+# of PyQt imports like text_cache.
+ 
+# Bump when the generated documents change so outputs of older versions are not shown
+RENDERER_VERSION = 1
+ 
+# Disk space the outputs may take before the least recently used ones are deleted
+OUTPUT_CACHE_BUDGET = 512 * 1024 * 1024
+ 
+ 
+class OutputCache:
+    """On-disk cache of highlighted documents, addressed by a digest of the source file's
+    (path, size, mtime), the keywords, the regex and the renderer version."""
+ 
+    def __init__(self, cache_dir=None, budget=OUTPUT_CACHE_BUDGET):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, 'output')
+        self.budget = budget
+ 
+    def key(self, file_path, keywords, regex_string):
+        # Any change of the file on disk, of the keywords or of their order changes the key
+        stat = os.stat(file_path)
+        identity = [RENDERER_VERSION, os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, keywords, regex_string]
+        return hashlib.sha256(json.dumps(identity).encode('utf-8', 'surrogatepass')).hexdigest()
+ 
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.pdf')
+ 
+    def get(self, key):
+        # The cached document, or None on a miss
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                data = f.read()
+            # The modification time orders the entries for eviction
+            os.utime(entry_path)
+        except OSError:
+            return None
+        return data
+ 
+    def put(self, key, data):
+        entry_path = self.entry_path(key)
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self.evict()
+ 
+    def entries(self):
+        # (mtime, size, path) of every cached document
+        entries = []
+        try:
+            folders = [entry.path for entry in os.scandir(self.cache_dir) if entry.is_dir()]
+        except OSError:
+            return entries
+ 
+        for folder in folders:
+            try:
+                for entry in os.scandir(folder):
+                    if entry.name.endswith('.pdf'):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            except OSError:
+                continue
+ 
+        return entries
+ 
+    def evict(self):
+        # Deletes the least recently used documents until the cache fits the budget
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+ 
+        for _, size, path in sorted(entries):
+            if total <= self.budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,94 @@
+from time import monotonic
+ 
+# Rate limiting for the progress the search threads report to the window. A queued
+# cross-thread signal per page or per file floods the event loop on large folders,
+# so updates are dropped or batched and the window sees at most one per interval.
+ 
+# Least time between two updates of the same kind, in seconds
+PROGRESS_INTERVAL = 0.05
+ 
+ 
+class Throttle:
+    """Time gate that opens at most once per interval."""
+ 
+    def __init__(self, interval=PROGRESS_INTERVAL):
+        self.interval = interval
+        self.last = None
+ 
+    def ready(self):
+        now = monotonic()
+        if self.last is not None and now - self.last < self.interval:
+            return False
+        self.last = now
+        return True
+ 
+ 
+class ProgressThrottle:
+    """Passes a percentage on to the callback only when it changed by at least
+    min_step and the last update is at least an interval old."""
+ 
+    def __init__(self, callback, interval=PROGRESS_INTERVAL, min_step=1):
+        self.callback = callback
+        self.throttle = Throttle(interval)
+        self.min_step = min_step
+        self.value = None
+ 
+    def __call__(self, value):
+        if self.value is not None and abs(value - self.value) < self.min_step:
+            return
+        if self.throttle.ready():
+            self.value = value
+            self.callback(value)
+ 
+ 
+class Batcher:
+    """Collects items and hands them to the callback as lists, at most once per interval."""
+ 
+    def __init__(self, callback, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.throttle = Throttle(interval)
+        self.items = []
+ 
+    def add(self, item):
+        self.items.append(item)
+        self.tick()
+ 
+    def tick(self):
+        # Hands over the pending items once the interval has passed. Called on every
+        # progress tick too, so an item added right after a batch does not wait for
+        # the next add or the end of the search.
+        if self.items and self.throttle.ready():
+            self.flush()
+ 
+    def flush(self):
+        if self.items:
+            items, self.items = self.items, []
+            self.callback(items)
+ 
+ 
+class SearchProgress:
+    """Files and bytes searched so far, with an ETA from the observed bytes per second."""
+ 
+    def __init__(self, total_files, total_bytes):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.counting = False  # True while the folder is still being scanned and the totals grow
+        self.files = 0
+        self.bytes = 0
+        self.start = monotonic()
+ 
+    def set_total(self, total_files, total_bytes, counting=False):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.counting = counting
+ 
+    def advance(self, file_size):
+        self.files += 1
+        self.bytes += file_size
+ 
+    def eta(self):
+        # Seconds left, or None until some bytes have been searched and the totals are known
+        elapsed = monotonic() - self.start
+        if self.counting or not self.bytes or elapsed <= 0:
+            return None
+        return max(self.total_bytes - self.bytes, 0) / (self.bytes / elapsed)
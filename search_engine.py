@@ -0,0 +1,664 @@
+import os
+import time
+import queue
+import threading
+from bisect import bisect_right
+from itertools import accumulate, zip_longest, islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from backends import fitz
+from text_cache import TextCache
+from search_stats import FileTimer, NULL_TIMER
+from text_files import TextFile, search_txt
+ 
+# The other document libraries are imported by their extractors, on first use
+ 
+# Kept free of PyQt imports so it can be loaded by the search worker processes
+ 
+# Same text flags page.search_for uses, so hyphenated words are joined the same way:
+# TEXT_DEHYPHENATE | TEXT_PRESERVE_WHITESPACE | TEXT_PRESERVE_LIGATURES | TEXT_MEDIABOX_CLIP,
+# spelled out so importing this module does not load fitz
+PDF_SEARCH_FLAGS = 16 | 2 | 1 | 64
+ 
+# Spreadsheet rows per cached unit, so long sheets can stop early and resume mid-sheet
+XLSX_ROWS_PER_UNIT = 1000
+ 
+# Spreadsheet rows matched together, column by column, when collecting cell hits
+XLSX_ROWS_PER_BLOCK = 10000
+ 
+# Files queued per search process; more are only submitted as results come back,
+# so a folder still being enumerated can be searched as it goes
+PENDING_PER_WORKER = 8
+ 
+# Files added to the inverted index per transaction; each commit syncs the database to disk
+INDEX_FILES_PER_COMMIT = 500
+ 
+# How often a search waiting for the folder scan checks its cancel token, in seconds
+SCAN_POLL_INTERVAL = 0.05
+ 
+# How often a search waiting for its worker processes checks its cancel token, in seconds
+RESULT_POLL_INTERVAL = 0.1
+ 
+ 
+text_cache = TextCache()
+ 
+# Cancel token of a search worker process, set by init_worker when the pool starts
+worker_cancel = None
+ 
+ 
+def init_worker(cancel):
+    global worker_cancel
+    worker_cancel = cancel
+ 
+ 
+def extract_pdf(file_path, progress=None, start=0, timer=NULL_TIMER):
+    with timer.phase('open'):
+        document = fitz.open(file_path)
+ 
+    try:
+        total_pages = len(document)
+ 
+        for page_num in range(start, total_pages):
+            page = document.load_page(page_num)
+ 
+            # Collapse whitespace so phrases still match across line breaks, like page.search_for
+            yield page_num, ' '.join(page.get_text(flags=PDF_SEARCH_FLAGS).split())
+ 
+            # Emit progress after processing each page
+            if progress:
+                progress(int(((page_num + 1) / total_pages) * 100))
+ 
+    finally:
+        document.close()
+ 
+ 
+def extract_xlsx(file_path, progress=None, start=0, timer=NULL_TIMER):
+    from python_calamine import CalamineWorkbook
+ 
+    # Open the workbook using calamine
+    with timer.phase('open'):
+        wb = CalamineWorkbook.from_path(file_path)
+    total_sheets = len(wb.sheet_names)
+    unit_count = 0
+ 
+    for sheet_index, sheet_name in enumerate(wb.sheet_names):
+        sheet = wb.get_sheet_by_name(sheet_name)
+ 
+        # Progress is estimated from the sheet dimensions instead of materializing the rows twice
+        total_rows = sheet.end[0] + 1 if sheet.end else 1
+        rows = []
+        row_count = 0
+ 
+        # Rows are converted to Python lazily and grouped into units of XLSX_ROWS_PER_UNIT rows
+        for row in sheet.iter_rows():
+            row_count += 1
+ 
+            # Units already held by a partial cache entry are counted but not rebuilt
+            if unit_count >= start:
+                # Cells are tab separated so keywords never match across two cells
+                rows.append('\t'.join(str(cell) for cell in row if cell))
+ 
+            if row_count % XLSX_ROWS_PER_UNIT == 0:
+                if unit_count >= start:
+                    yield sheet_name, '\n'.join(rows) + '\n'
+                unit_count += 1
+                rows = []
+ 
+                if progress:
+                    progress(int(((sheet_index + min(row_count / total_rows, 1)) / total_sheets) * 100))
+ 
+        if row_count % XLSX_ROWS_PER_UNIT or row_count == 0:
+            if unit_count >= start:
+                yield sheet_name, '\n'.join(rows) + '\n'
+            unit_count += 1
+ 
+        if progress:
+            progress(int(((sheet_index + 1) / total_sheets) * 100))
+ 
+ 
+def match_cell_block(block, first_row, column_offset, matcher, pattern, hits):
+    # Each column of the block is joined into one string, so keyword and regex matching run
+    # once per column and only the cells that matched are visited in Python
+    block_hits = []
+ 
+    for j, column in enumerate(zip_longest(*block, fillvalue=''), start=column_offset + 1):
+        values = [str(cell) if cell else '' for cell in column]
+        # Cells are newline separated, so words and keywords never span two cells
+        text = '\n'.join(values)
+        text_lower = text.lower()
+        starts = list(accumulate(map((1).__add__, map(len, values)), initial=0))
+ 
+        if len(text_lower) != len(text):
+            # Lowercasing changed some lengths, fall back to matching cell by cell
+            for i, value in enumerate(values):
+                for keyword in matcher.find(value):
+                    block_hits.append((first_row + i, j, keyword, value))
+        else:
+            for keyword in matcher.keywords:
+                seen_cells = set()
+                for position in matcher.positions(text_lower, keyword):
+                    i = bisect_right(starts, position) - 1
+                    if i not in seen_cells:
+                        seen_cells.add(i)
+                        block_hits.append((first_row + i, j, keyword, values[i]))
+ 
+        if pattern is not None:
+            seen_cells = set()
+            for start, _ in pattern.finditer(text):
+                i = bisect_right(starts, start) - 1
+                if i not in seen_cells:
+                    seen_cells.add(i)
+                    block_hits.append((first_row + i, j, '((regex))', values[i]))
+ 
+    # Report hits in row order, like scanning the sheet row by row
+    block_hits.sort(key=lambda hit: (hit[0], hit[1]))
+    for row, col, keyword, value in block_hits:
+        hits[keyword].append((row, col, value))
+ 
+ 
+def find_xlsx_cells(file_path, query, cancel=None):
+    # Returns {sheet_name: {keyword: [(row, col, value), ...]}} with 1-based row and column numbers.
+    # Keywords are lowercased; regex hits are listed under '((regex))'. The cancel token, if any,
+    # is checked at every row.
+    matcher = query.matcher
+    pattern = query.regex if '((regex))' in query.keywords else None
+ 
+    from python_calamine import CalamineWorkbook
+    wb = CalamineWorkbook.from_path(file_path)
+    sheet_hits = {}
+ 
+    for sheet_name in wb.sheet_names:
+        ws = wb.get_sheet_by_name(sheet_name)
+        hits = {keyword: [] for keyword in matcher.keywords + ['((regex))']}
+ 
+        # Rows are streamed from the sheet; they start at row 1 but columns start at the first used one
+        column_offset = ws.start[1] if ws.start else 0
+        block = []
+        first_row = 1
+ 
+        for row in ws.iter_rows():
+            if cancel is not None:
+                cancel.check()
+ 
+            block.append(row)
+            if len(block) == XLSX_ROWS_PER_BLOCK:
+                match_cell_block(block, first_row, column_offset, matcher, pattern, hits)
+                first_row += len(block)
+                block = []
+ 
+        if block:
+            match_cell_block(block, first_row, column_offset, matcher, pattern, hits)
+ 
+        sheet_hits[sheet_name] = hits
+ 
+    return sheet_hits
+ 
+ 
+def extract_pptx(file_path, progress=None, start=0, timer=NULL_TIMER):
+    from pptx import Presentation
+ 
+    with timer.phase('open'):
+        prs = Presentation(file_path)
+    total_slides = len(prs.slides)
+ 
+    for i, slide in enumerate(prs.slides):
+        if i < start:
+            continue
+ 
+        texts = [shape.text for shape in slide.shapes if hasattr(shape, "text")]
+        yield i, '\n'.join(texts) + '\n'
+ 
+        # Emit progress after processing each slide
+        if progress:
+            progress(int(((i + 1) / total_slides) * 100))
+ 
+ 
+def extract_msg_body(file_path, progress=None, start=0, timer=NULL_TIMER):
+    if start:
+        return
+ 
+    import extract_msg
+ 
+    with timer.phase('open'):
+        msg = extract_msg.Message(file_path)
+ 
+    try:
+        yield 0, msg.body + '\n'
+    finally:
+        msg.close()
+ 
+    if progress:
+        progress(100)
+ 
+ 
+def extract_txt(file_path, progress=None, start=0, timer=NULL_TIMER):
+    if start:
+        return
+ 
+    # Memory-mapped and decoded chunk by chunk, in the encoding detected from its first bytes
+    with timer.phase('open'):
+        text_file = TextFile(file_path)
+ 
+    with text_file:
+        for i, chunk in enumerate(text_file.chunks()):
+            yield i, chunk.text()
+ 
+            if progress:
+                progress(chunk.percent)
+ 
+ 
+def extract_docx(file_path, progress=None, start=0, timer=NULL_TIMER):
+    if start:
+        return
+ 
+    from docx import Document
+ 
+    with timer.phase('open'):
+        doc = Document(file_path)
+    yield 0, '\n'.join(paragraph.text for paragraph in doc.paragraphs) + '\n'
+ 
+    if progress:
+        progress(100)
+ 
+ 
+# Each extractor yields (page/sheet/slide, text) units for one file format,
+# starting after the first `start` units when resuming a partial cache entry,
+# and times opening the document as the timer's 'open' phase
+EXTRACTORS = {
+    '.pdf': extract_pdf,
+    '.xlsx': extract_xlsx,
+    '.pptx': extract_pptx,
+    '.msg': extract_msg_body,
+    '.txt': extract_txt,
+    '.docx': extract_docx,
+}
+ 
+ 
+def read_cache(file_path, use_cache=True):
+    # (key, units, complete) of the file's cache entry; key is None when the file is not cached
+    file_extension = os.path.splitext(file_path)[1].lower()
+ 
+    # Plain text files are as cheap to re-read as a cache entry
+    if not use_cache or file_extension == '.txt':
+        return None, [], False
+ 
+    key = text_cache.key(file_path)
+    units, complete = text_cache.get(key) or ([], False)
+ 
+    return key, units, complete
+ 
+ 
+def iter_units(file_path, progress=None, use_cache=True, cached=None, timer=NULL_TIMER):
+    key, units, complete = cached or read_cache(file_path, use_cache)
+    extractor = EXTRACTORS[os.path.splitext(file_path)[1].lower()]
+ 
+    yield from units
+ 
+    if complete:
+        if progress:
+            progress(100)
+        return
+ 
+    if key is None:
+        yield from extractor(file_path, progress, timer=timer)
+        return
+ 
+    # Resume after the units a previous, early-stopped search already cached
+    units = list(units)
+    try:
+        for unit in extractor(file_path, progress, len(units), timer):
+            units.append(unit)
+            yield unit
+ 
+    except GeneratorExit:
+        # The search stopped early, keep what was read so far
+        text_cache.put(key, units, complete=False)
+        raise
+ 
+    text_cache.put(key, units)
+ 
+ 
+def extract_text(file_path, progress=None, use_cache=True):
+    return list(iter_units(file_path, progress, use_cache))
+ 
+ 
+def extract_file(file_path):
+    # Units for the search index, or None when the file cannot be read
+    if worker_cancel is not None:
+        worker_cancel.check()
+ 
+    try:
+        return extract_text(file_path)
+    except Exception as e:
+        return None
+ 
+ 
+def search_file(file_path, query, progress=None, use_cache=True, stop_early=True, timer=None, cancel=None):
+    # The timer, a search_stats.FileTimer, records where the time of the file went.
+    # The cancel token, a cancellation.CancelToken, is checked at every page, slide or
+    # block of rows and raises SearchCancelled out of the search.
+    timer = timer or NULL_TIMER
+    file_name, file_extension = os.path.splitext(file_path)
+    file_extension = file_extension.lower()
+ 
+    matcher = query.matcher
+    pattern = query.regex
+    remaining_keywords = set(query.required_keywords)
+ 
+    if not remaining_keywords and pattern is None:
+        return False
+ 
+    if file_extension not in EXTRACTORS:
+        return False
+ 
+    if file_extension == '.txt':
+        # Plain text is searched straight from a memory map, matching ASCII keywords on the raw bytes
+        try:
+            timer.stat(file_path)
+            return search_txt(file_path, query, progress, stop_early, timer, cancel)
+        except Exception as e:
+            return None
+ 
+    try:
+        timer.stat(file_path)
+        with timer.phase('cache'):
+            cached = read_cache(file_path, use_cache)
+    except OSError:
+        return None
+ 
+    key, cached_units, complete = cached
+    timer.cached(len(cached_units))
+ 
+    if complete:
+        # Fast-fail: the whole document is cached, so a keyword missing from its text
+        # can never be found and the document is not opened at all
+        with timer.phase('match'):
+            text = '\n'.join(text for _, text in cached_units)
+            missing = matcher.find(text, remaining_keywords) != remaining_keywords
+        if missing:
+            return False
+ 
+    regex_found = pattern is None
+    units = iter_units(file_path, progress, use_cache, cached, timer)
+ 
+    try:
+        for _, text in timer.iterate(units):
+            if cancel is not None:
+                cancel.check()
+ 
+            with timer.phase('match'):
+                # One lowercase pass per page, testing only the keywords not found yet
+                if remaining_keywords:
+                    remaining_keywords -= matcher.find(text, remaining_keywords)
+ 
+                if not regex_found:
+                    # Match the words against the compiled pattern
+                    regex_found = pattern.search(text)
+ 
+            # Stop reading the document as soon as every keyword and the regex are found
+            if stop_early and not remaining_keywords and regex_found:
+                break
+ 
+    except Exception as e:
+        return None
+ 
+    finally:
+        # Closing writes what was read so far to the text cache
+        with timer.phase('cache'):
+            units.close()
+ 
+    # Check if all keywords are found
+    return not remaining_keywords and regex_found
+ 
+ 
+def search_file_timed(file_path, query):
+    # (result, timing record) of search_file, for the worker processes
+    timer = FileTimer(file_path)
+    result = search_file(file_path, query, timer=timer, cancel=worker_cancel)
+    return result, timer.finish(result)
+ 
+ 
+def scan_files(folder_path, file_extensions):
+    # Yields (path, size) of every file under the folder with one of the extensions, folder by
+    # folder in os.walk order and smallest first within a folder. Sizes come from the scandir
+    # entries, which on Windows carry them without a stat call per file.
+    file_extensions = tuple(file_extensions)
+    folders = [folder_path]
+ 
+    while folders:
+        try:
+            entries = os.scandir(folders.pop())
+        except OSError:
+            # Unreadable folders are skipped, like os.walk does
+            continue
+ 
+        files = []
+        subfolders = []
+ 
+        with entries:
+            for entry in entries:
+                try:
+                    # Symlinked folders are not followed, like os.walk
+                    if entry.is_dir(follow_symlinks=False):
+                        subfolders.append(entry.path)
+                    elif entry.name.lower().endswith(file_extensions):
+                        files.append((entry.path, entry.stat().st_size))
+                except OSError:
+                    continue
+ 
+        files.sort(key=lambda x: x[1])
+        yield from files
+ 
+        # Depth first, in the order the folders were listed
+        folders.extend(reversed(subfolders))
+ 
+ 
+def collect_files(folder_path, file_extensions):
+    # (path, size) of every file under the folder with one of the extensions, smallest first
+    files_to_search = list(scan_files(folder_path, file_extensions))
+    files_to_search.sort(key=lambda x: x[1])
+ 
+    return files_to_search
+ 
+ 
+class FolderScan:
+    """Enumerates a folder on a background thread, so its files are searched while it is scanned."""
+ 
+    def __init__(self, folder_path, file_extensions, cancel=None):
+        self.folder_path = folder_path
+        self.file_extensions = file_extensions
+        self.cancel = cancel
+        self.queue = queue.Queue()
+        self.files = 0           # Files found so far
+        self.bytes = 0           # Their total size
+        self.done = False        # Set once the whole folder has been scanned
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+ 
+    def start(self):
+        self.thread.start()
+        return self
+ 
+    def stop(self):
+        self.stopped = True
+ 
+    def run(self):
+        try:
+            for file_path, file_size in scan_files(self.folder_path, self.file_extensions):
+                if self.stopped:
+                    return
+ 
+                self.files += 1
+                self.bytes += file_size
+                self.queue.put((file_path, file_size))
+        finally:
+            self.done = True
+            self.queue.put(None)
+ 
+    def __iter__(self):
+        # Yields (path, size) as the files are found; blocks while the scan is behind
+        while True:
+            try:
+                item = self.queue.get(timeout=SCAN_POLL_INTERVAL)
+            except queue.Empty:
+                if self.cancel is not None:
+                    self.cancel.check()
+                continue
+ 
+            if item is None:
+                return
+ 
+            yield item
+ 
+    def ready(self):
+        # Like iterating, but yields None instead of blocking while the scan has nothing
+        # queued, so a search can collect its workers' results in the meantime
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                yield None
+                continue
+ 
+            if item is None:
+                return
+ 
+            yield item
+ 
+ 
+def refresh_index(index, file_paths, file_extensions, engine=None):
+    # Brings a SearchIndex up to date with the files found by the walk, yielding
+    # (file_path, files indexed so far, files to index) as each file is added
+    stale_files = index.stale_files(file_paths, file_extensions)
+ 
+    if engine is not None and engine.workers > 1 and len(stale_files) > 1:
+        extracted = engine.extract(stale_files)
+    else:
+        extracted = ((file_path, extract_file(file_path)) for file_path in stale_files)
+ 
+    for idx, (file_path, units) in enumerate(extracted):
+        # Unreadable files are indexed without terms until they change on disk
+        index.add_file(file_path, units or [])
+        if (idx + 1) % INDEX_FILES_PER_COMMIT == 0:
+            index.commit()
+        yield file_path, idx + 1, len(stale_files)
+ 
+    index.commit()
+ 
+ 
+class SearchEngine:
+    def __init__(self, query, workers=None, cancel=None):
+        self.query = query
+        # Default to one worker process per CPU
+        self.workers = workers or os.cpu_count() or 1
+        # Shared with the worker processes, which check it while reading their files
+        self.cancel = cancel
+ 
+    def search(self, file_paths):
+        # The compiled query is pickled once per task instead of being rebuilt per file
+        return self.run_in_processes(search_file, file_paths, self.query)
+ 
+    def search_timed(self, file_paths):
+        # Like search, with (result, timing record) pairs as results
+        return self.run_in_processes(search_file_timed, file_paths, self.query)
+ 
+    def extract(self, file_paths):
+        return self.run_in_processes(extract_file, file_paths)
+ 
+    def run_in_processes(self, function, file_paths, *args):
+        # Document parsing holds the GIL, so files are fanned out to separate processes
+        # and yielded back as (file_path, result) in completion order. file_paths may
+        # still be growing, e.g. a FolderScan, so tasks are submitted as workers free up;
+        # a None in file_paths means no file is ready yet and is skipped without waiting.
+        file_paths = iter(file_paths)
+        max_pending = self.workers * PENDING_PER_WORKER
+ 
+        # Files that were queued or running when a worker process died, e.g. of a native
+        # crash in a document library. They are searched again one at a time in a new
+        # pool, so only the file that takes its worker down again is given up on.
+        suspects = []
+        isolated = None  # Future of the suspect running alone
+ 
+        executor = self.start_pool()
+        futures = {}
+ 
+        try:
+            while True:
+                broken = False
+                scanning = False  # file_paths has nothing ready but is not exhausted
+ 
+                try:
+                    if suspects:
+                        if not futures:
+                            file_path = suspects.pop()
+                            isolated = executor.submit(function, file_path, *args)
+                            futures[isolated] = file_path
+                    else:
+                        for file_path in islice(file_paths, max_pending - len(futures)):
+                            if file_path is None:
+                                scanning = True
+                                break
+                            futures[executor.submit(function, file_path, *args)] = file_path
+                except BrokenProcessPool:
+                    suspects.append(file_path)
+                    broken = True
+ 
+                if not futures and not broken:
+                    if not scanning:
+                        break
+ 
+                    # Nothing to wait for until the scan queues another file
+                    if self.cancel is not None:
+                        self.cancel.check()
+                    time.sleep(SCAN_POLL_INTERVAL)
+                    continue
+ 
+                done, _ = wait(futures, timeout=RESULT_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+ 
+                if self.cancel is not None:
+                    # A worker stuck in a document library never returns on its own
+                    self.cancel.check()
+ 
+                for future in done:
+                    file_path = futures.pop(future)
+ 
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        if future is not isolated:
+                            suspects.append(file_path)
+                            continue
+                        result = None
+                    except Exception as e:
+                        result = None
+ 
+                    yield file_path, result
+ 
+                if broken:
+                    # A dead worker fails every task of its pool, the ones that finished
+                    # before it keep their results
+                    for future in list(futures):
+                        file_path = futures.pop(future)
+                        exception = future.exception()
+                        if isinstance(exception, BrokenProcessPool):
+                            suspects.append(file_path)
+                        else:
+                            yield file_path, None if exception else future.result()
+ 
+                    executor.shutdown(wait=False)
+                    executor = self.start_pool()
+ 
+        finally:
+            if self.cancel is not None and self.cancel.cancelled:
+                # Stopped: the running files stop at their cancel token, but one stuck in a
+                # document library is not waited for
+                executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                # Closed early, files not started yet are dropped instead of waited for
+                for future in futures:
+                    future.cancel()
+                executor.shutdown()
+ 
+    def start_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, initargs=(self.cancel,))
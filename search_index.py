@@ -0,0 +1,189 @@
+import os
+import re
+import sqlite3
+import hashlib
+from text_cache import CACHE_DIR
+ 
+WORD_PATTERN = re.compile(r'\w+')
+ 
+# Shortest token the trigram table can look up
+TRIGRAM_SIZE = 3
+ 
+# Ids per IN (...) list, below SQLite's limit on query parameters
+IDS_PER_QUERY = 500
+ 
+ 
+class SearchIndex:
+    """Persistent inverted index (term -> file, page/sheet, offset) for one folder."""
+ 
+    def __init__(self, folder_path, index_dir=None):
+        index_dir = index_dir or os.path.join(CACHE_DIR, 'index')
+        os.makedirs(index_dir, exist_ok=True)
+ 
+        digest = hashlib.sha1(os.path.abspath(folder_path).encode('utf-8', 'surrogatepass')).hexdigest()
+        self.connection = sqlite3.connect(os.path.join(index_dir, digest + '.sqlite'))
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime INTEGER);
+            CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE);
+            CREATE TABLE IF NOT EXISTS postings (term_id INTEGER, file_id INTEGER, unit, offset INTEGER);
+            CREATE INDEX IF NOT EXISTS postings_term ON postings (term_id);
+            CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+        ''')
+        self.term_ids = None
+        self.trigrams = self.create_trigrams()
+ 
+    def create_trigrams(self):
+        # Trigram index over the vocabulary, so keywords found inside longer words are looked
+        # up without scanning every term. Needs SQLite 3.34 with FTS5; without it the
+        # vocabulary is scanned.
+        exists = self.connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'term_trigrams'").fetchone()
+        if exists:
+            return True
+ 
+        try:
+            self.connection.execute(
+                "CREATE VIRTUAL TABLE term_trigrams USING fts5(term, content='terms', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            return False
+ 
+        # Terms of an index written before the table existed
+        self.connection.execute("INSERT INTO term_trigrams (term_trigrams) VALUES ('rebuild')")
+        self.connection.commit()
+        return True
+ 
+    def commit(self):
+        self.connection.commit()
+ 
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+ 
+    def stale_files(self, file_paths, file_extensions):
+        # Returns the files that are new or changed since they were indexed, and drops
+        # files of the searched extensions that are no longer in the folder
+        indexed = {path: (file_id, size, mtime) for file_id, path, size, mtime in self.connection.execute('SELECT id, path, size, mtime FROM files')}
+        stale = []
+ 
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+ 
+            indexed_file = indexed.pop(file_path, None)
+            if indexed_file is None or indexed_file[1:] != (stat.st_size, stat.st_mtime_ns):
+                stale.append(file_path)
+ 
+        for path, (file_id, _, _) in indexed.items():
+            if any(path.lower().endswith(ext) for ext in file_extensions):
+                self.remove_file(file_id)
+ 
+        self.connection.commit()
+        return stale
+ 
+    def remove_file(self, file_id):
+        self.connection.execute('DELETE FROM postings WHERE file_id = ?', (file_id,))
+        self.connection.execute('DELETE FROM files WHERE id = ?', (file_id,))
+ 
+    def add_file(self, file_path, units):
+        stat = os.stat(file_path)
+ 
+        row = self.connection.execute('SELECT id FROM files WHERE path = ?', (file_path,)).fetchone()
+        if row:
+            self.remove_file(row[0])
+ 
+        cursor = self.connection.execute('INSERT INTO files (path, size, mtime) VALUES (?, ?, ?)', (file_path, stat.st_size, stat.st_mtime_ns))
+        file_id = cursor.lastrowid
+ 
+        if self.term_ids is None:
+            self.term_ids = dict(self.connection.execute('SELECT term, id FROM terms'))
+ 
+        postings = []
+        for label, text in units:
+            # One posting per term per page/sheet, pointing at its first occurrence
+            first_offsets = {}
+            for match in WORD_PATTERN.finditer(text.lower()):
+                first_offsets.setdefault(match.group(), match.start())
+ 
+            for term, offset in first_offsets.items():
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    term_id = self.connection.execute('INSERT INTO terms (term) VALUES (?)', (term,)).lastrowid
+                    if self.trigrams:
+                        self.connection.execute('INSERT INTO term_trigrams (rowid, term) VALUES (?, ?)', (term_id, term))
+                    self.term_ids[term] = term_id
+                postings.append((term_id, file_id, label, offset))
+ 
+        # Committed by the caller, once per batch of files instead of once per file
+        self.connection.executemany('INSERT INTO postings (term_id, file_id, unit, offset) VALUES (?, ?, ?, ?)', postings)
+ 
+    def query(self, keywords):
+        # Returns the paths that can contain every keyword, or None when the index
+        # cannot narrow the search (regex only, or keywords without any word characters
+        # or with only one or two letter words)
+        if '' in keywords:
+            return None
+ 
+        file_ids = None
+ 
+        for keyword in keywords:
+            if keyword == '((regex))':
+                continue
+ 
+            tokens = WORD_PATTERN.findall(keyword.lower())
+ 
+            for i, token in enumerate(tokens):
+                like_token = token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+ 
+                # The first and last words of a keyword may be cut from longer words in the text
+                if len(tokens) == 1:
+                    condition, argument = 'instr(t.term, ?) > 0', token
+                elif i == 0:
+                    condition, argument = "t.term LIKE ? ESCAPE '\\'", '%' + like_token
+                elif i == len(tokens) - 1:
+                    condition, argument = "t.term LIKE ? ESCAPE '\\'", like_token + '%'
+                else:
+                    condition, argument = 't.term = ?', token
+ 
+                if condition == 't.term = ?':
+                    # Served by the index on terms.term
+                    rows = self.connection.execute(
+                        'SELECT DISTINCT p.file_id FROM terms t JOIN postings p ON p.term_id = t.id WHERE t.term = ?',
+                        (token,)
+                    )
+                elif self.trigrams and len(token) >= TRIGRAM_SIZE:
+                    # The trigram table finds the terms containing the token, the condition
+                    # then keeps those it starts or ends
+                    rows = self.connection.execute(
+                        'SELECT DISTINCT p.file_id FROM term_trigrams g JOIN terms t ON t.id = g.rowid '
+                        f'JOIN postings p ON p.term_id = t.id WHERE term_trigrams MATCH ? AND {condition}',
+                        ('"' + token.replace('"', '""') + '"', argument)
+                    )
+                elif self.trigrams:
+                    # Too short for the trigram table, and part of so many words that
+                    # it would hardly narrow the search
+                    continue
+                else:
+                    rows = self.connection.execute(
+                        f'SELECT DISTINCT p.file_id FROM terms t JOIN postings p ON p.term_id = t.id WHERE {condition}',
+                        (argument,)
+                    )
+                token_file_ids = {row[0] for row in rows}
+ 
+                # AND across all keywords is an intersection of their postings
+                file_ids = token_file_ids if file_ids is None else file_ids & token_file_ids
+                if not file_ids:
+                    return set()
+ 
+        if file_ids is None:
+            return None
+ 
+        file_ids = list(file_ids)
+        paths = set()
+        for i in range(0, len(file_ids), IDS_PER_QUERY):
+            batch = file_ids[i:i + IDS_PER_QUERY]
+            rows = self.connection.execute(f"SELECT path FROM files WHERE id IN ({', '.join('?' * len(batch))})", batch)
+            paths.update(row[0] for row in rows)
+ 
+        return paths
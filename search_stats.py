@@ -0,0 +1,161 @@
+import os
+import csv
+import json
+import heapq
+from time import perf_counter
+from contextlib import contextmanager, nullcontext
+ 
+# Per-file timings of searches and highlights. Kept free of PyQt imports so the
+# search worker processes can time their files and send the records back.
+ 
+# Timed phases. Times are exclusive: a phase nested in another, like opening the
+# document inside extraction, is subtracted from the outer one.
+PHASES = ['stat', 'cache', 'open', 'extract', 'match', 'highlight', 'signal']
+ 
+# Columns of the CSV export
+FIELDS = ['path', 'kind', 'format', 'result', 'bytes', 'pages', 'cached_pages', 'total'] + PHASES
+ 
+ 
+class FileTimer:
+    """Times the phases of searching or highlighting one file."""
+ 
+    def __init__(self, file_path, kind='search'):
+        self.record = {
+            'path': file_path,
+            'kind': kind,
+            'format': os.path.splitext(file_path)[1].lower(),
+            'result': None,
+            'bytes': 0,
+            'pages': 0,
+            'cached_pages': 0,
+            'total': 0.0,
+        }
+        self.record.update((phase, 0.0) for phase in PHASES)
+        self.nested = []  # Time spent in phases nested in each open phase
+        self.start = perf_counter()
+ 
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        self.nested.append(0.0)
+ 
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.record[name] += elapsed - self.nested.pop()
+            if self.nested:
+                self.nested[-1] += elapsed
+ 
+    def timed(self, name, function):
+        # Wraps a callback, e.g. the progress signal, so its time is counted as the phase
+        def wrapper(*args):
+            with self.phase(name):
+                return function(*args)
+        return wrapper
+ 
+    def iterate(self, units, name='extract'):
+        # Yields the units, timing how long each one takes to produce and counting them
+        iterator = iter(units)
+ 
+        while True:
+            with self.phase(name):
+                try:
+                    unit = next(iterator)
+                except StopIteration:
+                    return
+ 
+            self.record['pages'] += 1
+            yield unit
+ 
+    def stat(self, file_path):
+        with self.phase('stat'):
+            self.record['bytes'] = os.path.getsize(file_path)
+ 
+    def cached(self, count):
+        self.record['cached_pages'] = count
+ 
+    def finish(self, result):
+        self.record['result'] = result
+        self.record['total'] = perf_counter() - self.start
+        return self.record
+ 
+ 
+class NullTimer:
+    """Stands in for a FileTimer when nothing is timed."""
+ 
+    def phase(self, name):
+        return nullcontext()
+ 
+    def timed(self, name, function):
+        return function
+ 
+    def iterate(self, units, name='extract'):
+        return units
+ 
+    def stat(self, file_path):
+        pass
+ 
+    def cached(self, count):
+        pass
+ 
+ 
+NULL_TIMER = NullTimer()
+ 
+ 
+class SearchStats:
+    """Timing records of a search and the files highlighted from its results."""
+ 
+    def __init__(self):
+        self.records = []
+ 
+    def add(self, record):
+        if record is not None:
+            self.records.append(record)
+ 
+    def extend(self, records):
+        self.records.extend(records)
+ 
+    def clear(self):
+        self.records = []
+ 
+    def totals(self):
+        # Files, bytes, pages and the time of every phase over all records
+        totals = {'files': len(self.records), 'bytes': 0, 'pages': 0, 'total': 0.0}
+        totals.update((phase, 0.0) for phase in PHASES)
+ 
+        for record in self.records:
+            for field in totals:
+                if field != 'files':
+                    totals[field] += record[field]
+ 
+        return totals
+ 
+    def by_format(self):
+        # {format: {'files', 'bytes', 'total'}}
+        formats = {}
+ 
+        for record in self.records:
+            entry = formats.setdefault(record['format'], {'files': 0, 'bytes': 0, 'total': 0.0})
+            entry['files'] += 1
+            entry['bytes'] += record['bytes']
+            entry['total'] += record['total']
+ 
+        return formats
+ 
+    def slowest(self, count=10):
+        return heapq.nlargest(count, self.records, key=lambda record: record['total'])
+ 
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'totals': self.totals(),
+                'formats': self.by_format(),
+                'files': self.records,
+            }, f, indent=2)
+ 
+    def export_csv(self, path):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
@@ -0,0 +1,82 @@
+import os
+import json
+import zlib
+import hashlib
+ 
+# Root folder for everything Smart Key Search keeps between sessions
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.smart_key_search')
+ 
+# Bump when extraction changes so entries written by older versions are ignored
+CACHE_VERSION = 3
+ 
+ 
+class TextCache:
+    """On-disk cache of extracted document text, keyed by (path, size, mtime)."""
+ 
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, 'text')
+ 
+    def key(self, file_path):
+        # Any change on disk changes size or mtime, which invalidates the entry
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+ 
+    def entry_path(self, key):
+        digest = hashlib.sha1(key[0].encode('utf-8', 'surrogatepass')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + '.json.z')
+ 
+    def get(self, key):
+        # Returns the cached ([(label, text), ...], complete) pair, or None on a miss.
+        # Incomplete entries hold the first pages of a document whose search stopped early.
+        try:
+            with open(self.entry_path(key), 'rb') as f:
+                entry = json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            return None
+ 
+        if entry.get('version') != CACHE_VERSION or [entry['path'], entry['size'], entry['mtime']] != list(key):
+            return None
+ 
+        text = entry['text']
+        offsets = entry['offsets'] + [len(text)]
+ 
+        units = [
+            (label, text[offsets[i]:offsets[i + 1]])
+            for i, label in enumerate(entry['labels'])
+        ]
+ 
+        return units, entry['complete']
+ 
+    def put(self, key, units, complete=True):
+        # Store the normalized text once, with the start offset of every page/sheet/slide
+        offsets = []
+        position = 0
+        for _, text in units:
+            offsets.append(position)
+            position += len(text)
+ 
+        entry = {
+            'version': CACHE_VERSION,
+            'path': key[0],
+            'size': key[1],
+            'mtime': key[2],
+            'labels': [label for label, _ in units],
+            'offsets': offsets,
+            'text': ''.join(text for _, text in units),
+            'complete': complete,
+        }
+ 
+        entry_path = self.entry_path(key)
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+ 
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(zlib.compress(json.dumps(entry).encode('utf-8')))
+            # Atomic so concurrent search workers never see a half-written entry
+            os.replace(temp_path, entry_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
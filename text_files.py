@@ -0,0 +1,353 @@
+import mmap
+import codecs
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from collections import deque
+from search_stats import NULL_TIMER
+ 
+# Plain text and log files of any size, read through a memory map in chunks that end
+# at a line break, so memory use does not grow with the file. Kept free of PyQt
+# imports like search_engine, which uses it for .txt files.
+ 
+# Bytes per chunk; each chunk ends at the last line break inside it
+TXT_CHUNK_SIZE = 4 * 1024 * 1024
+ 
+# Bytes per line checkpoint of the text viewer; divides TXT_CHUNK_SIZE
+LINE_BLOCK_SIZE = 64 * 1024
+ 
+# Bytes read from the start of the file to detect its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+ 
+# Used when the sample is not valid UTF-8, e.g. logs written by Windows programs
+FALLBACK_ENCODING = 'cp1252'
+ 
+# Encodings where every ASCII character is the same single byte, so ASCII keywords
+# can be found in the raw bytes and line breaks are b'\n'
+BYTE_ENCODINGS = {'utf-8', 'utf-8-sig', FALLBACK_ENCODING}
+ 
+# Checked longest first, the UTF-32 LE mark starts with the UTF-16 LE one
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+ 
+ 
+def detect_encoding(sample, truncated=False):
+    # truncated: the file continues past the sample
+    for mark, encoding in BYTE_ORDER_MARKS:
+        if sample.startswith(mark):
+            return encoding
+ 
+    # UTF-16 without a byte order mark: ASCII text has a zero byte in every pair
+    zeros = sample.count(b'\0')
+    if zeros > len(sample) // 4:
+        return 'utf-16-le' if sample[1::2].count(b'\0') > sample[0::2].count(b'\0') else 'utf-16-be'
+ 
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A character cut off at the end of the sample is still UTF-8, but only when
+        # the file goes on; at the end of the file the byte is not UTF-8
+        if not truncated or e.start < len(sample) - 3:
+            return FALLBACK_ENCODING
+ 
+    return 'utf-8'
+ 
+ 
+class TextChunk:
+    """A piece of a text file ending at a line break, lowercased or decoded only when needed.
+ 
+    Keywords are matched with a look-ahead into the next chunk, so one cut by a chunk
+    that had to end inside a very long line is still found; the regex is matched on
+    the chunk alone, which always ends between two words."""
+ 
+    def __init__(self, text_file, start, end, overlap=0, text=None, lookahead=''):
+        self.text_file = text_file
+        self.start = start
+        self.end = end
+        # Look-ahead in bytes; a character takes at most 4 bytes in the byte encodings
+        self.overlap_bytes = overlap * 4
+        self.decoded = text
+        self.lookahead = lookahead if text is not None else None
+        self.lowered = None
+ 
+    def lower_bytes(self):
+        # Raw bytes with the look-ahead, lowercased in the ASCII range
+        if self.lowered is None:
+            self.lowered = self.text_file.data[self.start:self.end + self.overlap_bytes].lower()
+        return self.lowered
+ 
+    def text(self):
+        if self.decoded is None:
+            self.decoded = self.text_file.data[self.start:self.end].decode(self.text_file.encoding, 'replace')
+        return self.decoded
+ 
+    def keyword_text(self):
+        if self.lookahead is None:
+            data = self.text_file.data[self.end:self.end + self.overlap_bytes]
+            self.lookahead = data.decode(self.text_file.encoding, 'replace')
+        return self.text() + self.lookahead
+ 
+    @property
+    def percent(self):
+        return int((self.end / self.text_file.size) * 100)
+ 
+ 
+class TextFile:
+    """A text file mapped into memory, with its encoding detected from the first bytes."""
+ 
+    def __init__(self, file_path):
+        self.file = open(file_path, 'rb')
+ 
+        try:
+            self.size = self.file.seek(0, 2)
+            # Empty files cannot be mapped
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+            if self.size and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                self.data.madvise(mmap.MADV_SEQUENTIAL)
+        except Exception:
+            self.file.close()
+            raise
+ 
+        self.encoding = detect_encoding(self.data[:ENCODING_SAMPLE_SIZE], self.size > ENCODING_SAMPLE_SIZE)
+        self.byte_compatible = self.encoding in BYTE_ENCODINGS
+ 
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+ 
+    def __enter__(self):
+        return self
+ 
+    def __exit__(self, *exc_info):
+        self.close()
+ 
+    def release(self, end):
+        # Drops the mapped pages before end from this process, which the search does not
+        # read again, so the resident size stays at about one chunk
+        if isinstance(self.data, mmap.mmap) and hasattr(mmap, 'MADV_DONTNEED'):
+            self.data.madvise(mmap.MADV_DONTNEED, 0, end - end % mmap.PAGESIZE)
+ 
+    def ranges(self, chunk_size=TXT_CHUNK_SIZE):
+        # (start, end) byte ranges that end at a line break, or at a space or tab
+        # inside lines longer than a chunk
+        start = 0
+ 
+        while start < self.size:
+            end = min(start + chunk_size, self.size)
+ 
+            if end < self.size:
+                cut = self.data.rfind(b'\n', start, end)
+                if cut == -1:
+                    cut = max(self.data.rfind(b' ', start, end), self.data.rfind(b'\t', start, end))
+                if cut != -1:
+                    end = cut + 1
+                else:
+                    # No space either, do not cut a UTF-8 character in two
+                    while end > start + 1 and 0x80 <= self.data[end] < 0xC0:
+                        end -= 1
+ 
+            yield start, end
+            start = end
+ 
+    def decoded_chunks(self, chunk_size=TXT_CHUNK_SIZE):
+        # (text, end) for encodings where a line break is not a single byte; the
+        # incremental decoder carries characters cut by the fixed-size byte slices
+        decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+        carry = ''
+ 
+        for offset in range(0, self.size, chunk_size):
+            end = min(offset + chunk_size, self.size)
+            text = carry + decoder.decode(self.data[offset:end], final=end == self.size)
+ 
+            cut = text.rfind('\n') + 1 if end < self.size else len(text)
+            if cut == 0 and len(text) > chunk_size:
+                # One huge line, cut between two words rather than growing without bound
+                cut = max(text.rfind(' '), text.rfind('\t')) + 1 or len(text)
+ 
+            carry = text[cut:]
+            if cut:
+                yield text[:cut], end
+ 
+    def chunks(self, overlap=0):
+        # TextChunks of the file; overlap is the keyword look-ahead in characters
+        if self.byte_compatible:
+            for start, end in self.ranges():
+                yield TextChunk(self, start, end, overlap)
+                self.release(end)
+            return
+ 
+        # Decoded chunks are held back until the text following them covers the look-ahead
+        pending = deque()
+        following = 0
+ 
+        for text, end in chain(self.decoded_chunks(), [('', None)]):
+            pending.append((text, end))
+            following += len(text)
+ 
+            while len(pending) > 1 and (following - len(pending[0][0]) >= overlap or end is None):
+                text, chunk_end = pending.popleft()
+                following -= len(text)
+                lookahead = ''
+                for next_text, _ in pending:
+                    if len(lookahead) >= overlap:
+                        break
+                    lookahead += next_text[:overlap - len(lookahead)]
+                yield TextChunk(self, 0, chunk_end, text=text, lookahead=lookahead)
+                self.release(chunk_end)
+ 
+ 
+# Codec of a single line, which does not start with the byte order mark of the file
+LINE_CODECS = {
+    'utf-8-sig': 'utf-8',
+    'utf-16': {codecs.BOM_UTF16_LE: 'utf-16-le', codecs.BOM_UTF16_BE: 'utf-16-be'},
+    'utf-32': {codecs.BOM_UTF32_LE: 'utf-32-le', codecs.BOM_UTF32_BE: 'utf-32-be'},
+}
+ 
+ 
+class TextLines:
+    """Line access into a text file for the viewer. Only the number of line breaks before
+    every LINE_BLOCK_SIZE bytes is kept, and a line is found by scanning forward from the
+    block it starts in, so memory does not grow with the number of lines. Lines are split
+    at '\n' like str.split('\n')."""
+ 
+    def __init__(self, file_path):
+        self.text_file = TextFile(file_path)
+        data = self.text_file.data
+        size = self.text_file.size
+        encoding = self.text_file.encoding
+ 
+        self.codec = LINE_CODECS.get(encoding, encoding)
+        if isinstance(self.codec, dict):
+            mark = next(mark for mark in self.codec if data[:len(mark)] == mark)
+            self.codec = self.codec[mark]
+        self.bom_size = len(codecs.BOM_UTF8) if encoding == 'utf-8-sig' else 0
+        if encoding in ('utf-16', 'utf-32'):
+            self.bom_size = len('\n'.encode(self.codec))
+ 
+        # A line break of a wider encoding has to start on a character boundary
+        self.newline = '\n'.encode(self.codec)
+        self.width = len(self.newline)
+ 
+        # Line breaks before each block; the blocks start on character boundaries, so a
+        # wider encoding can count its breaks in the decoded block
+        self.block_breaks = array('q')
+        breaks = 0
+ 
+        for chunk_start in range(self.bom_size, size, TXT_CHUNK_SIZE):
+            chunk_end = min(chunk_start + TXT_CHUNK_SIZE, size)
+ 
+            for block_start in range(chunk_start, chunk_end, LINE_BLOCK_SIZE):
+                self.block_breaks.append(breaks)
+                block = data[block_start:min(block_start + LINE_BLOCK_SIZE, chunk_end)]
+                if self.width == 1:
+                    breaks += block.count(self.newline)
+                else:
+                    breaks += block.decode(self.codec, 'replace').count('\n')
+ 
+            self.text_file.release(chunk_end)
+ 
+        # A line break at the very end does not start another line
+        self.count = breaks + 1
+        if breaks and self.find_break(size - self.width) == size - self.width:
+            self.count -= 1
+ 
+        # (line, start offset) of the last line looked up, the next lookup goes on from there
+        self.cursor = (0, self.bom_size)
+ 
+    def __len__(self):
+        return self.count
+ 
+    def find_break(self, position):
+        # Offset of the next line break at or after position, or -1
+        while True:
+            position = self.text_file.data.find(self.newline, position)
+            if position == -1 or (position - self.bom_size) % self.width == 0:
+                return position
+            position += 1
+ 
+    def line_start(self, line_num):
+        # The last block with fewer than line_num breaks before it holds the break ending the line before
+        block = bisect_left(self.block_breaks, line_num) - 1
+        if block < 0:
+            return self.bom_size
+ 
+        block_start = self.bom_size + block * LINE_BLOCK_SIZE
+        line, position = self.cursor
+        if line > line_num or position < block_start:
+            line, position = self.block_breaks[block], block_start
+ 
+        while line < line_num:
+            position = self.find_break(position) + self.width
+            line += 1
+ 
+        self.cursor = (line, position)
+        return position
+ 
+    def line(self, line_num, max_bytes=None):
+        # Text of a line without its line break, cut after max_bytes
+        start = self.line_start(line_num)
+        end = self.find_break(start)
+ 
+        if end == -1:
+            end = self.text_file.size
+        else:
+            end += self.width
+            self.cursor = (line_num + 1, end)
+ 
+        if max_bytes is not None:
+            end = min(end, start + max_bytes)
+        return self.text_file.data[start:end].decode(self.codec, 'replace').rstrip('\r\n')
+ 
+    def close(self):
+        self.text_file.close()
+ 
+ 
+def search_txt(file_path, query, progress=None, stop_early=True, timer=NULL_TIMER, cancel=None):
+    # Same result as search_file on the decoded text, without holding the file in memory
+    matcher = query.matcher
+    pattern = query.regex
+    remaining_keywords = set(query.required_keywords)
+    regex_found = pattern is None
+ 
+    with timer.phase('open'):
+        text_file = TextFile(file_path)
+ 
+    with text_file:
+        # ASCII keywords are found in the raw bytes, lowercased without decoding;
+        # other keywords and the regex need the decoded text of the chunk
+        byte_keywords = {
+            keyword: keyword.encode('ascii')
+            for keyword in remaining_keywords
+            if text_file.byte_compatible and keyword.isascii()
+        }
+        overlap = max(map(len, remaining_keywords), default=1) - 1
+ 
+        for chunk in timer.iterate(text_file.chunks(overlap)):
+            if cancel is not None:
+                cancel.check()
+ 
+            with timer.phase('match'):
+                for keyword in remaining_keywords & byte_keywords.keys():
+                    if byte_keywords[keyword] in chunk.lower_bytes():
+                        remaining_keywords.discard(keyword)
+ 
+                text_keywords = remaining_keywords - byte_keywords.keys()
+                if text_keywords:
+                    remaining_keywords -= matcher.find(chunk.keyword_text(), text_keywords)
+ 
+                if not regex_found:
+                    regex_found = pattern.search(chunk.text())
+ 
+            if progress:
+                progress(chunk.percent)
+ 
+            if stop_early and not remaining_keywords and regex_found:
+                break
+ 
+    return not remaining_keywords and regex_found